@@ -0,0 +1,89 @@
+"""
+Times harvesting one build plate unit-by-unit (insert_product_harvest) versus
+in one transaction (insert_product_harvests_bulk).
+
+Writes real rows: point DATABASE_URL / .env at a DEV database only.
+
+Example:
+    python benchmarks/harvest_plate_benchmark.py --sku-id 3 --mount-id 12 --lid-id 4 --seal-id 7 --user-id 1 --units 96
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from sqlalchemy import text
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT_DIR / "streamlit_app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from db.orm_session import get_session
+from schemas.production_schemas import ProductRequestCreate, ProductHarvestCreate
+from services.production_services import (
+    insert_product_request,
+    insert_product_harvest,
+    insert_product_harvests_bulk,
+)
+
+
+def create_plate(sku_id: int, user_id: int, units: int) -> list[int]:
+    """Creates one lot of `units` pending requests and returns their ids."""
+    with get_session() as db:
+        insert_product_request(db, ProductRequestCreate(
+            requested_by=user_id, sku_id=sku_id, quantity=units, notes="benchmark"
+        ))
+        lot = db.execute(text(
+            "SELECT TOP 1 lot_number FROM product_requests WHERE notes = 'benchmark' ORDER BY id DESC"
+        )).scalar_one()
+        return list(db.execute(text(
+            "SELECT id FROM product_requests WHERE lot_number = :lot AND status = 'Pending' ORDER BY id"
+        ), {"lot": lot}).scalars().all())
+
+def harvest_single(request_ids: list[int], args) -> float:
+    start = time.perf_counter()
+    for rid in request_ids:
+        with get_session() as db:
+            insert_product_harvest(
+                db, request_id=rid, filament_mount_id=args.mount_id, printed_by=args.user_id,
+                lid_id=args.lid_id, seal_id=args.seal_id
+            )
+    return time.perf_counter() - start
+
+def harvest_bulk(request_ids: list[int], args) -> float:
+    items = [
+        ProductHarvestCreate(
+            request_id=rid, filament_mount_id=args.mount_id, printed_by=args.user_id,
+            lid_id=args.lid_id, seal_id=args.seal_id
+        )
+        for rid in request_ids
+    ]
+    start = time.perf_counter()
+    with get_session() as db:
+        insert_product_harvests_bulk(db, items)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-unit vs bulk build-plate harvesting.")
+    parser.add_argument("--sku-id", type=int, required=True)
+    parser.add_argument("--mount-id", type=int, required=True)
+    parser.add_argument("--lid-id", type=int, required=True)
+    parser.add_argument("--seal-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--units", type=int, default=96, help="Units per build plate")
+    parser.add_argument("--plates", type=int, default=3, help="Plates to time for each path")
+    args = parser.parse_args()
+
+    results = {"single": [], "bulk": []}
+    for _ in range(args.plates):
+        results["single"].append(harvest_single(create_plate(args.sku_id, args.user_id, args.units), args))
+        results["bulk"].append(harvest_bulk(create_plate(args.sku_id, args.user_id, args.units), args))
+
+    print(f"{'path':<8} {'plates':>6} {'units':>6} {'s/plate':>10} {'ms/unit':>10}")
+    for path, timings in results.items():
+        per_plate = sum(timings) / len(timings)
+        print(f"{path:<8} {len(timings):>6} {args.units:>6} {per_plate:>10.3f} {per_plate * 1000 / args.units:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
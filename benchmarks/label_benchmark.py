@@ -0,0 +1,122 @@
+"""
+Renders N labels per template (default 200) with the cached label renderer and with
+the previous open-decode-composite-per-label approach, and reports labels/second
+plus the largest pixel difference between the two outputs. With --pdf it also
+builds one N-label PDF per template in raster and vector mode and compares time
+and file size.
+
+No database needed; run from the repository root so the template paths resolve.
+
+Example:
+    python benchmarks/label_benchmark.py --labels 200
+    python benchmarks/label_benchmark.py --labels 500 --template CS10K-6K_v1 --pdf
+"""
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+import qrcode
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT_DIR / "streamlit_app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from components.label.label_generator import DEFAULT_FONT_PATH, generate_label_with_overlays, clear_label_caches
+from components.label.label_batch import render_labels_pdf
+from components.label.label_vector import render_labels_vector_pdf
+from constants.label_constants import QR_LABEL_MAP
+
+
+def render_uncached(background_path: str, fields: dict, qr_specs: dict, qr_required: bool) -> Image.Image:
+    """The pre-cache renderer: decodes the template, loads fonts and builds the QR for every label."""
+    base = Image.open(background_path).convert("RGBA")
+    underlay = Image.new("RGBA", base.size, (0, 0, 0, 0))
+    if qr_required:
+        qr_img = qrcode.make(qr_specs["qr_data"]).resize((qr_specs["qr_size"], qr_specs["qr_size"])).convert("RGBA")
+        underlay.paste(qr_img, qr_specs["qr_position"], qr_img)
+    composed = Image.alpha_composite(underlay, base)
+    draw = ImageDraw.Draw(composed)
+    for field in fields.values():
+        font = ImageFont.truetype(field.get("font_path", DEFAULT_FONT_PATH), size=field.get("font_size", 16))
+        draw.text(field["position"], field["text"], font=font, fill="black")
+    bg = Image.new("RGBA", composed.size, (255, 255, 255, 255))
+    return Image.alpha_composite(bg, composed).convert("RGB")
+
+def label_jobs(template: str, package: dict, n: int):
+    """n (fields, qr_specs) pairs with distinct product ids, like a batch print run."""
+    for i in range(n):
+        fields = copy.deepcopy(package["label_specs"])
+        qr_specs = copy.deepcopy(package["qr_specs"])
+        product_id = str(100000 + i)
+        for name, spec in fields.items():
+            spec["text"] = product_id if name == "product_id" else f"{name} {i % 10}"
+        if package["qr_required"]:
+            qr_specs["qr_data"] = product_id
+        yield fields, qr_specs
+
+def timed(render, jobs) -> tuple[float, list[Image.Image]]:
+    start = time.perf_counter()
+    images = [render(fields, qr_specs) for fields, qr_specs in jobs]
+    return time.perf_counter() - start, images
+
+def compare_pdf(background_path: str, package: dict, jobs: list) -> str:
+    """Raster vs vector PDF for the same jobs: seconds and file size of each."""
+    pdf_jobs = [
+        {"background_path": background_path, "fields": f, "qr_specs": q,
+         "qr_required": package["qr_required"], "print_size": package["print_size"]}
+        for f, q in jobs
+    ]
+    results = []
+    for render in (render_labels_pdf, render_labels_vector_pdf):
+        start = time.perf_counter()
+        pdf_file, _ = render(pdf_jobs)
+        seconds = time.perf_counter() - start
+        with pdf_file:
+            size = pdf_file.seek(0, 2)
+        results.append(f"{seconds:>7.2f}s {size / 1024:>9.0f}KB")
+    return "  ".join(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark label rendering throughput.")
+    parser.add_argument("--labels", type=int, default=200, help="Labels rendered per template")
+    parser.add_argument("--template", help="Only this template (e.g. CSmini_v1)")
+    parser.add_argument("--pdf", action="store_true", help="Also compare raster vs vector PDF output")
+    args = parser.parse_args()
+
+    header = f"{'template':<14} {'uncached/s':>11} {'cached/s':>10} {'speedup':>8} {'max diff':>9}"
+    if args.pdf:
+        header += f"  {'raster pdf':>19}  {'vector pdf':>19}"
+    print(header)
+    for package in QR_LABEL_MAP:
+        for template in package["labels"]:
+            if args.template and template != args.template:
+                continue
+            background_path = str(APP_DIR / "assets" / "labels" / f"{template}.png")
+            jobs = list(label_jobs(template, package, args.labels))
+
+            old_s, old_images = timed(
+                lambda f, q: render_uncached(background_path, f, q, package["qr_required"]), jobs
+            )
+            clear_label_caches()
+            new_s, new_images = timed(
+                lambda f, q: generate_label_with_overlays(background_path, f, q, qr_required=package["qr_required"]), jobs
+            )
+
+            max_diff = max(
+                max(band_max for _, band_max in ImageChops.difference(a, b).getextrema())
+                for a, b in zip(old_images, new_images)
+            )
+            line = (
+                f"{template:<14} {args.labels / old_s:>11.1f} {args.labels / new_s:>10.1f} "
+                f"{old_s / new_s:>7.1f}x {max_diff:>9}"
+            )
+            if args.pdf:
+                line += "  " + compare_pdf(background_path, package, jobs)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Minimal stand-in for the Microsoft Graph endpoint the app calls in local/MSAL mode
+(POST /me/getMemberGroups), so group lookups and their cache can be exercised
+offline. Any bearer token is accepted; each request is logged, which shows when
+the app serves groups from its cache instead.
+
+No dependencies beyond the standard library.
+
+Example:
+    python benchmarks/mock_graph_server.py --port 8765 --groups <group-oid> <group-oid>
+    GRAPH_API_URL=http://localhost:8765 APP_ENV=local streamlit run streamlit_app/Main.py
+
+--status 401 / 403 makes every lookup fail the way an expired token / missing
+consent does; --delay adds latency to mimic the remote call.
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(groups: list[str], status: int, delay: float):
+    class GraphHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            GraphHandler.requests_served += 1
+
+            if self.path.rstrip("/") != "/me/getMemberGroups":
+                return self._reply(404, {"error": {"code": "Request_ResourceNotFound"}})
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._reply(401, {"error": {"code": "InvalidAuthenticationToken"}})
+            if delay:
+                time.sleep(delay)
+            if status != 200:
+                return self._reply(status, {"error": {"code": "Authorization_RequestDenied"}})
+            self._reply(200, {"value": groups})
+
+        def _reply(self, code: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            print(f"[graph #{GraphHandler.requests_served}] {self.address_string()} {fmt % args}")
+
+    return GraphHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Microsoft Graph server for local group lookups")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--groups", nargs="*", default=[], help="Group OIDs returned for every user.")
+    parser.add_argument("--status", type=int, default=200, choices=[200, 401, 403])
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering.")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.groups, args.status, args.delay))
+    print(f"Mock Graph on http://{args.host}:{args.port} -> set GRAPH_API_URL to this URL")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
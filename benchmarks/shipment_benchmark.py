@@ -0,0 +1,148 @@
+"""
+Builds a synthetic N-unit shipment (default 5,000) and times FIFO allocation,
+create_shipment_from_order and mark_shipment_as_shipped.
+
+Fixture: one lot of N requests for --sku-id is harvested with insert_product_harvests_bulk,
+moved to QMSalesApproval / A-Ware, and ordered by --customer-id as a single order line.
+
+Writes real rows: point DATABASE_URL / .env at a DEV database only.
+
+Example:
+    python benchmarks/shipment_benchmark.py --sku-id 3 --mount-id 12 --lid-id 4 --seal-id 7 --user-id 1 --customer-id 2
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from sqlalchemy import text
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT_DIR / "streamlit_app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from db.orm_session import get_session
+from schemas.production_schemas import ProductRequestCreate, ProductHarvestCreate
+from schemas.sales_schemas import SalesOrderInput
+from services.production_services import insert_product_request, insert_product_harvests_bulk
+from services.reference_services import get_stage_id
+from services.sales_services import create_sales_order
+from services.shipment_services import (
+    allocate_fifo_for_order,
+    release_reservations,
+    create_shipment_from_order,
+    mark_shipment_as_shipped,
+)
+from services.tracking_service import bulk_update_product_stage, bulk_update_product_status
+
+HARVEST_BATCH = 500
+NOTE = "shipment benchmark"
+
+
+def build_sellable_units(args) -> list[int]:
+    """Creates and harvests one lot of args.units products, makes them sellable and returns their ids."""
+    with get_session() as db:
+        insert_product_request(db, ProductRequestCreate(
+            requested_by=args.user_id, sku_id=args.sku_id, quantity=args.units, notes=NOTE
+        ))
+        lot = db.execute(text(
+            "SELECT TOP 1 lot_number FROM product_requests WHERE notes = :note ORDER BY id DESC"
+        ), {"note": NOTE}).scalar_one()
+        request_ids = list(db.execute(text(
+            "SELECT id FROM product_requests WHERE lot_number = :lot AND status = 'Pending' ORDER BY id"
+        ), {"lot": lot}).scalars().all())
+
+    for start in range(0, len(request_ids), HARVEST_BATCH):
+        with get_session() as db:
+            insert_product_harvests_bulk(db, [
+                ProductHarvestCreate(
+                    request_id=rid, filament_mount_id=args.mount_id, printed_by=args.user_id,
+                    lid_id=args.lid_id, seal_id=args.seal_id
+                )
+                for rid in request_ids[start:start + HARVEST_BATCH]
+            ])
+
+    with get_session() as db:
+        product_ids = list(db.execute(text(
+            """
+                SELECT pt.id
+                FROM product_tracking pt
+                JOIN product_harvest ph ON pt.harvest_id = ph.id
+                JOIN product_requests pr ON ph.request_id = pr.id
+                WHERE pr.lot_number = :lot
+                ORDER BY pt.id
+            """
+        ), {"lot": lot}).scalars().all())
+        bulk_update_product_stage(
+            db, product_ids, get_stage_id(db, "QMSalesApproval"), reason=NOTE, user_id=args.user_id
+        )
+        bulk_update_product_status(db, product_ids, "A-Ware")
+        db.commit()
+    return product_ids
+
+def create_order(args) -> int:
+    with get_session() as db:
+        create_sales_order(db, SalesOrderInput(
+            customer_id=args.customer_id, created_by=args.user_id, updated_by=args.user_id,
+            sku_quantities={args.sku_id: args.units}, notes=NOTE
+        ))
+        return db.execute(text(
+            "SELECT TOP 1 id FROM orders WHERE notes = :note ORDER BY id DESC"
+        ), {"note": NOTE}).scalar_one()
+
+def timed(label: str, fn, timings: dict):
+    start = time.perf_counter()
+    result = fn()
+    timings[label] = time.perf_counter() - start
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark set-based shipment creation on a synthetic shipment.")
+    parser.add_argument("--sku-id", type=int, required=True, help="Serialized, non-bundle SKU")
+    parser.add_argument("--mount-id", type=int, required=True)
+    parser.add_argument("--lid-id", type=int, required=True)
+    parser.add_argument("--seal-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--customer-id", type=int, required=True)
+    parser.add_argument("--units", type=int, default=5000, help="Units in the shipment")
+    args = parser.parse_args()
+
+    timings: dict[str, float] = {}
+    product_ids = timed("fixture", lambda: build_sellable_units(args), timings)
+    order_id = create_order(args)
+    holder = f"benchmark-{order_id}"
+
+    def allocate():
+        with get_session() as db:
+            picks = allocate_fifo_for_order(db, order_id, {args.sku_id: args.units}, holder=holder, user_id=args.user_id)
+            release_reservations(db, holder)
+        return picks
+    picks = timed("allocate_fifo", allocate, timings)
+    print(f"FIFO allocated {len(picks.get(args.sku_id, []))} of {args.units} units")
+
+    # Ship exactly the fixture units so the run is repeatable regardless of older stock
+    def create():
+        with get_session() as db:
+            create_shipment_from_order(
+                db=db, order_id=order_id, customer_id=args.customer_id, creator_id=args.user_id,
+                updated_by=args.user_id, picked_by_sku={args.sku_id: [{"product_id": pid} for pid in product_ids]},
+                non_serialized_counts={}, notes=NOTE
+            )
+            return db.execute(text(
+                "SELECT TOP 1 id FROM shipments WHERE order_id = :oid ORDER BY id DESC"
+            ), {"oid": order_id}).scalar_one()
+    shipment_id = timed("create_shipment", create, timings)
+
+    def ship():
+        with get_session() as db:
+            mark_shipment_as_shipped(db, shipment_id, args.user_id, carrier="BENCH", tracking_number=str(shipment_id))
+    timed("mark_shipped", ship, timings)
+
+    print(f"shipment #{shipment_id}: {len(product_ids)} units")
+    print(f"{'step':<16} {'s':>10} {'ms/unit':>10}")
+    for step, seconds in timings.items():
+        print(f"{step:<16} {seconds:>10.3f} {seconds * 1000 / max(len(product_ids), 1):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
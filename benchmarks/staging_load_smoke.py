@@ -0,0 +1,121 @@
+"""
+Smoke run for the ETL staging loader (etl/load_to_sql.load_staging_batches) against
+a dev database. For each insert path ("auto" = OPENJSON with fallback, and
+"executemany") it:
+
+  1. creates a scratch staging table from batches whose types drift between
+     batches (ints then text, dates, floats, bools, blanks) and checks every row
+     and value arrived;
+  2. replays a delta load (replace_keys + deleted_keys) and checks the changed rows
+     were replaced and the vanished ones deleted.
+
+Writes and drops dbo.stg_smoke_* tables: point DATABASE_URL / .env at a DEV database only.
+
+Example:
+    python benchmarks/staging_load_smoke.py --rows 20000
+    python benchmarks/staging_load_smoke.py --mode executemany --keep
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+ETL_DIR = ROOT_DIR / "etl"
+if str(ETL_DIR) not in sys.path:
+    sys.path.insert(0, str(ETL_DIR))
+
+from extract_from_excel import BATCH_ROWS
+from load_to_sql import get_engine, load_staging_batches
+
+KEY = "etl_row_key"
+
+
+def make_rows(n: int) -> list[dict]:
+    """Row i: `mixed` is an int in the first batch and text afterwards, like a sheet whose ids change format."""
+    start = datetime(2024, 1, 1, 8, 30)
+    return [
+        {
+            KEY: f"k{i}",
+            "mixed": i if i < BATCH_ROWS else f"A-{i}",
+            "printed_at": start + timedelta(minutes=i),
+            "print_date": date(2024, 1, 1) + timedelta(days=i % 365),
+            "weight": None if i % 7 == 0 else i / 4,
+            "passed": i % 2 == 0,
+            "note": None if i % 3 else f"note {i}",
+        }
+        for i in range(n)
+    ]
+
+def batches(rows: list[dict]):
+    for i in range(0, len(rows), BATCH_ROWS):
+        yield pd.DataFrame.from_records(rows[i:i + BATCH_ROWS])
+
+def check(label: str, ok: bool, detail: str = ""):
+    print(f"[{'OK' if ok else 'FAIL'}] {label}{': ' + detail if detail else ''}")
+    if not ok:
+        raise SystemExit(1)
+
+def smoke(mode: str, n: int, keep: bool):
+    table = f"stg_smoke_{mode}"
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS dbo.{table}"))
+
+    rows = make_rows(n)
+    stats = load_staging_batches(batches(rows), table=table, truncate=True, mode=mode, key_column=KEY)
+    print(f"[LOAD] {table}: {stats.rows} rows in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s via {stats.mode})")
+    check("rows loaded", stats.rows == n, f"{stats.rows} of {n}")
+
+    with engine.begin() as conn:
+        r = conn.execute(text(
+            f"""
+                SELECT COUNT(*) AS total,
+                       SUM(CASE WHEN TRY_CONVERT(datetime2, printed_at) IS NOT NULL THEN 1 ELSE 0 END) AS datetimes,
+                       SUM(CASE WHEN TRY_CONVERT(date, print_date) IS NOT NULL THEN 1 ELSE 0 END) AS dates,
+                       SUM(CASE WHEN weight IS NULL THEN 1 ELSE 0 END) AS blank_weights,
+                       MAX(CASE WHEN {KEY} = 'k0' THEN mixed END) AS first_mixed,
+                       MAX(CASE WHEN {KEY} = :last THEN mixed END) AS last_mixed
+                FROM dbo.{table}
+            """
+        ), {"last": f"k{n - 1}"}).mappings().one()
+    check("row count", r["total"] == n, str(r["total"]))
+    check("datetimes parse", r["datetimes"] == n, str(r["datetimes"]))
+    check("dates parse", r["dates"] == n, str(r["dates"]))
+    check("blanks stay NULL", r["blank_weights"] == sum(1 for x in rows if x["weight"] is None))
+    check("int then text column", r["first_mixed"] == "0" and r["last_mixed"] == rows[-1]["mixed"],
+          f"{r['first_mixed']!r} / {r['last_mixed']!r}")
+
+    # Delta: first 10 rows changed, last 5 gone from the sheet
+    changed = [dict(x, note="changed") for x in rows[:10]]
+    vanished = [x[KEY] for x in rows[-5:]]
+    stats = load_staging_batches(
+        batches(changed), table=table, truncate=False, mode=mode,
+        key_column=KEY, replace_keys=True, deleted_keys=lambda: vanished
+    )
+    with engine.begin() as conn:
+        total, changed_rows = conn.execute(text(
+            f"SELECT COUNT(*), SUM(CASE WHEN note = 'changed' THEN 1 ELSE 0 END) FROM dbo.{table}"
+        )).one()
+        if not keep:
+            conn.execute(text(f"DROP TABLE dbo.{table}"))
+    check("delta replaced changed rows", changed_rows == 10 and stats.rows == 10, str(changed_rows))
+    check("delta deleted vanished rows", total == n - 5, str(total))
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Smoke-test the staging loader against a dev database.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--mode", choices=["auto", "executemany"], nargs="*", default=["auto", "executemany"])
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables for inspection.")
+    args = parser.parse_args()
+
+    for mode in args.mode:
+        smoke(mode, max(args.rows, BATCH_ROWS + 10), args.keep)
+
+
+if __name__ == "__main__":
+    main()
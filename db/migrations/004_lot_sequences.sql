@@ -0,0 +1,18 @@
+/* 004_lot_sequences.sql
+   Adds a per-lot counter table so product-code allocation no longer scans
+   product_tracking. Rows are created/advanced by dbo.AllocateLotSeqBlock
+   (postseed/40) and re-synced from existing product codes by postseed/50.
+*/
+
+IF OBJECT_ID('dbo.lot_sequences', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.lot_sequences (
+    lot_number NVARCHAR(50) NOT NULL,
+    last_seq INT NOT NULL CONSTRAINT DF_lot_sequences_last_seq DEFAULT (0),
+    updated_at DATETIME2 NOT NULL CONSTRAINT DF_lot_sequences_updated_at DEFAULT (SYSUTCDATETIME()),
+
+    CONSTRAINT PK_lot_sequences PRIMARY KEY (lot_number),
+    CONSTRAINT CK_lot_sequences_last_seq CHECK (last_seq BETWEEN 0 AND 9999)
+  );
+END
+GO
@@ -0,0 +1,39 @@
+/* 005_material_lot_usage_view.sql
+   Indexed (materialized) view of material_usage totals per material type + lot.
+   SQL Server maintains it inside the same transaction as every material_usage
+   INSERT/UPDATE/DELETE, so availability checks read one row per lot instead of
+   aggregating the full usage history.
+*/
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF OBJECT_ID('dbo.v_material_lot_usage', 'V') IS NULL
+BEGIN
+  EXEC('
+    CREATE VIEW dbo.v_material_lot_usage
+    WITH SCHEMABINDING
+    AS
+    SELECT
+      material_type,
+      lot_number,
+      SUM(used_quantity) AS used_quantity,
+      COUNT_BIG(*) AS usage_count
+    FROM dbo.material_usage
+    GROUP BY material_type, lot_number
+  ');
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'UX_v_material_lot_usage'
+    AND object_id = OBJECT_ID('dbo.v_material_lot_usage')
+)
+BEGIN
+  CREATE UNIQUE CLUSTERED INDEX UX_v_material_lot_usage
+  ON dbo.v_material_lot_usage(material_type, lot_number);
+END
+GO
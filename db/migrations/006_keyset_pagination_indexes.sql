@@ -0,0 +1,53 @@
+/* 006_keyset_pagination_indexes.sql
+   Supporting indexes for the keyset-paginated list queries. Each one matches the
+   (sort column, id) cursor the page functions seek on, so a page is an index
+   range scan instead of a full sort of the table.
+*/
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_product_harvest_print_date_id'
+    AND object_id = OBJECT_ID('dbo.product_harvest')
+)
+BEGIN
+  CREATE INDEX IX_product_harvest_print_date_id
+  ON dbo.product_harvest(print_date DESC, id DESC);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_audit_log_changed_at_id'
+    AND object_id = OBJECT_ID('dbo.audit_log')
+)
+BEGIN
+  CREATE INDEX IX_audit_log_changed_at_id
+  ON dbo.audit_log(changed_at DESC, id DESC);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_product_quality_control_inspected_at_id'
+    AND object_id = OBJECT_ID('dbo.product_quality_control')
+)
+BEGIN
+  CREATE INDEX IX_product_quality_control_inspected_at_id
+  ON dbo.product_quality_control(inspected_at DESC, id DESC);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_product_tracking_last_updated_at_id'
+    AND object_id = OBJECT_ID('dbo.product_tracking')
+)
+BEGIN
+  CREATE INDEX IX_product_tracking_last_updated_at_id
+  ON dbo.product_tracking(last_updated_at DESC, id DESC);
+END
+GO
@@ -0,0 +1,20 @@
+/* 007_sku_bom.sql
+   Bill of materials for bundle SKUs: one row per (parent, component) with the
+   quantity of the component in one parent. Components may themselves be bundles.
+   Shipment expansion reads the whole table once into the reference data cache.
+*/
+
+IF OBJECT_ID('dbo.sku_bom', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.sku_bom (
+    parent_sku_id INT NOT NULL,
+    component_sku_id INT NOT NULL,
+    component_qty INT NOT NULL CHECK (component_qty > 0),
+
+    CONSTRAINT pk_sku_bom PRIMARY KEY (parent_sku_id, component_sku_id),
+    CONSTRAINT fk_sku_bom_parent FOREIGN KEY (parent_sku_id) REFERENCES product_skus(id),
+    CONSTRAINT fk_sku_bom_component FOREIGN KEY (component_sku_id) REFERENCES product_skus(id),
+    CONSTRAINT ck_sku_bom_not_self CHECK (parent_sku_id <> component_sku_id)
+  );
+END
+GO
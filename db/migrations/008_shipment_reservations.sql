@@ -0,0 +1,37 @@
+/* 008_shipment_reservations.sql
+   Soft reservations of sellable units while a shipment is being built.
+   FIFO allocation skips units held by another holder until the hold expires,
+   so two people picking at once don't get the same units. Rows are cleared
+   when the shipment is created or the order is canceled; expired rows are
+   ignored and purged by the next allocation.
+*/
+
+IF OBJECT_ID('dbo.shipment_reservations', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.shipment_reservations (
+    product_tracking_id INT NOT NULL,
+    holder NVARCHAR(64) NOT NULL,
+    order_id INT NULL,
+    reserved_by INT NOT NULL,
+    reserved_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+    expires_at DATETIME2 NOT NULL,
+
+    CONSTRAINT pk_shipment_reservations PRIMARY KEY (product_tracking_id),
+    CONSTRAINT fk_shipres_product FOREIGN KEY (product_tracking_id) REFERENCES product_tracking(id),
+    CONSTRAINT fk_shipres_order FOREIGN KEY (order_id) REFERENCES orders(id),
+    CONSTRAINT fk_shipres_user FOREIGN KEY (reserved_by) REFERENCES users(id)
+  );
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_shipment_reservations_holder'
+    AND object_id = OBJECT_ID('dbo.shipment_reservations')
+)
+BEGIN
+  CREATE INDEX IX_shipment_reservations_holder
+  ON dbo.shipment_reservations(holder, expires_at);
+END
+GO
@@ -0,0 +1,42 @@
+/* 009_product_expires_at.sql
+   Persisted expiry date on product_tracking (print_date + 1 year), written at
+   harvest time, so the expiry review and sweeper seek an index on the tracking
+   table instead of joining product_harvest and filtering on print_date.
+   Existing rows are backfilled here in batches; rows written by other paths
+   (ETL) are backfilled by the sweeper.
+*/
+
+IF COL_LENGTH('dbo.product_tracking', 'expires_at') IS NULL
+BEGIN
+  ALTER TABLE dbo.product_tracking
+  ADD expires_at DATETIME2 NULL;
+END
+GO
+
+DECLARE @rows INT = 1;
+WHILE @rows > 0
+BEGIN
+  UPDATE TOP (5000) pt
+  SET expires_at = DATEADD(YEAR, 1, ph.print_date)
+  FROM dbo.product_tracking pt
+  JOIN dbo.product_harvest ph ON pt.harvest_id = ph.id
+  WHERE pt.expires_at IS NULL
+    AND ph.print_date IS NOT NULL;
+
+  SET @rows = @@ROWCOUNT;
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_product_tracking_expires_at'
+    AND object_id = OBJECT_ID('dbo.product_tracking')
+)
+BEGIN
+  CREATE INDEX IX_product_tracking_expires_at
+  ON dbo.product_tracking(expires_at)
+  INCLUDE (current_stage_id, sku_id, harvest_id)
+  WHERE expires_at IS NOT NULL;
+END
+GO
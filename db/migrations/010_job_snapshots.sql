@@ -0,0 +1,85 @@
+/* 010_job_snapshots.sql
+   Run log and result snapshots for the housekeeping jobs (streamlit_app/jobs).
+   Each job writes its findings for a run into its snapshot table and drops the
+   previous run's rows in the same transaction, so the UI reads one small,
+   consistent snapshot instead of scanning product_tracking on page load.
+*/
+
+IF OBJECT_ID('dbo.job_runs', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.job_runs (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    job_name NVARCHAR(64) NOT NULL,
+    triggered_by NVARCHAR(64) NOT NULL,
+    status NVARCHAR(20) NOT NULL DEFAULT 'Running',
+    started_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    finished_at DATETIME2 NULL,
+    rows_affected INT NULL,
+    error NVARCHAR(MAX) NULL,
+
+    CONSTRAINT chk_job_runs_status CHECK (status IN ('Running', 'Succeeded', 'Failed'))
+  );
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_job_runs_job_name_id'
+    AND object_id = OBJECT_ID('dbo.job_runs')
+)
+BEGIN
+  CREATE INDEX IX_job_runs_job_name_id
+  ON dbo.job_runs(job_name, id DESC)
+  INCLUDE (status, started_at, finished_at, rows_affected);
+END
+GO
+
+IF OBJECT_ID('dbo.job_shelf_stage_mismatches', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.job_shelf_stage_mismatches (
+    run_id INT NOT NULL,
+    product_tracking_id INT NOT NULL,
+    status_name NVARCHAR(100) NULL,
+    stage_code NVARCHAR(100) NOT NULL,
+    location_id INT NOT NULL,
+    location_name NVARCHAR(100) NOT NULL,
+    description NVARCHAR(255) NULL,
+
+    CONSTRAINT pk_job_shelf_stage_mismatches PRIMARY KEY (run_id, product_tracking_id),
+    CONSTRAINT fk_job_mismatch_run FOREIGN KEY (run_id) REFERENCES job_runs(id)
+  );
+END
+GO
+
+IF OBJECT_ID('dbo.job_low_filaments', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.job_low_filaments (
+    run_id INT NOT NULL,
+    mount_id INT NOT NULL,
+    serial_number NVARCHAR(100) NOT NULL,
+    remaining_weight DECIMAL(10, 2) NOT NULL,
+    printer_name NVARCHAR(100) NULL,
+
+    CONSTRAINT pk_job_low_filaments PRIMARY KEY (run_id, mount_id),
+    CONSTRAINT fk_job_low_filament_run FOREIGN KEY (run_id) REFERENCES job_runs(id)
+  );
+END
+GO
+
+IF OBJECT_ID('dbo.job_material_balance', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.job_material_balance (
+    run_id INT NOT NULL,
+    material_type NVARCHAR(50) NOT NULL,
+    lot_number NVARCHAR(100) NOT NULL,
+    received_qty DECIMAL(12, 2) NOT NULL,
+    used_qty DECIMAL(12, 2) NOT NULL,
+    on_hand_qty DECIMAL(12, 2) NOT NULL,
+    variance_qty DECIMAL(12, 2) NOT NULL,
+
+    CONSTRAINT pk_job_material_balance PRIMARY KEY (run_id, material_type, lot_number),
+    CONSTRAINT fk_job_material_balance_run FOREIGN KEY (run_id) REFERENCES job_runs(id)
+  );
+END
+GO
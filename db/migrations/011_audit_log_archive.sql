@@ -0,0 +1,85 @@
+/* 011_audit_log_archive.sql
+   Search indexes for audit_log and an archive tier for old history.
+
+   audit_log keeps the last AUDIT_LOG_HOT_MONTHS whole months (config); the
+   audit_log_rollover job moves older months, oldest first, into audit_log_archive
+   with their original ids. Searches read audit_log and only go to the archive
+   when asked (services/quality_management_services.get_audit_log_page).
+
+   IX_audit_log_changed_at_id (006) already serves pure time-window scans, so
+   there's no separate (changed_at) index.
+*/
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_audit_log_table_record_changed_at'
+    AND object_id = OBJECT_ID('dbo.audit_log')
+)
+BEGIN
+  CREATE INDEX IX_audit_log_table_record_changed_at
+  ON dbo.audit_log(table_name, record_id, changed_at DESC, id DESC);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_audit_log_changed_by_changed_at'
+    AND object_id = OBJECT_ID('dbo.audit_log')
+)
+BEGIN
+  CREATE INDEX IX_audit_log_changed_by_changed_at
+  ON dbo.audit_log(changed_by, changed_at DESC, id DESC);
+END
+GO
+
+IF OBJECT_ID('dbo.audit_log_archive', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.audit_log_archive (
+    id INT NOT NULL,
+    table_name NVARCHAR(100) NOT NULL,
+    record_id INT NOT NULL,
+    field_name NVARCHAR(100) NOT NULL,
+    old_value NVARCHAR(MAX) NULL,
+    new_value NVARCHAR(MAX) NULL,
+    reason NVARCHAR(255) NOT NULL,
+    changed_by INT NOT NULL,
+    changed_at DATETIME2 NOT NULL,
+    archived_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+
+    -- Clustered by (changed_at, id) below so time-window searches are range seeks
+    CONSTRAINT pk_audit_log_archive PRIMARY KEY NONCLUSTERED (id)
+  );
+
+  CREATE CLUSTERED INDEX CX_audit_log_archive_changed_at_id
+  ON dbo.audit_log_archive(changed_at DESC, id DESC)
+  WITH (DATA_COMPRESSION = PAGE);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_audit_log_archive_table_record_changed_at'
+    AND object_id = OBJECT_ID('dbo.audit_log_archive')
+)
+BEGIN
+  CREATE INDEX IX_audit_log_archive_table_record_changed_at
+  ON dbo.audit_log_archive(table_name, record_id, changed_at DESC, id DESC)
+  WITH (DATA_COMPRESSION = PAGE);
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_audit_log_archive_changed_by_changed_at'
+    AND object_id = OBJECT_ID('dbo.audit_log_archive')
+)
+BEGIN
+  CREATE INDEX IX_audit_log_archive_changed_by_changed_at
+  ON dbo.audit_log_archive(changed_by, changed_at DESC, id DESC)
+  WITH (DATA_COMPRESSION = PAGE);
+END
+GO
@@ -0,0 +1,76 @@
+/* 012_etl_row_state.sql
+   Row-level change tracking for the legacy Excel ETL (etl/one_run_etl.py).
+
+   Every staged row carries a stable key (etl_row_key on the staging table, built
+   from the sheet's key columns) and the SHA-256 of its values. A smart run stages
+   only rows whose hash changed, and flags their keys pending; the transforms read
+   their scope from db/postview/08_v_etl_pending_filaments.sql and
+   09_v_etl_pending_products.sql, and the flags are cleared once a full set of
+   transforms has succeeded.
+*/
+
+IF OBJECT_ID('dbo.etl_row_state', 'U') IS NULL
+BEGIN
+  CREATE TABLE dbo.etl_row_state (
+    table_name NVARCHAR(128) NOT NULL,
+    row_key NVARCHAR(450) NOT NULL,
+    row_hash BINARY(32) NOT NULL,
+    pending BIT NOT NULL DEFAULT 1,
+    first_seen_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    changed_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+
+    CONSTRAINT pk_etl_row_state PRIMARY KEY (table_name, row_key)
+  );
+END
+GO
+
+IF NOT EXISTS (
+  SELECT 1
+  FROM sys.indexes
+  WHERE name = 'IX_etl_row_state_pending'
+    AND object_id = OBJECT_ID('dbo.etl_row_state')
+)
+BEGIN
+  CREATE INDEX IX_etl_row_state_pending
+  ON dbo.etl_row_state(table_name, row_key)
+  WHERE pending = 1;
+END
+GO
+
+/* Row key column on the staging tables that already exist, so the pending views
+   (db/postview/08, 09) compile before the ETL has run with delta support. The ETL
+   adds the same column/index to staging tables it creates or meets without one. */
+DECLARE @staging TABLE (table_name SYSNAME PRIMARY KEY);
+INSERT INTO @staging (table_name)
+VALUES (N'stg_excel_data'), (N'stg_filament_excel_data'), (N'stg_treatment_excel_data'), (N'stg_vcid_excel_data');
+
+DECLARE @table SYSNAME, @sql NVARCHAR(MAX);
+DECLARE staging_cursor CURSOR LOCAL FAST_FORWARD FOR
+  SELECT table_name FROM @staging WHERE OBJECT_ID(N'dbo.' + table_name, 'U') IS NOT NULL;
+OPEN staging_cursor;
+FETCH NEXT FROM staging_cursor INTO @table;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+  IF COL_LENGTH(N'dbo.' + @table, 'etl_row_key') IS NULL
+  BEGIN
+    SET @sql = N'ALTER TABLE dbo.' + QUOTENAME(@table) + N' ADD etl_row_key NVARCHAR(450) NULL;';
+    EXEC sp_executesql @sql;
+  END
+
+  IF NOT EXISTS (
+    SELECT 1
+    FROM sys.indexes
+    WHERE name = N'IX_' + @table + N'_etl_row_key'
+      AND object_id = OBJECT_ID(N'dbo.' + @table)
+  )
+  BEGIN
+    SET @sql = N'CREATE INDEX ' + QUOTENAME(N'IX_' + @table + N'_etl_row_key')
+             + N' ON dbo.' + QUOTENAME(@table) + N'(etl_row_key);';
+    EXEC sp_executesql @sql;
+  END
+
+  FETCH NEXT FROM staging_cursor INTO @table;
+END
+CLOSE staging_cursor;
+DEALLOCATE staging_cursor;
+GO
@@ -1,43 +1,72 @@
 /* 40_allocate_next_seq_for_lot.sql
-   Returns next SSSS for a given YYCC lot_number prefix, safely under concurrency.
+   Reserves a contiguous block of SSSS values for a given YYCC lot_number prefix,
+   safely under concurrency, using the dbo.lot_sequences counter (migration 004).
+
+   The first allocation for a lot seeds the counter from any product codes that
+   already exist for it; every later allocation is a single keyed row update.
 */
 
-CREATE OR ALTER PROCEDURE dbo.AllocateNextSeqForLot
-  @lot_number NVARCHAR(50)
+CREATE OR ALTER PROCEDURE dbo.AllocateLotSeqBlock
+  @lot_number NVARCHAR(50),
+  @count INT = 1
 AS
 BEGIN
   SET NOCOUNT ON;
   SET XACT_ABORT ON;
 
-  DECLARE @lock_result INT;
-  DECLARE @resource NVARCHAR(255);
-  DECLARE @next INT;
-
-  SET @resource = 'LOTSEQ:' + @lot_number;
+  IF @count IS NULL OR @count < 1
+    THROW 50011, 'Block size must be at least 1', 1;
 
-  BEGIN TRAN;
+  DECLARE @base INT = 0;
+  DECLARE @current INT;
+  DECLARE @allocated TABLE (last_seq INT NOT NULL);
 
-  -- Lock per lot number so two users can't allocate the same SSSS concurrently
-  EXEC @lock_result = sp_getapplock
-      @Resource = @resource,
-      @LockMode = 'Exclusive',
-      @LockOwner = 'Transaction',
-      @LockTimeout = 10000;
+  -- UPDLOCK/HOLDLOCK keeps the counter (or the gap where it will go) locked until
+  -- the MERGE below, so the bound check cannot race a concurrent allocation
+  SELECT @current = last_seq
+  FROM dbo.lot_sequences WITH (UPDLOCK, HOLDLOCK)
+  WHERE lot_number = @lot_number;
 
-  IF @lock_result < 0
+  IF @current IS NULL
   BEGIN
-      ROLLBACK;
-      THROW 50010, 'Failed to acquire lot sequence lock', 1;
+    SELECT @base = ISNULL(MAX(TRY_CAST(RIGHT(product_code, 4) AS INT)), 0)
+    FROM dbo.product_tracking
+    WHERE product_code LIKE @lot_number + '____';
   END
 
-  -- Find current max SSSS for this lot_number prefix, then +1
-  SELECT @next =
-      ISNULL(MAX(TRY_CAST(RIGHT(product_code, 4) AS INT)), 0) + 1
-  FROM dbo.product_tracking
-  WHERE product_code LIKE @lot_number + '____';
+  -- SSSS is four digits (CK_lot_sequences_last_seq); fail with a readable error
+  -- instead of the CHECK violation
+  IF ISNULL(@current, @base) + @count > 9999
+    THROW 50012, 'Lot has no free product codes left (max 9999).', 1;
+
+  -- HOLDLOCK serializes concurrent first allocations for the same lot;
+  -- the row lock is held until the caller's transaction ends
+  MERGE dbo.lot_sequences WITH (HOLDLOCK) AS tgt
+  USING (SELECT @lot_number AS lot_number) AS src
+    ON tgt.lot_number = src.lot_number
+  WHEN MATCHED THEN
+    UPDATE SET last_seq = tgt.last_seq + @count, updated_at = SYSUTCDATETIME()
+  WHEN NOT MATCHED THEN
+    INSERT (lot_number, last_seq) VALUES (@lot_number, @base + @count)
+  OUTPUT inserted.last_seq INTO @allocated;
+
+  SELECT last_seq - @count + 1 AS first_seq, last_seq
+  FROM @allocated;
+END
+GO
+
+/* Kept for callers that allocate one code at a time */
+CREATE OR ALTER PROCEDURE dbo.AllocateNextSeqForLot
+  @lot_number NVARCHAR(50)
+AS
+BEGIN
+  SET NOCOUNT ON;
+
+  DECLARE @block TABLE (first_seq INT, last_seq INT);
 
-  COMMIT;
+  INSERT INTO @block (first_seq, last_seq)
+  EXEC dbo.AllocateLotSeqBlock @lot_number = @lot_number, @count = 1;
 
-  SELECT @next AS item_seq;
+  SELECT first_seq AS item_seq FROM @block;
 END
 GO
@@ -0,0 +1,23 @@
+/* 50_sync_lot_sequences.sql
+   Brings dbo.lot_sequences up to the highest SSSS already used per lot
+   (e.g. after an ETL load wrote product codes directly). Never moves a counter backwards.
+*/
+
+SET NOCOUNT ON;
+
+;WITH used AS (
+  SELECT
+    LEFT(product_code, LEN(product_code) - 4) AS lot_number,
+    MAX(TRY_CAST(RIGHT(product_code, 4) AS INT)) AS max_seq
+  FROM dbo.product_tracking
+  WHERE product_code IS NOT NULL
+    AND LEN(product_code) > 4
+  GROUP BY LEFT(product_code, LEN(product_code) - 4)
+)
+MERGE dbo.lot_sequences WITH (HOLDLOCK) AS tgt
+USING (SELECT lot_number, max_seq FROM used WHERE max_seq IS NOT NULL) AS src
+  ON tgt.lot_number = src.lot_number
+WHEN MATCHED AND tgt.last_seq < src.max_seq THEN
+  UPDATE SET last_seq = src.max_seq, updated_at = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+  INSERT (lot_number, last_seq) VALUES (src.lot_number, src.max_seq);
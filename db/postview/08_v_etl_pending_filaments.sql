@@ -0,0 +1,30 @@
+CREATE OR ALTER VIEW dbo.vw_etl_pending_filaments
+AS
+/* Legacy filament ids the filament transforms must (re)process: filament rows whose
+   staged values changed, plus every filament a changed product row points at.
+   A full transform (one_run_etl without --smart, or --full-transform) sets
+   SESSION_CONTEXT etl_full_transform = 1 and gets every staged filament. */
+SELECT TRY_CAST(fe.filament_id AS BIGINT) AS filament_id
+FROM dbo.stg_filament_excel_data fe
+JOIN dbo.etl_row_state r
+  ON r.table_name = N'stg_filament_excel_data'
+ AND r.row_key    = fe.etl_row_key
+ AND r.pending    = 1
+WHERE TRY_CAST(fe.filament_id AS BIGINT) IS NOT NULL
+
+UNION
+
+SELECT TRY_CAST(sed.filament_id AS BIGINT)
+FROM dbo.stg_excel_data sed
+JOIN dbo.etl_row_state r
+  ON r.table_name = N'stg_excel_data'
+ AND r.row_key    = sed.etl_row_key
+ AND r.pending    = 1
+WHERE TRY_CAST(sed.filament_id AS BIGINT) IS NOT NULL
+
+UNION
+
+SELECT TRY_CAST(fe.filament_id AS BIGINT)
+FROM dbo.stg_filament_excel_data fe
+WHERE CAST(SESSION_CONTEXT(N'etl_full_transform') AS INT) = 1
+  AND TRY_CAST(fe.filament_id AS BIGINT) IS NOT NULL;
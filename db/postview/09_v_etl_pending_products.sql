@@ -0,0 +1,28 @@
+CREATE OR ALTER VIEW dbo.vw_etl_pending_products
+AS
+/* Legacy product ids the product transforms must (re)process: product rows whose
+   staged values changed, plus products printed from a pending filament (they may
+   only now resolve to a filament/mounting). A full transform (SESSION_CONTEXT
+   etl_full_transform = 1) gets every staged product. */
+SELECT TRY_CAST(sed.product_id AS BIGINT) AS product_id
+FROM dbo.stg_excel_data sed
+JOIN dbo.etl_row_state r
+  ON r.table_name = N'stg_excel_data'
+ AND r.row_key    = sed.etl_row_key
+ AND r.pending    = 1
+WHERE TRY_CAST(sed.product_id AS BIGINT) IS NOT NULL
+
+UNION
+
+SELECT TRY_CAST(sed.product_id AS BIGINT)
+FROM dbo.stg_excel_data sed
+JOIN dbo.vw_etl_pending_filaments pf
+  ON pf.filament_id = TRY_CAST(sed.filament_id AS BIGINT)
+WHERE TRY_CAST(sed.product_id AS BIGINT) IS NOT NULL
+
+UNION
+
+SELECT TRY_CAST(sed.product_id AS BIGINT)
+FROM dbo.stg_excel_data sed
+WHERE CAST(SESSION_CONTEXT(N'etl_full_transform') AS INT) = 1
+  AND TRY_CAST(sed.product_id AS BIGINT) IS NOT NULL;
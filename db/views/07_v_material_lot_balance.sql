@@ -0,0 +1,35 @@
+/* Remaining quantity per usable material lot:
+   - Filament: grams left on active mounts of QC-passed filament
+   - Lid/Seal: batch quantity minus units already used (from the indexed v_material_lot_usage)
+*/
+CREATE OR ALTER VIEW v_material_lot_balance AS
+SELECT
+    'Filament' AS material_type,
+    f.lot_number,
+    CAST(SUM(fm.remaining_weight) AS DECIMAL(12, 2)) AS remaining_qty
+FROM filament_mounting fm
+JOIN filaments f ON fm.filament_tracking_id = f.id
+WHERE fm.status = 'In Use' AND f.qc_result = 'PASS'
+GROUP BY f.lot_number
+
+UNION ALL
+
+SELECT
+    'Lid' AS material_type,
+    l.serial_number AS lot_number,
+    CAST(l.quantity - ISNULL(u.usage_count, 0) AS DECIMAL(12, 2)) AS remaining_qty
+FROM lids l
+LEFT JOIN dbo.v_material_lot_usage u WITH (NOEXPAND)
+    ON u.material_type = 'Lid' AND u.lot_number = l.serial_number
+WHERE l.qc_result = 'PASS'
+
+UNION ALL
+
+SELECT
+    'Seal' AS material_type,
+    s.serial_number AS lot_number,
+    CAST(s.quantity - ISNULL(u.usage_count, 0) AS DECIMAL(12, 2)) AS remaining_qty
+FROM seals s
+LEFT JOIN dbo.v_material_lot_usage u WITH (NOEXPAND)
+    ON u.material_type = 'Seal' AND u.lot_number = s.serial_number
+WHERE s.qc_result = 'PASS';
@@ -1,30 +1,24 @@
 from __future__ import annotations
+from typing import Iterator
 import pandas as pd
 from openpyxl import load_workbook
-from openpyxl.utils.cell import column_index_from_string, get_column_letter
+from openpyxl.utils.cell import column_index_from_string
 
-def _excel_used_range(path: str, sheet_name: str, start_cell: str):
-    wb = load_workbook(path, data_only=True, read_only=True, keep_vba=True)
-    ws = wb[sheet_name]
+# Rows per DataFrame yielded by iter_table_batches (and per INSERT batch in the loader)
+BATCH_ROWS = 5_000
 
+# Cell texts pandas.read_excel reads as missing (its default na_values), plus Excel
+# error values, which it also turns into NaN. Kept so staged data matches earlier runs.
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+EXCEL_ERRORS = {"#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#NULL!", "#GETTING_DATA"}
+
+def _split_cell(start_cell: str) -> tuple[int, int]:
     col_letters = ''.join(ch for ch in start_cell if ch.isalpha()).upper()
     row_digits = ''.join(ch for ch in start_cell if ch.isdigit())
-    start_row = int(row_digits)
-    start_col = column_index_from_string(col_letters)
-
-    last_row = start_row
-    last_col = start_col 
-
-    for r in ws.iter_rows(min_row=start_row, min_col=start_col, values_only=True):
-        if any(v not in (None, "") for v in r):
-            last_row += 1
-            for idx, v in enumerate(r, start=start_col):
-                if v not in (None, "") and idx > last_col:
-                    last_col = idx
-    
-    last_row = max(last_row - 1, start_row)
-
-    return start_row, start_col, last_row, last_col
+    return int(row_digits), column_index_from_string(col_letters)
 
 def _normalize_col_name(s: str) -> str:
     return(
@@ -39,55 +33,94 @@ def _normalize_col_name(s: str) -> str:
         .replace("]", "")
     )
 
-def read_table_from_excel(path: str, sheet_name: str, start_cell: str="D12", normalize_headers: bool = True) -> pd.DataFrame:
-    sr, sc, er, ec = _excel_used_range(path, sheet_name, start_cell)
-
-    start_col_letter = get_column_letter(sc)
-    end_col_letter = get_column_letter(ec)
-    usecols = f"{start_col_letter}:{end_col_letter}"
-
-    header_row_index = sr - 1
-
-    nrows = er - (sr - 1)
-    if nrows < 1:
-        raise ValueError(
-            f"Computed nrows < 1 (sr={sr}, er={er}). Check sheet '{sheet_name}' and start_cell '{start_cell}'."
-        )
-    
-    df = pd.read_excel(
-        path,
-        sheet_name=sheet_name,
-        engine="openpyxl",
-        header=header_row_index,
-        usecols=usecols,
-        nrows=nrows
-    )
-
-    df = df.dropna(how="all")
-    df = df.loc[:, ~df.columns.astype(str).str.startswith("Unnamed")]
-    df.columns = [str(c).strip() for c in df.columns]
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [" ".join(str(x) for x in tup if str(x) != "nan").strip() for tup in df.columns]
-
+def _dedupe(names):
+    seen = {}
+    out = []
+    for name in names:
+        if name not in seen:
+            seen[name] = 0
+            out.append(name)
+        else:
+            seen[name] += 1
+            out.append(f"{name}_{seen[name]}")
+
+    return out
+
+def _mangle_duplicates(names: list[str]) -> list[str]:
+    """Repeated header texts become "name.1", "name.2", ... exactly as pandas.read_excel names them."""
+    counts: dict[str, int] = {}
+    out = []
+    for name in names:
+        cur_count = counts.get(name, 0)
+        while cur_count > 0:
+            counts[name] = cur_count + 1
+            name = f"{name}.{cur_count}"
+            cur_count = counts.get(name, 0)
+        out.append(name)
+        counts[name] = cur_count + 1
+    return out
+
+def _table_columns(header: tuple, normalize_headers: bool) -> tuple[list[int], list[str]]:
+    """Positions and final names of the header cells that have a title (untitled columns are dropped)."""
+    positions = [i for i, v in enumerate(header) if v is not None and str(v) != ""]
+    names = _mangle_duplicates([str(header[i]) for i in positions])
+    names = [n.strip() for n in names]
     if normalize_headers:
-        df.columns = [_normalize_col_name(c) for c in df.columns]
-
-    def _dedupe(names):
-        seen = {}
-        out = []
-        for name in names:
-            if name not in seen:
-                seen[name] = 0
-                out.append(name)
-            else:
-                seen[name] += 1
-                out.append(f"{name}_{seen[name]}")
-        
-        return out
-
-    orig_cols = list(df.columns)
-    df.columns = _dedupe(df.columns)
-
-    assert df.columns.is_unique, "Column names are still not unique after de-duplication."
-    return df
+        names = [_normalize_col_name(n) for n in names]
+    names = _dedupe(names)
+
+    assert len(set(names)) == len(names), "Column names are still not unique after de-duplication."
+    return positions, names
+
+def _cell_value(v):
+    if isinstance(v, str):
+        return None if v in NA_STRINGS or v in EXCEL_ERRORS else v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+def iter_table_batches(
+    path: str,
+    sheet_name: str,
+    start_cell: str = "D12",
+    normalize_headers: bool = True,
+    batch_rows: int = BATCH_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the table whose header row starts at `start_cell` as DataFrames of at
+    most `batch_rows` rows, reading the workbook row by row in read-only mode so
+    memory stays flat whatever the sheet size. Cells keep the types openpyxl gives
+    them (numbers, datetimes, text); blank rows and untitled columns are skipped.
+    Every batch has the same columns. Yields nothing if the table has no data rows.
+    """
+    start_row, start_col = _split_cell(start_cell)
+    wb = load_workbook(path, data_only=True, read_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(min_row=start_row, min_col=start_col, values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions, columns = _table_columns(header, normalize_headers)
+        if not columns:
+            raise ValueError(f"No header found in sheet '{sheet_name}' at '{start_cell}'.")
+
+        batch = []
+        for row in rows:
+            values = [_cell_value(row[i]) if i < len(row) else None for i in positions]
+            if all(v is None for v in values):
+                continue
+            batch.append(values)
+            if len(batch) >= batch_rows:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        wb.close()
 
+def read_table_from_excel(path: str, sheet_name: str, start_cell: str="D12", normalize_headers: bool = True) -> pd.DataFrame:
+    """The whole table as one DataFrame (previews and ad-hoc use; the ETL streams iter_table_batches)."""
+    batches = list(iter_table_batches(path, sheet_name, start_cell, normalize_headers))
+    if not batches:
+        raise ValueError(f"No data rows in sheet '{sheet_name}' below '{start_cell}'.")
+    return pd.concat(batches, ignore_index=True)
@@ -6,12 +6,22 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
     
 import os 
+import json
 import struct
+import time
 import pyodbc
 import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable
 from sqlalchemy import create_engine, text 
+from sqlalchemy.exc import DBAPIError
 from streamlit_app.config import SQLALCHEMY_URL
 
+# "auto": one INSERT ... SELECT FROM OPENJSON per batch, falling back to fast_executemany
+# if the server rejects it; "executemany": always fast_executemany
+STAGING_LOAD_MODE = os.getenv("ETL_STAGING_LOAD_MODE", "auto")
+
 def make_mssql_engine():
     """
     Creates a SQLAlchemy engine.
@@ -96,29 +106,254 @@ def make_mssql_engine():
     
     # return create_engine(conn_str, fast_executemany=True, pool_pre_ping=True)
 
+@lru_cache(maxsize=1)
+def get_engine():
+    """The run's engine: every sheet and transform borrows connections from its one pool."""
+    return make_mssql_engine()
+
+
+# ---------- Staging tables ----------
+
+@dataclass
+class StagingColumn:
+    name: str
+    data_type: str
+    max_length: int | None = None
+    precision: int | None = None
+    scale: int | None = None
+    datetime_precision: int | None = None
+
+    @property
+    def quoted(self) -> str:
+        return "[" + self.name.replace("]", "]]") + "]"
+
+    @property
+    def sql_type(self) -> str:
+        t = self.data_type.upper()
+        if t in ("NVARCHAR", "VARCHAR", "NCHAR", "CHAR", "VARBINARY", "BINARY"):
+            return f"{t}({'MAX' if self.max_length in (None, -1) else self.max_length})"
+        if t in ("DECIMAL", "NUMERIC"):
+            return f"{t}({self.precision},{self.scale})"
+        if t in ("DATETIME2", "TIME", "DATETIMEOFFSET") and self.datetime_precision is not None:
+            return f"{t}({self.datetime_precision})"
+        return t
+
+    @property
+    def json_type(self) -> str:
+        """Type to parse the JSON value as; legacy DATETIME columns parse via DATETIME2 so ISO microseconds round instead of failing."""
+        if self.data_type.lower() in ("datetime", "smalldatetime"):
+            return "DATETIME2"
+        if self.data_type.lower() in ("text", "ntext"):
+            return "NVARCHAR(MAX)"
+        return self.sql_type
+
+    @property
+    def input_size(self) -> tuple | None:
+        """pyodbc setinputsizes entry, so fast_executemany binds the table's type instead of guessing per batch."""
+        t = self.data_type.lower()
+        if t in ("nvarchar", "nchar", "ntext"):
+            return (pyodbc.SQL_WVARCHAR, 0 if self.max_length in (None, -1) or t == "ntext" else self.max_length, 0)
+        if t in ("varchar", "char", "text"):
+            return (pyodbc.SQL_VARCHAR, 0 if self.max_length in (None, -1) or t == "text" else self.max_length, 0)
+        if t in ("decimal", "numeric"):
+            return (pyodbc.SQL_DECIMAL, self.precision, self.scale)
+        if t in ("datetime", "datetime2", "smalldatetime"):
+            digits = 3 if t == "datetime" else 0 if t == "smalldatetime" else (self.datetime_precision or 0)
+            return (pyodbc.SQL_TYPE_TIMESTAMP, 20 + digits if digits else 19, digits)
+        simple = {
+            "bigint": pyodbc.SQL_BIGINT,
+            "int": pyodbc.SQL_INTEGER,
+            "smallint": pyodbc.SQL_SMALLINT,
+            "tinyint": pyodbc.SQL_TINYINT,
+            "bit": pyodbc.SQL_BIT,
+            "float": pyodbc.SQL_DOUBLE,
+            "real": pyodbc.SQL_REAL,
+            "date": pyodbc.SQL_TYPE_DATE,
+        }
+        return (simple[t], 0, 0) if t in simple else None
+
+
+def _staging_columns(conn, schema: str, table: str) -> list[StagingColumn]:
+    rows = conn.execute(text(
+        """
+            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, DATETIME_PRECISION
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table
+            ORDER BY ORDINAL_POSITION
+        """
+    ), {"schema": schema, "table": table}).fetchall()
+    return [StagingColumn(*r) for r in rows]
+
+def _create_staging_table(conn, schema: str, table: str, df: pd.DataFrame, key_column: str | None) -> list[StagingColumn]:
+    """
+    New staging columns are NVARCHAR(MAX) (the row key NVARCHAR(450)): batches arrive
+    one at a time, so a type guessed from the first one can break on a later batch,
+    and the transforms TRY_CAST/TRY_CONVERT every staged value anyway.
+    """
+    columns = [
+        StagingColumn(name, "nvarchar", max_length=450 if name == key_column else -1)
+        for name in df.columns
+    ]
+    conn.execute(text(
+        f"CREATE TABLE {schema}.{table} (" + ", ".join(f"{c.quoted} {c.sql_type} NULL" for c in columns) + ")"
+    ))
+    if key_column:
+        _index_key_column(conn, schema, table, key_column)
+    return columns
+
+def _index_key_column(conn, schema: str, table: str, key_column: str):
+    conn.execute(text(f"CREATE INDEX IX_{table}_{key_column} ON {schema}.{table}({key_column})"))
+
+def _add_key_column(conn, schema: str, table: str, key_column: str) -> list[StagingColumn]:
+    """Adds the row key column to a staging table created before delta loads existed."""
+    conn.execute(text(f"ALTER TABLE {schema}.{table} ADD {key_column} NVARCHAR(450) NULL"))
+    _index_key_column(conn, schema, table, key_column)
+    return _staging_columns(conn, schema, table)
+
+def _delete_keys(conn, schema: str, table: str, key_column: str, keys: Iterable[str]):
+    """Deletes the staging rows with these row keys (sent once through a #temp table)."""
+    keys = [(k,) for k in set(keys)]
+    if not keys:
+        return
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(
+            "IF OBJECT_ID('tempdb..#etl_keys') IS NULL CREATE TABLE #etl_keys (row_key NVARCHAR(450) PRIMARY KEY); "
+            "ELSE TRUNCATE TABLE #etl_keys;"
+        )
+        cursor.fast_executemany = True
+        cursor.setinputsizes([(pyodbc.SQL_WVARCHAR, 450, 0)])
+        cursor.executemany("INSERT INTO #etl_keys (row_key) VALUES (?)", keys)
+        cursor.execute(f"DELETE s FROM {schema}.{table} s JOIN #etl_keys k ON k.row_key = s.{key_column}")
+    finally:
+        cursor.close()
+
+def _batch_rows(df: pd.DataFrame, columns: list[StagingColumn]) -> list[tuple]:
+    """
+    Batch values in table column order as plain Python objects, NaN/NaT as None.
+    Values bound to character columns are sent as text (dates in ISO 8601), so both
+    insert paths store the same strings.
+    """
+    by_name = df[[c.name for c in columns if c.name in df.columns]]
+    if len(by_name.columns) != len(columns):
+        missing = sorted({c.name for c in columns} - set(df.columns))
+        raise ValueError(f"Staging batch is missing columns {missing}.")
+    values = by_name.astype(object).where(by_name.notna(), None)
+    for c in columns:
+        if c.data_type.lower() in ("nvarchar", "varchar", "nchar", "char", "ntext", "text"):
+            values[c.name] = values[c.name].map(lambda v: v if v is None or isinstance(v, str) else json_value(v))
+    return list(values.itertuples(index=False, name=None))
+
+def json_value(v):
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+
+# ---------- Insert paths ----------
+
+def _insert_openjson(conn, schema: str, table: str, columns: list[StagingColumn], rows: list[tuple]):
+    """Whole batch in one round trip: the rows travel as one JSON array and are typed by OPENJSON ... WITH."""
+    col_list = ", ".join(c.quoted for c in columns)
+    with_list = ", ".join(f"{c.quoted} {c.json_type} '$[{i}]'" for i, c in enumerate(columns))
+    payload = json.dumps(rows, default=json_value, allow_nan=False)
+    conn.exec_driver_sql(
+        f"INSERT INTO {schema}.{table} WITH (TABLOCK) ({col_list}) "
+        f"SELECT {col_list} FROM OPENJSON(?) WITH ({with_list})",
+        (payload,),
+    )
+
+def _insert_executemany(conn, schema: str, table: str, columns: list[StagingColumn], rows: list[tuple]):
+    col_list = ", ".join(c.quoted for c in columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.fast_executemany = True
+        cursor.setinputsizes([c.input_size for c in columns])
+        cursor.executemany(
+            f"INSERT INTO {schema}.{table} ({col_list}) VALUES ({', '.join('?' for _ in columns)})",
+            rows,
+        )
+    finally:
+        cursor.close()
+
+
+@dataclass
+class LoadStats:
+    rows: int = 0
+    seconds: float = 0.0
+    mode: str = ""
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+def load_staging_batches(
+        batches: Iterable[pd.DataFrame],
+        table: str = "stg_excel_data",
+        schema: str = "dbo",
+        truncate: bool = True,
+        mode: str = STAGING_LOAD_MODE,
+        key_column: str | None = None,
+        replace_keys: bool = False,
+        deleted_keys: Callable[[], Iterable[str]] | None = None
+) -> LoadStats:
+    """
+    Streams DataFrame batches into a staging table in one transaction (the truncate
+    too) on the run's shared engine. Values are bound with the table's own column
+    types (a missing table is created from the first batch with explicit types).
+
+    mode "auto" sends each batch as one INSERT ... SELECT FROM OPENJSON; if the
+    server rejects that (e.g. compatibility level below 130) the batch is retried,
+    and the rest of the sheet loaded, with pyodbc fast_executemany.
+
+    Delta loads (etl/row_state.py) pass the batches' row key column: with
+    replace_keys, staged rows with a batch's keys are deleted before it is inserted,
+    and the keys deleted_keys() returns once the batches are exhausted are removed.
+    Returns rows loaded, seconds spent writing and the insert path used.
+    """
+    stats = LoadStats(mode="openjson" if mode == "auto" else "executemany")
+    with get_engine().begin() as conn:
+        columns = None
+        for df in batches:
+            started = time.perf_counter()
+            if columns is None:
+                columns = _staging_columns(conn, schema, table)
+                if not columns:
+                    columns = _create_staging_table(conn, schema, table, df, key_column)
+                else:
+                    if key_column and key_column not in {c.name for c in columns}:
+                        columns = _add_key_column(conn, schema, table, key_column)
+                    if truncate:
+                        conn.execute(text(f"TRUNCATE TABLE {schema}.{table};"))
+            rows = _batch_rows(df, columns)
+            if replace_keys:
+                _delete_keys(conn, schema, table, key_column, df[key_column])
+
+            if stats.mode == "openjson":
+                savepoint = conn.begin_nested()
+                try:
+                    _insert_openjson(conn, schema, table, columns, rows)
+                    savepoint.commit()
+                except (DBAPIError, ValueError) as e:
+                    savepoint.rollback()
+                    print(f"[WARN] OPENJSON load into {table} failed, using fast_executemany: {e}")
+                    stats.mode = "executemany"
+            if stats.mode == "executemany":
+                _insert_executemany(conn, schema, table, columns, rows)
+
+            stats.rows += len(rows)
+            stats.seconds += time.perf_counter() - started
+
+        if deleted_keys is not None:
+            started = time.perf_counter()
+            _delete_keys(conn, schema, table, key_column, deleted_keys())
+            stats.seconds += time.perf_counter() - started
+    return stats
+
 def load_staging(
         df: pd.DataFrame,
         table: str = "stg_excel_data",
         schema: str = "dbo",
-        truncate: bool = True,
-        chunksize: int = 5_000
-):
+        truncate: bool = True
+) -> LoadStats:
     if df is None or df.empty:
         raise ValueError("load_staging: DataFrame is empty.")
-    
-    eng = make_mssql_engine()
-    with eng.begin() as conn:
-        if truncate:
-            conn.execute(text(
-                f"IF OBJECT_ID('{schema}.{table}', 'U') IS NOT NULL "
-                f"TRUNCATE TABLE {schema}.{table};"
-            ))
-        df.to_sql(
-            name=table,
-            con=conn,
-            schema=schema,
-            if_exists="append",
-            index=False,
-            chunksize=chunksize,
-            method=None,
-        )
\ No newline at end of file
+    return load_staging_batches([df], table=table, schema=schema, truncate=truncate)
@@ -1,25 +1,23 @@
 from __future__ import annotations
 from pathlib import Path
-import argparse, hashlib, json, os
+import argparse, itertools, os, time
 from dotenv import load_dotenv
 from sqlalchemy import text
 
-from extract_from_excel import read_table_from_excel
-from load_to_sql import load_staging, make_mssql_engine
-
-CACHE_PATH = Path("etl/.sheet_cache.json")
-
-def sha256_df(df) -> str:
-    return hashlib.sha256(df.to_csv(index=False).encode("utf-8")).hexdigest()
-
-def load_cache() -> dict:
-    if CACHE_PATH.exists():
-        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
-    return {}
-
-def save_cache(cache: dict) -> None:
-    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+from extract_from_excel import iter_table_batches
+from load_to_sql import load_staging_batches, get_engine
+from row_state import (
+    ROW_KEY_COLUMN, RowTracker, load_row_state, save_row_state,
+    pending_rows, clear_pending
+)
+
+# Key columns that identify a row of each sheet across runs (empty: keyed by content hash)
+ROW_KEYS = {
+    "stg_excel_data":           ("product_id",),
+    "stg_filament_excel_data":  ("filament_id",),
+    "stg_treatment_excel_data": ("treatment_id",),
+    "stg_vcid_excel_data":      (),
+}
 
 def stage_sheet(path: Path, sheet_name: str, start_cell: str, table: str,
                 do_truncate: bool, smart: bool, only: set[str] | None):
@@ -28,32 +26,48 @@ def stage_sheet(path: Path, sheet_name: str, start_cell: str, table: str,
         return
 
     print(f"[EXTRACT] {sheet_name} @{start_cell} -> {table}")
-    df = read_table_from_excel(path, sheet_name=sheet_name, start_cell=start_cell)
-    if df.empty:
+    batches = iter_table_batches(path, sheet_name=sheet_name, start_cell=start_cell)
+    first = next(batches, None)
+    if first is None:
         print(f"[WARN] {sheet_name} produced 0 rows; skipping stage.")
         return
 
-    cache = load_cache()
-    new_hash = sha256_df(df)
-    old_hash = cache.get(label)
-    if smart and old_hash == new_hash:
-        print(f"[SKIP] {table}: unchanged (smart cache).")
-        return
-
-    load_staging(df, table=table, schema="dbo", truncate=do_truncate)
-    print(f"[STAGED] {table}: {len(df)} rows. truncate={do_truncate}")
-    cache[label] = new_hash
-    save_cache(cache)
-
-def run_transform(sql_path: Path, label: str, only: set[str] | None):
+    # Delta only once the table and its row state exist; otherwise a full reload seeds them
+    known = load_row_state(table) if smart else None
+    delta = bool(known)
+    tracker = RowTracker(table, ROW_KEYS.get(table, ()), known)
+
+    started = time.perf_counter()
+    stats = load_staging_batches(
+        tracker.changed_batches(itertools.chain([first], batches)),
+        table=table, schema="dbo", truncate=do_truncate and not delta,
+        key_column=ROW_KEY_COLUMN, replace_keys=delta,
+        deleted_keys=(lambda: tracker.vanished) if delta else None
+    )
+    save_row_state(tracker, full=not delta)
+    total_s = time.perf_counter() - started
+    deleted = len(tracker.vanished) if delta else 0
+    print(
+        f"[STAGED] {table}: {stats.rows} of {len(tracker.seen)} rows, {deleted} deleted. "
+        f"{'delta' if delta else f'truncate={do_truncate}'} | "
+        f"load {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s via {stats.mode}), "
+        f"extract+load {total_s:.2f}s ({len(tracker.seen) / total_s if total_s else 0:,.0f} rows/s)"
+    )
+
+def run_transform(sql_path: Path, label: str, only: set[str] | None, full: bool = True):
+    """
+    Runs one SQL file in its own transaction. `full` is exposed to the pending views
+    as SESSION_CONTEXT etl_full_transform: every staged id is in scope, not just the
+    ones changed by a --smart load. Set on each run since pooled connections keep it.
+    """
     if only and label not in only:
         return
     if not sql_path.exists():
         print(f"[SKIP] {label}: {sql_path} not found.")
         return
     sql = sql_path.read_text(encoding="utf-8-sig")
-    eng = make_mssql_engine()
-    with eng.begin() as conn:
+    with get_engine().begin() as conn:
+        conn.execute(text("EXEC sp_set_session_context @key = N'etl_full_transform', @value = :full"), {"full": int(full)})
         conn.exec_driver_sql(sql)
         # minimal post-check if relevant
         if label == "filaments":
@@ -73,7 +87,10 @@ def main():
     parser.add_argument("--no-truncate", action="store_true", help="Do not truncate staging tables before loading.")
     parser.add_argument("--no-stage", action="store_true", help="Skip all staging loads.")
     parser.add_argument("--no-transform", action="store_true", help="Skip all transforms.")
-    parser.add_argument("--smart", action="store_true", help="Skip staging if sheet content unchanged since last run.")
+    parser.add_argument("--smart", action="store_true", help=("Delta staging: load only rows whose content changed since the last run "
+                              "(tracked per row in dbo.etl_row_state) and transform only those."))
+    parser.add_argument("--full-transform", action="store_true",
+                        help="With --smart: still run the transforms over every staged row (e.g. after reference data changed).")
     parser.add_argument("--only", nargs="*", default=[],
                         help=("Restrict to specific labels. Labels: "
                               "stg_excel_data, stg_filament_excel_data, stg_treatment_excel_data, stg_vcid_excel_data, filaments"))
@@ -95,23 +112,41 @@ def main():
             stage_sheet(excel_path, sheet, cell, table=label,
                         do_truncate=not args.no_truncate, smart=args.smart, only=only_set)
         # Optional quick count
-        eng = make_mssql_engine()
-        with eng.begin() as conn:
+        with get_engine().begin() as conn:
             rows = conn.execute(text("SELECT COUNT(*) FROM dbo.stg_filament_excel_data")).scalar()
             print(f"[INFO] Rows in dbo.stg_filament_excel_data: {rows}")
 
-    view_path = Path(__file__).resolve().parents[1] / "db" / "postview" / "07_v_unified_legacy_prints.sql"
-    run_transform(view_path, "vw_unified_legacy_prints", only_set)
+    postview_dir = Path(__file__).resolve().parents[1] / "db" / "postview"
+    run_transform(postview_dir / "07_v_unified_legacy_prints.sql", "vw_unified_legacy_prints", only_set)
+    # The transforms read their scope from these, so they are (re)created on every run
+    run_transform(postview_dir / "08_v_etl_pending_filaments.sql", "vw_etl_pending_filaments", None)
+    run_transform(postview_dir / "09_v_etl_pending_products.sql", "vw_etl_pending_products", None)
 
     if not args.no_transform:
-        run_transform(Path("etl/transform_filaments.sql"), "filaments", only_set)
-        run_transform(Path("etl/transform_filament_mounting.sql"), "filament_mounting", only_set)
-        run_transform(Path("etl/transform_filament_acclimatizing.sql"), "filament_acclimatization", only_set)
-        run_transform(Path("etl/transform_product_harvest.sql"), "product_harvest", only_set)
-        run_transform(Path("etl/transform_product_tracking.sql"), "product_tracking", only_set)
-        run_transform(Path("etl/transform_product_quality_control.sql"), "product_quality_control", only_set)
-        run_transform(Path("etl/transform_treatment_batches.sql"), "treatment_batch", only_set)
-        run_transform(Path("etl/transform_post_treatment_inspections.sql"), "post_treatment_inspections", only_set)
+        # Only a --smart run narrows the transforms to changed rows; any other run
+        # (including --no-stage reruns after fixing a transform) processes everything
+        full = not args.smart or args.full_transform
+        if not full:
+            pending = pending_rows()
+            if not pending:
+                print("[SKIP] transforms: --smart found no changed rows (use --full-transform to run them anyway).")
+                return
+            print(f"[INFO] Rows pending transform: {pending}")
+        transforms = [
+            ("etl/transform_filaments.sql", "filaments"),
+            ("etl/transform_filament_mounting.sql", "filament_mounting"),
+            ("etl/transform_filament_acclimatizing.sql", "filament_acclimatization"),
+            ("etl/transform_product_harvest.sql", "product_harvest"),
+            ("etl/transform_product_tracking.sql", "product_tracking"),
+            ("etl/transform_product_quality_control.sql", "product_quality_control"),
+            ("etl/transform_treatment_batches.sql", "treatment_batch"),
+            ("etl/transform_post_treatment_inspections.sql", "post_treatment_inspections"),
+        ]
+        for sql_path, label in transforms:
+            run_transform(Path(sql_path), label, only_set, full=full)
+        # Pending rows stay in scope until a run has applied every transform to them
+        if not only_set:
+            clear_pending()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import hashlib, json
+from typing import Iterable, Iterator
+import pandas as pd
+import pyodbc
+from sqlalchemy import text
+
+from load_to_sql import get_engine, json_value
+
+# Staging column holding each row's stable key (matches etl_row_state.row_key)
+ROW_KEY_COLUMN = "etl_row_key"
+MAX_KEY_LENGTH = 450
+
+class RowTracker:
+    """
+    Hashes the rows of a sheet as they stream past and keeps only the ones whose
+    hash differs from `known` (key -> SHA-256 from etl_row_state). Rows are keyed by
+    the values of `key_columns` ("|"-joined); sheets without a natural key, or rows
+    with a blank key, are keyed by their content hash. A key seen twice gets a
+    "#n" suffix so every staged row stays addressable.
+    """
+
+    def __init__(self, table: str, key_columns: tuple[str, ...], known: dict[str, bytes] | None = None):
+        self.table = table
+        self.key_columns = key_columns
+        self.known = known or {}
+        self.seen: dict[str, bytes] = {}
+        self.changed = 0
+
+    def _key(self, row: dict, row_hash: bytes) -> str:
+        parts = [row.get(c) for c in self.key_columns]
+        if parts and all(p is not None for p in parts):
+            key = "|".join(json_value(p) for p in parts)
+        else:
+            key = row_hash.hex()
+        if key in self.seen:
+            n = 2
+            while f"{key}#{n}" in self.seen:
+                n += 1
+            key = f"{key}#{n}"
+        if len(key) > MAX_KEY_LENGTH:
+            key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return key
+
+    def changed_batches(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yields each batch cut down to its new or changed rows, with ROW_KEY_COLUMN added."""
+        for df in batches:
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            keys, keep = [], []
+            for i, row in enumerate(records):
+                payload = json.dumps(row, default=json_value, ensure_ascii=False, separators=(",", ":"))
+                row_hash = hashlib.sha256(payload.encode("utf-8")).digest()
+                key = self._key(row, row_hash)
+                self.seen[key] = row_hash
+                if self.known.get(key) != row_hash:
+                    keys.append(key)
+                    keep.append(i)
+            if keep:
+                self.changed += len(keep)
+                out = df.iloc[keep].reset_index(drop=True)
+                out[ROW_KEY_COLUMN] = keys
+                yield out
+
+    @property
+    def vanished(self) -> list[str]:
+        """Keys tracked from an earlier run that the sheet no longer has (valid once the batches are consumed)."""
+        return [k for k in self.known if k not in self.seen]
+
+def load_row_state(table: str) -> dict[str, bytes] | None:
+    """
+    Row key -> hash recorded for a staging table, or None when the table cannot be
+    loaded as a delta yet (it doesn't exist or predates ROW_KEY_COLUMN).
+    """
+    with get_engine().begin() as conn:
+        has_keys = conn.execute(
+            text(f"SELECT COL_LENGTH(:t, '{ROW_KEY_COLUMN}')"), {"t": f"dbo.{table}"}
+        ).scalar()
+        if has_keys is None:
+            return None
+        rows = conn.execute(
+            text("SELECT row_key, row_hash FROM dbo.etl_row_state WHERE table_name = :t"), {"t": table}
+        ).all()
+    return {key: bytes(row_hash) for key, row_hash in rows}
+
+def save_row_state(tracker: RowTracker, full: bool):
+    """
+    Records every key/hash the tracker saw. New and changed rows are flagged pending
+    (all rows after a full reload) and rows gone from the sheet are forgotten.
+    """
+    with get_engine().begin() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(
+                "IF OBJECT_ID('tempdb..#etl_row_state_in') IS NULL "
+                "CREATE TABLE #etl_row_state_in (row_key NVARCHAR(450) PRIMARY KEY, row_hash BINARY(32) NOT NULL); "
+                "ELSE TRUNCATE TABLE #etl_row_state_in;"
+            )
+            if tracker.seen:
+                cursor.fast_executemany = True
+                cursor.setinputsizes([(pyodbc.SQL_WVARCHAR, MAX_KEY_LENGTH, 0), (pyodbc.SQL_BINARY, 32, 0)])
+                cursor.executemany(
+                    "INSERT INTO #etl_row_state_in (row_key, row_hash) VALUES (?, ?)",
+                    list(tracker.seen.items()),
+                )
+        finally:
+            cursor.close()
+
+        conn.execute(text(
+            """
+                MERGE dbo.etl_row_state AS t
+                USING #etl_row_state_in AS s
+                   ON t.table_name = :t AND t.row_key = s.row_key
+                WHEN MATCHED AND (t.row_hash <> s.row_hash OR :full = 1) THEN
+                    UPDATE SET pending = 1,
+                               changed_at = CASE WHEN t.row_hash <> s.row_hash THEN GETDATE() ELSE t.changed_at END,
+                               row_hash = s.row_hash
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT (table_name, row_key, row_hash) VALUES (:t, s.row_key, s.row_hash)
+                WHEN NOT MATCHED BY SOURCE AND t.table_name = :t THEN
+                    DELETE;
+            """
+        ), {"t": tracker.table, "full": int(full)})
+
+def pending_rows() -> int:
+    with get_engine().begin() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM dbo.etl_row_state WHERE pending = 1")).scalar()
+
+def clear_pending():
+    with get_engine().begin() as conn:
+        conn.execute(text("UPDATE dbo.etl_row_state SET pending = 0 WHERE pending = 1"))
@@ -59,6 +59,8 @@ BEGIN TRY
   INSERT INTO #src_accl(filament_tracking_id)
   SELECT f.id
   FROM AirLock a
+  JOIN dbo.vw_etl_pending_filaments pf   -- only filaments with changed staging rows
+    ON pf.filament_id = a.filament_id_bigint
   JOIN dbo.filaments f
     ON f.filament_id = a.filament_id_bigint;
 
@@ -93,6 +93,8 @@ BEGIN TRY
               ELSE N'Unmounted'
           END                                     AS status_calc
       FROM Pairs pr
+      JOIN dbo.vw_etl_pending_filaments pf   -- only filaments with changed staging rows
+        ON pf.filament_id = pr.filament_id_bigint
       JOIN dbo.filaments f
         ON f.filament_id = pr.filament_id_bigint
       JOIN dbo.printers p
@@ -236,7 +236,9 @@ END
     n.qc_result
   FROM norm n
   JOIN EligibleFilaments e
-    ON e.filament_id = n.filament_id;
+    ON e.filament_id = n.filament_id
+  JOIN dbo.vw_etl_pending_filaments pf   -- only filaments with changed staging rows
+    ON pf.filament_id = n.filament_id;
 
 
   /* ---- 3) UPSERT by filament_id (canonical). serial_number may duplicate. ---- */
@@ -93,6 +93,8 @@ BEGIN TRY
 
       r.notes
     FROM Raw r
+    INNER JOIN dbo.vw_etl_pending_products pp   -- only products with changed staging rows
+      ON pp.product_id = r.product_id_bigint
     INNER JOIN dbo.product_tracking t
       ON t.product_id = r.product_id_bigint
     LEFT JOIN dbo.users u
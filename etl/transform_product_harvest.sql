@@ -88,7 +88,8 @@ BEGIN TRY
 
   INSERT INTO #U(harvest_seq, product_id_bigint, filament_mounting_id, printed_by_id, print_date_dt, product_name)
   SELECT harvest_seq, product_id_bigint, filament_mounting_id, printed_by_id, print_date_dt, product_name
-  FROM dbo.vw_unified_legacy_prints;
+  FROM dbo.vw_unified_legacy_prints
+  WHERE product_id_bigint IN (SELECT product_id FROM dbo.vw_etl_pending_products);  -- changed rows only
 
   /* Precompute request_id per row (avoid CASE inside MERGE VALUES) */
   IF OBJECT_ID('tempdb..#toins','U') IS NOT NULL DROP TABLE #toins;
@@ -110,6 +110,8 @@ BEGIN TRY
       END AS inspection_result,
       r.notes
     FROM Raw r
+    INNER JOIN dbo.vw_etl_pending_products pp   -- only products with changed staging rows
+      ON pp.product_id = r.product_id_bigint
     /* product_tracking link via legacy product_id */
     INNER JOIN dbo.product_tracking t
       ON t.product_id = r.product_id_bigint
@@ -49,6 +49,8 @@ BEGIN TRY
       COALESCE(sl.id, @unassigned_loc_id),
       SYSUTCDATETIME()
   FROM dbo.vw_unified_legacy_prints v
+  JOIN dbo.vw_etl_pending_products pp   -- only products with changed staging rows
+    ON pp.product_id = v.product_id_bigint
   JOIN dbo.etl_harvest_map m
     ON m.product_id_bigint = v.product_id_bigint
   LEFT JOIN dbo.storage_locations sl
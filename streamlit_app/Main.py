@@ -2,6 +2,10 @@ import streamlit as st
 from utils.auth import get_current_user
 from utils.auth_ui import render_account_box
 from utils.access_bootstrap import ensure_user_and_access
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 st.set_page_config(page_title="Elephactory Production Dashboard", layout="wide")
 
@@ -48,3 +52,4 @@ st.success("You are authorized 🎉")
 #     except Exception as e:
 #         st.error(f"❌ Database connection failed:\n\n{e}")
 
+render_sql_profile()
@@ -0,0 +1,76 @@
+import json
+import pandas as pd
+import streamlit as st
+from db.base import get_engine
+from utils.db_metrics import get_db_diagnostics, reset_db_metrics
+from utils.query_cache import get_query_cache_stats
+
+
+def render_db_diagnostics():
+    """
+    Connection pool gauges, pool event counters, statement latency histograms and
+    query cache statistics for this app process, with a JSON export.
+    """
+    st.subheader("Database Diagnostics")
+
+    diagnostics = get_db_diagnostics(get_engine())
+    diagnostics["query_cache"] = get_query_cache_stats()
+    pool = diagnostics["pool"]
+    metrics = diagnostics["metrics"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("In Use", pool.get("in_use", "-"), help=f"Peak since {metrics['since']}: {metrics['peak_in_use']}")
+    col2.metric("Idle", pool.get("checked_in", "-"))
+    col3.metric("Overflow", pool.get("overflow", "-"), help=f"Peak: {metrics['peak_overflow']} of {pool.get('max_overflow', '-')}")
+    col4.metric("Checkout Timeouts", metrics["checkout_timeouts"])
+
+    st.caption(
+        f"Pool: {pool['pool_class']} · size {pool.get('size', '-')} · timeout {pool.get('timeout_seconds', '-')}s · "
+        f"recycle {pool.get('recycle_seconds', '-')}s · pre-ping {pool.get('pre_ping', '-')}"
+    )
+
+    st.markdown("#### Pool Events")
+    st.dataframe(pd.DataFrame([{
+        "checkouts": metrics["checkouts"],
+        "checkins": metrics["checkins"],
+        "new_connections": metrics["new_connections"],
+        "invalidations": metrics["invalidations"],
+        "soft_invalidations": metrics["soft_invalidations"],
+        "disconnect_errors": metrics["disconnect_errors"],
+    }]), hide_index=True, width='stretch')
+
+    st.markdown("#### Latency (ms)")
+    rows = [{"measure": "pool checkout wait", **_summary(metrics["checkout_wait"])}]
+    rows += [{"measure": f"{kind} statements", **_summary(h)} for kind, h in metrics["statements"].items()]
+    st.dataframe(pd.DataFrame(rows), hide_index=True, width='stretch')
+
+    with st.expander("Histogram buckets"):
+        buckets = {"pool checkout wait": metrics["checkout_wait"]["buckets"]}
+        buckets.update({kind: h["buckets"] for kind, h in metrics["statements"].items()})
+        st.dataframe(pd.DataFrame(buckets).T, width='stretch')
+
+    st.markdown("#### Query Cache")
+    cache = diagnostics["query_cache"]
+    st.caption(f"{cache['entries']} / {cache['max_entries']} entries · TTL {cache['ttl_seconds']}s")
+    if cache["functions"]:
+        st.dataframe(
+            pd.DataFrame([{"function": name, **counts} for name, counts in cache["functions"].items()]),
+            hide_index=True,
+            width='stretch',
+        )
+
+    col_dl, col_reset = st.columns(2)
+    with col_dl:
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(diagnostics, indent=2, default=str),
+            file_name="db_diagnostics.json",
+            mime="application/json",
+        )
+    with col_reset:
+        if st.button("Reset Counters"):
+            reset_db_metrics()
+            st.rerun()
+
+def _summary(histogram: dict) -> dict:
+    return {k: histogram[k] for k in ("count", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")}
@@ -0,0 +1,73 @@
+import pandas as pd
+import streamlit as st
+from db.orm_session import get_session
+from jobs.runner import JOBS, run_job
+from services.job_services import (
+    get_latest_job_runs,
+    get_low_filament_snapshot,
+    get_material_balance_snapshot,
+)
+
+
+def render_job_status():
+    """
+    Last run of every housekeeping job with a manual trigger, plus the
+    low-filament and material balance snapshots those jobs maintain.
+    """
+    st.subheader("Background Jobs")
+
+    with get_session() as db:
+        runs = {r["job_name"]: r for r in get_latest_job_runs(db)}
+        filament_run, low_filaments = get_low_filament_snapshot(db)
+        balance_run, balance = get_material_balance_snapshot(db)
+
+    st.dataframe(pd.DataFrame([
+        {
+            "job": job.name,
+            "description": job.description,
+            "every_s": job.interval_seconds,
+            "last_status": runs.get(job.name, {}).get("status", "Never run"),
+            "started_at": runs.get(job.name, {}).get("started_at"),
+            "finished_at": runs.get(job.name, {}).get("finished_at"),
+            "rows": runs.get(job.name, {}).get("rows_affected"),
+            "triggered_by": runs.get(job.name, {}).get("triggered_by"),
+            "error": runs.get(job.name, {}).get("error"),
+        }
+        for job in JOBS.values()
+    ]), hide_index=True, width='stretch')
+
+    col_job, col_run = st.columns([3, 1])
+    with col_job:
+        selected = st.selectbox("Job", options=list(JOBS), key="job_status_select")
+    with col_run:
+        st.write("")
+        if st.button("Run Now", key="job_status_run"):
+            try:
+                with st.spinner(f"Running {selected}..."):
+                    result = run_job(selected, triggered_by=f"user:{st.session_state.get('user_id')}")
+                if result is None:
+                    st.info(f"{selected} is already running on another instance.")
+                else:
+                    st.rerun()
+            except Exception as e:
+                st.error(f"{selected} failed.")
+                st.exception(e)
+
+    st.markdown("#### Low Filament")
+    if filament_run is None:
+        st.caption("No snapshot yet.")
+    elif not low_filaments:
+        st.success(f"No mounted filament below threshold (as of {filament_run['finished_at']:%Y-%m-%d %H:%M}).")
+    else:
+        st.caption(f"As of {filament_run['finished_at']:%Y-%m-%d %H:%M}")
+        st.dataframe(pd.DataFrame(low_filaments).drop(columns=["run_id"]), hide_index=True, width='stretch')
+
+    st.markdown("#### Material Balance")
+    if balance_run is None:
+        st.caption("No snapshot yet.")
+    else:
+        df = pd.DataFrame(balance).drop(columns=["run_id"]) if balance else pd.DataFrame()
+        off = int((df["variance_qty"] != 0).sum()) if not df.empty else 0
+        st.caption(f"As of {balance_run['finished_at']:%Y-%m-%d %H:%M} · {off} of {len(df)} lots with a variance")
+        if not df.empty:
+            st.dataframe(df, hide_index=True, width='stretch')
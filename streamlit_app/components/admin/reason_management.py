@@ -4,6 +4,7 @@ from services.reasons_services import (
     get_contexts, get_reasons, upsert_reason,
     get_reason_context_ids, set_reason_contexts, toggle_reason_active
 )
+from services.reference_services import invalidate_reference_data
 
 def render_reason_management():
     with get_session() as db:
@@ -62,6 +63,7 @@ def render_reason_management():
                         severity=severity if severity else None,
                         is_active=is_active
                     )
+                invalidate_reference_data()
                 st.success(f"Reason saved (id={new_id}).")
                 st.rerun()
             except Exception as e:
@@ -90,6 +92,7 @@ def render_reason_management():
                     try:
                         with get_session() as db:
                             set_reason_contexts(db, r["id"], new_ids)
+                        invalidate_reference_data()
                         st.success("Mapping saved.")
                     except Exception as e:
                         st.error("Failed to save mapping.")
@@ -100,6 +103,7 @@ def render_reason_management():
                     try:
                         with get_session() as db:
                             toggle_reason_active(db, r["id"], active_toggle)
+                        invalidate_reference_data()
                         st.success("Active state updated.")
                     except Exception as e:
                         st.error("Failed to update active state.")
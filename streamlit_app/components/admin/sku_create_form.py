@@ -1,6 +1,7 @@
 import streamlit as st
 from db.orm_session import get_session
 from services.admin_services import get_product_types, create_product_sku
+from services.reference_services import invalidate_reference_data
 
 def render_sku_create_form() -> bool:
     st.subheader("Create New SKU")
@@ -48,6 +49,7 @@ def render_sku_create_form() -> bool:
                     is_active=is_active,
                     tech_transfer=tech_transfer,
                 )
+            invalidate_reference_data()
             st.success(f"SKU created (id={new_id}).")
             return True
         except Exception as e:
@@ -1,6 +1,7 @@
 import streamlit as st
 from db.orm_session import get_session
 from services.admin_services import get_all_skus, get_sku_by_id, update_product_sku_with_audit
+from services.reference_services import invalidate_reference_data
 
 def render_sku_update_form() -> bool:
     st.subheader("Update SKU")
@@ -85,6 +86,7 @@ def render_sku_update_form() -> bool:
                     reason=reason.strip(),
                     changed_by=int(user_id),
                 )
+            invalidate_reference_data()
             st.success("SKU updated.")
             return True
         except Exception as e:
@@ -1,11 +1,14 @@
 import streamlit as st
 from data.admin_tools import (
+    VALID_TABLES,
     get_all_filaments,
     get_all_product_ids,
     get_all_lids,
     get_record_by_id,
     update_record_with_audit
 )
+from services.quality_management_services import get_record_audit_history
+from db.orm_session import get_session
 
 
 def render_admin_record_lookup():
@@ -60,3 +63,34 @@ def render_admin_record_lookup():
     except Exception as e:
         st.error("Failed to load or update record.")
         st.exception(e)
+        return
+
+    # --- Step 4: Change history ---
+    render_record_history(table_choice, selected_id)
+
+def render_record_history(table_choice: str, record_id: int):
+    with st.expander("Change History"):
+        include_archive = st.checkbox(
+            "Include archived history",
+            key="record_history_archive",
+            help="Also search months moved to the audit archive (slower)."
+        )
+        try:
+            with get_session() as db:
+                # This form logs under its display label ("Filaments"); the services use the table name
+                history = [
+                    row
+                    for name in (VALID_TABLES[table_choice], table_choice)
+                    for row in get_record_audit_history(db, name, record_id, include_archive=include_archive)
+                ]
+        except Exception as e:
+            st.error("Failed to load change history.")
+            st.exception(e)
+            return
+
+        if not history:
+            st.info("No changes recorded for this record.")
+            return
+
+        history.sort(key=lambda r: (r["changed_at"], r["id"]), reverse=True)
+        st.dataframe(history, width='stretch')
@@ -0,0 +1,43 @@
+import streamlit as st
+from typing import Callable
+from schemas.pagination_schemas import KeysetPage
+
+
+def render_keyset_pager(key: str, fetch_page: Callable[[tuple | None], KeysetPage], filters: dict) -> KeysetPage:
+    """
+    Fetches and returns the current page of a keyset-paginated list, with
+    Previous/Next controls underneath.
+
+    Parameters:
+        - key: unique prefix for this list's session state
+        - fetch_page: called with the `after` cursor, returns a KeysetPage
+        - filters: the filter values currently applied; changing them restarts at page one
+
+    The cursors of the pages already visited are kept in session state so
+    Previous steps back without re-reading from the start.
+    """
+    cursors_key = f"{key}_cursors"
+    filters_key = f"{key}_filters"
+
+    if st.session_state.get(filters_key) != filters or cursors_key not in st.session_state:
+        st.session_state[filters_key] = filters
+        st.session_state[cursors_key] = [None]
+
+    cursors = st.session_state[cursors_key]
+    page = fetch_page(cursors[-1])
+
+    def _next():
+        st.session_state[cursors_key].append(page.next_after)
+
+    def _previous():
+        st.session_state[cursors_key].pop()
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("Previous", key=f"{key}_prev", disabled=len(cursors) <= 1, on_click=_previous)
+    with col_info:
+        st.caption(f"Page {len(cursors)} · {len(page.rows)} rows")
+    with col_next:
+        st.button("Next", key=f"{key}_next", disabled=not page.has_more, on_click=_next)
+
+    return page
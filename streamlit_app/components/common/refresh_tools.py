@@ -1,9 +1,12 @@
 import streamlit as st
+from services.reference_services import invalidate_reference_data
+from utils.query_cache import clear_query_cache
 
 
 def refresh_cache(label: str = "Refresh", help: str = "", key: str = "refresh_button") -> bool:
     """
-    Renders a refresh button and clears Streamlit's data cache if clicked.
+    Renders a refresh button and clears Streamlit's data cache (plus the shared
+    query cache and cached reference lookups) if clicked.
 
     Returns:
         bool: True if the button was clicked, False otherwise.
@@ -11,4 +14,6 @@ def refresh_cache(label: str = "Refresh", help: str = "", key: str = "refresh_bu
     clicked = st.button(label, help=help, key=key)
     if clicked:
         st.cache_data.clear()
+        invalidate_reference_data()
+        clear_query_cache()
     return clicked
\ No newline at end of file
@@ -1,20 +1,37 @@
 import streamlit as st
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder
-from services.filament_service import get_all_filament_statuses
+from services.filament_service import get_filament_statuses_page
+from components.common.keyset_pager import render_keyset_pager
 from db.orm_session import get_session
 
+FILAMENT_STATUSES = ["In Storage", "Acclimatizing", "In Use", "Unmounted"]
+
 def render_filament_inventory():
     """
     Provides a table of view of all filament spools. 
 
-    - Fetches all filaments with database query
+    - Fetches one page of filaments at a time, with status/lot filters applied in the query
     - Builds dataframe (table) 
     """
-    try:
-        # Creates database session and calls services function to query all filament data
+    col1, col2 = st.columns(2)
+    with col1:
+        current_status = st.selectbox("Status", ["All"] + FILAMENT_STATUSES, key="filament_filter_status")
+    with col2:
+        lot_number = st.text_input("Lot Number", key="filament_filter_lot").strip()
+
+    filters = {
+        "current_status": None if current_status == "All" else current_status,
+        "lot_number": lot_number or None,
+    }
+
+    def _fetch(after):
+        # Creates database session and calls services function to query the next page of filament data
         with get_session() as db:
-            all_filaments = get_all_filament_statuses(db)
+            return get_filament_statuses_page(db, after=after, **filters)
+
+    try:
+        all_filaments = render_keyset_pager("filament_inventory", _fetch, filters).rows
 
         if all_filaments:
 
@@ -0,0 +1,156 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Iterator
+from components.label.label_generator import generate_label_with_overlays
+from config import LABEL_RENDER_WORKERS, LABEL_PDF_SPOOL_MAX_BYTES
+
+
+# Same JPEG quality Pillow uses when it writes RGB images into a PDF
+JPEG_QUALITY = 75
+# Below this many labels, rendering inline beats handing work to the pool
+POOL_MIN_LABELS = 8
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+class PdfPageWriter:
+    """
+    Minimal streaming PDF writer: objects are written to `fp` as soon as they are
+    added and only their offsets are kept in memory, so the document can grow to
+    any number of pages. Object 1 is the catalog and object 2 the page tree; both
+    are written by close() once the page list is known.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.pos = 0
+        self.offsets: dict[int, int] = {}
+        self.page_ids: list[int] = []
+        self._next_id = 3
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self.fp.write(data)
+        self.pos += len(data)
+
+    def reserve_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def write_object(self, obj_id: int, body: bytes, stream: bytes | None = None):
+        """Writes `body` (a dictionary for streams, without /Length) and the optional stream."""
+        self.offsets[obj_id] = self.pos
+        self._write(b"%d 0 obj\n" % obj_id)
+        if stream is None:
+            self._write(body)
+        else:
+            self._write(body[:-2].rstrip() + b" /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_page(self, w_pt: float, h_pt: float, resources: bytes, content: bytes, content_filter: bytes = b""):
+        content_id, page_id = self.reserve_id(), self.reserve_id()
+        self.write_object(content_id, b"<<%s >>" % content_filter, content)
+        self.write_object(page_id, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources %s /Contents %d 0 R >>"
+            % (w_pt, h_pt, resources, content_id)
+        ))
+        self.page_ids.append(page_id)
+
+    def add_image_page(self, width: int, height: int, jpeg: bytes, resolution: float = 72.0):
+        """One full-bleed JPEG image per page."""
+        image_id = self.reserve_id()
+        w_pt, h_pt = width * 72.0 / resolution, height * 72.0 / resolution
+        self.write_object(image_id, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /DCTDecode >>" % (width, height)
+        ), jpeg)
+        self.add_page(
+            w_pt, h_pt,
+            b"<< /XObject << /Im0 %d 0 R >> >>" % image_id,
+            b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (w_pt, h_pt),
+        )
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % pid for pid in self.page_ids)
+        self.write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+        self.write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_at = self.pos
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % self._next_id)
+        for obj_id in range(1, self._next_id):
+            self._write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next_id, xref_at))
+
+
+def render_page(job: dict) -> tuple[int, int, bytes]:
+    """Renders one label (generate_label_with_overlays kwargs) to (width, height, JPEG bytes)."""
+    label = generate_label_with_overlays(**job)
+    out = BytesIO()
+    label.save(out, format="JPEG", quality=JPEG_QUALITY)
+    return label.width, label.height, out.getvalue()
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by every session; workers keep their template/font caches warm.
+    Workers are spawned, not forked: forking the threaded server (open DB pools, locks
+    held by other threads) can deadlock the children.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+def _rendered_pages(jobs: list[dict], workers: int) -> Iterator[tuple[int, int, bytes]]:
+    """Pages in job order. At most 2 x workers pages are in flight, whatever the batch size."""
+    if workers <= 1 or len(jobs) < POOL_MIN_LABELS:
+        for job in jobs:
+            yield render_page(job)
+        return
+
+    pool = _get_pool(workers)
+    pending = deque()
+    try:
+        for job in jobs:
+            pending.append(pool.submit(render_page, job))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+def render_labels_pdf(jobs: Iterable[dict], workers: int = LABEL_RENDER_WORKERS) -> tuple[SpooledTemporaryFile, int]:
+    """
+    Renders a batch of labels into one PDF, one label per page, in a process pool.
+    Pages are written as they finish into a spooled file that moves to disk past
+    LABEL_PDF_SPOOL_MAX_BYTES. Returns the file (rewound; caller closes it) and the
+    page count.
+    """
+    out = SpooledTemporaryFile(max_size=LABEL_PDF_SPOOL_MAX_BYTES, suffix=".pdf")
+    writer = PdfPageWriter(out)
+    try:
+        for width, height, jpeg in _rendered_pages(list(jobs), workers):
+            writer.add_image_page(width, height, jpeg)
+        writer.close()
+    except Exception:
+        out.close()
+        raise
+    out.seek(0)
+    return out, len(writer.page_ids)
@@ -1,9 +1,9 @@
 import streamlit as st
-import base64
 import copy
 from datetime import datetime
-from io import BytesIO
 from components.label.label_generator import generate_label_with_overlays
+from components.label.label_batch import render_labels_pdf
+from components.label.label_vector import render_labels_vector_pdf
 from services.label_services import get_label_data_by_product_id, get_harvested
 from db.orm_session import get_session
 from constants.label_constants import SKU_DATA_SPECS, QR_LABEL_MAP
@@ -169,7 +169,7 @@ def render_label_form():
 
     
     if selected_products:
-        images = []
+        label_jobs = []
         for product_to_print in selected_products:
             if product_to_print["reference_number"]:
                 product_sku = product_to_print["reference_number"]
@@ -232,46 +232,40 @@ def render_label_form():
                     label_specs['product_sku']['text'] = product_sku
                     background_path = f"streamlit_app/assets/labels/{label_choice}.png"
 
-                    label_img = generate_label_with_overlays(
-                        background_path=background_path,
-                        fields=label_specs,
-                        qr_specs=qr_specs,
-                        qr_required=qr_required,
-                        print_size=print_size
-                    )
-
-                    images.append(label_img)
-
+                    label_jobs.append({
+                        "background_path": background_path,
+                        "fields": label_specs,
+                        "qr_specs": qr_specs,
+                        "qr_required": qr_required,
+                        "print_size": print_size,
+                    })
+
+        output_mode = st.radio(
+            "Output",
+            options=["Raster PDF", "Vector PDF"],
+            horizontal=True,
+            help="Raster PDF embeds one full-resolution image per label. "
+                 "Vector PDF (experimental) draws text and QR natively at the label's print size: "
+                 "much smaller files, not yet verified on the Zebra printer.",
+            key="label_output_mode"
+        )
         generate = st.button("Generate Label", type="primary", use_container_width=True)
-        if generate:
-            pdf_out = BytesIO()
-            images[0].save(pdf_out, format="PDF", save_all=True, append_images=images[1:])
-            pdf_out.seek(0)
-
-            pdf_bytes = pdf_out.getvalue()
-            pdf_b64 = base64.b64encode(pdf_bytes).decode("utf-8")
-            # --- Inline PDF preview(iframe) ---
-
-            # pdf_b64 = base64.b64encode(label_img.getvalue()).decode("utf-8")
-            st.markdown(
-                f"""
-                <iframe
-                    src="data:application/pdf;base64,{pdf_b64}"
-                    width="100%"
-                    height="700"
-                    style="border:1px solid #ddd; border-radius:8px;"
-                ></iframe>
-                """,
-                unsafe_allow_html=True,
-            )
-
-            st.markdown(
-                f"""
-                <p style="margin-top: 0.5rem;">
-                    <a href="data:application/pdf;base64,{pdf_b64}" target="_blank">
-                        Open label in new tab
-                    </a>
-                </p>
-                """,
-                unsafe_allow_html=True,
-            )
+        if generate and label_jobs:
+            # Preview the first label as an image; the PDF is built from all of them below
+            st.image(generate_label_with_overlays(**label_jobs[0]), caption="Preview (first label)", width=400)
+
+            with st.spinner(f"Rendering {len(label_jobs)} label(s)..."):
+                if output_mode == "Vector PDF":
+                    pdf_file, pages = render_labels_vector_pdf(label_jobs)
+                else:
+                    pdf_file, pages = render_labels_pdf(label_jobs)
+            # download_button keeps its own copy of the payload; the spool file is dropped here
+            with pdf_file:
+                st.download_button(
+                    f"Download PDF ({pages} page{'s' if pages != 1 else ''})",
+                    data=pdf_file.read(),
+                    file_name=f"labels_{datetime.now():%Y%m%d_%H%M%S}.pdf",
+                    mime="application/pdf",
+                    type="primary",
+                    use_container_width=True,
+                )
@@ -1,7 +1,7 @@
 from PIL import Image, ImageDraw, ImageFont
 import qrcode
 import os
-from io import BytesIO
+from functools import lru_cache
 
 
 LABEL_SIZE_MM = 76
@@ -15,6 +15,45 @@ DEFAULT_FONT_PATH = os.path.join(
     BASE_DIR, "..", "..", "assets", "fonts", "JetBrainsMono-Bold.ttf"
 )
 
+# Cached images are shared across reruns and sessions: never draw on them, copy first.
+
+@lru_cache(maxsize=None)
+def load_background(background_path: str) -> Image.Image:
+    """Decoded RGBA label template, read from disk once per process."""
+    with Image.open(background_path) as img:
+        return img.convert("RGBA")
+
+@lru_cache(maxsize=64)
+def load_font(size: int, font_path: str = DEFAULT_FONT_PATH):
+    try:
+        return ImageFont.truetype(font_path, size=size)
+    except IOError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=None)
+def _static_layers(background_path: str, qr_box: tuple | None) -> tuple[Image.Image, Image.Image | None]:
+    """
+    The template flattened onto white (everything that is the same on every label),
+    plus the template crop covering the QR box. The QR sits *under* the template, so
+    only that crop has to be re-composited per label.
+    """
+    base = load_background(background_path)
+    white = Image.new("RGBA", base.size, (255, 255, 255, 255))
+    flattened = Image.alpha_composite(white, base).convert("RGB")
+    return flattened, base.crop(qr_box) if qr_box else None
+
+@lru_cache(maxsize=1024)
+def _qr_image(qr_data: str, qr_size: int) -> Image.Image:
+    """
+    QR scaled to qr_size. Built at one pixel per module and scaled with nearest
+    neighbour, which is pixel-identical to qrcode.make(...).resize(...) but skips
+    rendering the 10px-per-module intermediate.
+    """
+    qr = qrcode.QRCode(box_size=1, border=4)
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    return qr.make_image().resize((qr_size, qr_size), Image.NEAREST).convert("RGBA")
+
 def generate_label_with_overlays(
     background_path: str,
     fields: dict[dict],
@@ -23,59 +62,35 @@ def generate_label_with_overlays(
     qr_required: bool = True,
     print_size: int = 0
 
-) -> BytesIO:
-    base = Image.open(background_path).convert("RGBA")
-    underlay = Image.new("RGBA", base.size, (0, 0, 0, 0))
-
+) -> Image.Image:
+    """
+    Renders one label as an RGB image: the cached static template with this label's
+    QR composited under its transparent window and the field texts drawn on top.
+    """
+    qr_box = None
     if qr_required:
-        qr_data = qr_specs['qr_data']
+        x, y = qr_specs['qr_position']
         qr_size = qr_specs['qr_size']
-        qr_position = qr_specs['qr_position']
-        qr_img = qrcode.make(qr_data).resize((qr_size, qr_size)).convert("RGBA")
-        underlay.paste(qr_img, qr_position, qr_img)
+        qr_box = (x, y, x + qr_size, y + qr_size)
+
+    static, qr_window = _static_layers(background_path, qr_box)
+    label = static.copy()
+
+    if qr_required:
+        qr_img = _qr_image(str(qr_specs['qr_data']), qr_size)
+        label.paste(Image.alpha_composite(qr_img, qr_window).convert("RGB"), qr_box[:2])
     # label_inches = print_size / MM_PER_INCH
     # target_px = int(round(label_inches * TARGET_DPI))
     # base = base.resize((target_px, target_px))
 
-    composed = Image.alpha_composite(underlay, base)
-    draw = ImageDraw.Draw(composed)
+    draw = ImageDraw.Draw(label)
+    for field in fields.values():
+        font = load_font(field.get("font_size", 16), field.get("font_path", font_path or DEFAULT_FONT_PATH))
+        draw.text(field["position"], field["text"], font=font, fill="black")
 
-    # draw = ImageDraw.Draw(base)
+    return label
 
-    def load_font(size, font_path=DEFAULT_FONT_PATH):
-        try:
-            return ImageFont.truetype(font_path, size=size)
-        except IOError:
-            return ImageFont.load_default()
-        
-    # for field in fields:
-    for field in fields.values():
-        text = field["text"]
-        position = field["position"]
-        font_size = field.get("font_size", 16)
-        font_path = field.get("font_path", DEFAULT_FONT_PATH)
-        font = load_font(font_size, font_path)
-        draw.text(position, text, font=font, fill="black")
-
-    # if qr_required:
-    #     qr_data = qr_specs['qr_data']
-    #     qr_size = qr_specs['qr_size']
-    #     qr_position = qr_specs['qr_position']
-    #     qr_img = qrcode.make(qr_data).resize((qr_size, qr_size)).convert("RGBA")
-    #     base.paste(qr_img, qr_position, qr_img)
-
-    # bg = Image.new("RGBA", base.size, (255, 255, 255, 255))
-    bg = Image.new("RGBA", composed.size, (255, 255, 255, 255))
-    # flattened = Image.alpha_composite(bg, base)
-    flattened = Image.alpha_composite(bg, composed).convert("RGB")
-    return flattened
-
-    # rgb_base = flattened.convert("RGB")
-
-    # output = BytesIO()
-    # # base.save(output, format="PNG") 
-    # # rgb_base.save(output, format="PDF")
-    # flattened.save(output, format="PDF")
-    # # rgb_base.save(output, format="PDF", resolution=TARGET_DPI)
-    # output.seek(0)
-    # return output
\ No newline at end of file
+def clear_label_caches():
+    """Drops cached templates, fonts and QR codes (e.g. after replacing a template PNG)."""
+    for cached in (load_background, load_font, _static_layers, _qr_image):
+        cached.cache_clear()
@@ -0,0 +1,215 @@
+import zlib
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+from typing import Iterable
+from PIL import ImageFont
+import qrcode
+from components.label.label_batch import PdfPageWriter
+from components.label.label_generator import DEFAULT_FONT_PATH, MM_PER_INCH, load_background
+from config import LABEL_PDF_SPOOL_MAX_BYTES
+
+
+POINTS_PER_INCH = 72.0
+# Text fields are WinAnsi-encoded (covers the "cm²" on our labels)
+TEXT_ENCODING = "cp1252"
+
+
+@lru_cache(maxsize=None)
+def _background_streams(background_path: str) -> tuple[int, int, bytes, bytes | None]:
+    """(width, height, Flate RGB, Flate alpha or None if opaque) of a label template."""
+    base = load_background(background_path)
+    rgb = zlib.compress(base.convert("RGB").tobytes())
+    alpha = base.getchannel("A")
+    smask = None if alpha.getextrema() == (255, 255) else zlib.compress(alpha.tobytes())
+    return base.width, base.height, rgb, smask
+
+@lru_cache(maxsize=None)
+def _font_program(font_path: str) -> dict | None:
+    """
+    Metrics (1/1000 em) and the Flate-compressed font file for embedding a TrueType
+    font as a WinAnsi simple font. None if the file can't be loaded, in which case
+    text falls back to the standard Helvetica-Bold.
+    """
+    try:
+        font = ImageFont.truetype(font_path, size=1000)
+        with open(font_path, "rb") as f:
+            program = f.read()
+    except IOError:
+        return None
+
+    ascent, descent = font.getmetrics()
+    widths = []
+    for code in range(32, 256):
+        char = bytes([code]).decode(TEXT_ENCODING, errors="ignore")
+        widths.append(round(font.getlength(char)) if char else 0)
+    cap_top = font.getbbox("H")[1]
+    family, style = font.getname()
+
+    return {
+        "name": f"{family}-{style}".replace(" ", "").encode("ascii", errors="ignore"),
+        "ascent": ascent,
+        "descent": descent,
+        "cap_height": ascent - cap_top,
+        "widths": widths,
+        "fixed_pitch": len(set(w for w in widths if w)) == 1,
+        "program": zlib.compress(program),
+        "length1": len(program),
+    }
+
+def _pdf_string(text: str) -> bytes:
+    raw = str(text).encode(TEXT_ENCODING, errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _qr_path(qr_data: str, x: float, y: float, size: float, page_h: float) -> bytes:
+    """Dark QR modules as one filled path, merging horizontal runs into single rectangles."""
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    module = size / len(matrix)
+
+    ops = []
+    for r, row in enumerate(matrix):
+        top = page_h - (y + (r + 1) * module)
+        c = 0
+        while c < len(row):
+            if not row[c]:
+                c += 1
+                continue
+            start = c
+            while c < len(row) and row[c]:
+                c += 1
+            ops.append(b"%.3f %.3f %.3f %.3f re" % (x + start * module, top, (c - start) * module, module))
+    return b"0 g\n" + b"\n".join(ops) + b"\nf\n" if ops else b""
+
+
+class VectorLabelWriter:
+    """
+    Writes labels as PDF pages drawn natively: each template is embedded once as an
+    image XObject (with its alpha as a soft mask) shared by every page, the QR is a
+    vector path under it and the field texts are real text in an embedded font.
+    Pages are sized to the label's print_size in mm when given.
+    """
+
+    def __init__(self, fp):
+        self.pdf = PdfPageWriter(fp)
+        self._backgrounds: dict[str, int] = {}
+        self._fonts: dict[str, tuple[int, dict | None]] = {}
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.page_ids)
+
+    def _background(self, background_path: str) -> int:
+        if background_path not in self._backgrounds:
+            width, height, rgb, smask = _background_streams(background_path)
+            smask_ref = b""
+            if smask is not None:
+                smask_id = self.pdf.reserve_id()
+                self.pdf.write_object(smask_id, (
+                    b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                    b"/BitsPerComponent 8 /Filter /FlateDecode >>" % (width, height)
+                ), smask)
+                smask_ref = b" /SMask %d 0 R" % smask_id
+            image_id = self.pdf.reserve_id()
+            self.pdf.write_object(image_id, (
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                b"/BitsPerComponent 8 /Filter /FlateDecode%s >>" % (width, height, smask_ref)
+            ), rgb)
+            self._backgrounds[background_path] = image_id
+        return self._backgrounds[background_path]
+
+    def _font(self, font_path: str) -> tuple[int, dict | None]:
+        if font_path not in self._fonts:
+            metrics = _font_program(font_path)
+            font_id = self.pdf.reserve_id()
+            if metrics is None:
+                self.pdf.write_object(font_id, (
+                    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+                ))
+            else:
+                file_id, descriptor_id = self.pdf.reserve_id(), self.pdf.reserve_id()
+                self.pdf.write_object(file_id, (
+                    b"<< /Length1 %d /Filter /FlateDecode >>" % metrics["length1"]
+                ), metrics["program"])
+                self.pdf.write_object(descriptor_id, (
+                    b"<< /Type /FontDescriptor /FontName /%s /Flags %d /FontBBox [0 %d %d %d] "
+                    b"/ItalicAngle 0 /Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>"
+                    % (
+                        metrics["name"], 32 | (1 if metrics["fixed_pitch"] else 0),
+                        -metrics["descent"], max(metrics["widths"]), metrics["ascent"],
+                        metrics["ascent"], -metrics["descent"], metrics["cap_height"], file_id,
+                    )
+                ))
+                self.pdf.write_object(font_id, (
+                    b"<< /Type /Font /Subtype /TrueType /BaseFont /%s /FirstChar 32 /LastChar 255 "
+                    b"/Widths [%s] /FontDescriptor %d 0 R /Encoding /WinAnsiEncoding >>"
+                    % (metrics["name"], b" ".join(b"%d" % w for w in metrics["widths"]), descriptor_id)
+                ))
+            self._fonts[font_path] = (font_id, metrics)
+        return self._fonts[font_path]
+
+    def add_label(
+        self,
+        background_path: str,
+        fields: dict[dict],
+        qr_specs: dict,
+        font_path: str = None,
+        qr_required: bool = True,
+        print_size: int = 0
+    ):
+        """Same arguments as generate_label_with_overlays; positions are template pixels."""
+        background_id = self._background(background_path)
+        width, height = _background_streams(background_path)[:2]
+        scale = print_size / MM_PER_INCH * POINTS_PER_INCH / width if print_size else 1.0
+
+        # Work in template pixels with the origin bottom-left; one cm maps them to points
+        content = [b"q %.5f 0 0 %.5f 0 0 cm\n" % (scale, scale)]
+        if qr_required:
+            x, y = qr_specs['qr_position']
+            content.append(_qr_path(str(qr_specs['qr_data']), x, y, qr_specs['qr_size'], height))
+        content.append(b"q %d 0 0 %d 0 0 cm /Bg Do Q\n" % (width, height))
+
+        font_refs = {}
+        content.append(b"0 g\nBT\n")
+        for field in fields.values():
+            path = field.get("font_path", font_path or DEFAULT_FONT_PATH)
+            font_id, metrics = self._font(path)
+            name = font_refs.setdefault(font_id, b"F%d" % len(font_refs))
+            size = field.get("font_size", 16)
+            # PIL positions text by the top of the ascender; PDF by the baseline
+            ascent = (metrics["ascent"] if metrics else 718) * size / 1000
+            x, y = field["position"]
+            content.append(b"/%s %d Tf 1 0 0 1 %.2f %.2f Tm %s Tj\n" % (
+                name, size, x, height - y - ascent, _pdf_string(field["text"])
+            ))
+        content.append(b"ET\nQ\n")
+
+        fonts = b" ".join(b"/%s %d 0 R" % (name, font_id) for font_id, name in font_refs.items())
+        self.pdf.add_page(
+            width * scale, height * scale,
+            b"<< /XObject << /Bg %d 0 R >> /Font << %s >> >>" % (background_id, fonts),
+            zlib.compress(b"".join(content)),
+            content_filter=b" /Filter /FlateDecode",
+        )
+
+    def close(self):
+        self.pdf.close()
+
+
+def render_labels_vector_pdf(jobs: Iterable[dict]) -> tuple[SpooledTemporaryFile, int]:
+    """
+    Vector counterpart of label_batch.render_labels_pdf (same job dicts, same return):
+    no rasterizing, so it runs in-process and each page adds only a few hundred bytes.
+    """
+    out = SpooledTemporaryFile(max_size=LABEL_PDF_SPOOL_MAX_BYTES, suffix=".pdf")
+    writer = VectorLabelWriter(out)
+    try:
+        for job in jobs:
+            writer.add_label(**job)
+        writer.close()
+    except Exception:
+        out.close()
+        raise
+    out.seek(0)
+    return out, writer.page_count
@@ -1,17 +1,48 @@
 import streamlit as st
 import pandas as pd
 import time
+import uuid
 from services.shipment_services import (
     get_open_order_headers,
     get_open_orders_with_items, 
     build_unit_requirements,
     get_fifo_inventory_by_sku, 
+    allocate_fifo_for_order,
+    release_reservations,
     create_shipment_from_order,
     cancel_order_request
 )
+from config import SHIPMENT_RESERVATION_TTL_SECONDS
 from db.orm_session import get_session
 
 
+def _reservation_holder() -> str:
+    """Per-browser-session token that owns this user's soft reservations."""
+    if "reservation_holder" not in st.session_state:
+        st.session_state["reservation_holder"] = uuid.uuid4().hex
+    return st.session_state["reservation_holder"]
+
+def _get_fifo_allocation(order_id: int, picking_need: dict[int, int], holder: str, user_id: int) -> dict[int, list[dict]]:
+    """
+    FIFO picks for the order, reserved for this session. Reuses the allocation across
+    reruns and only re-allocates (renewing the reservation) when the order or its
+    requirements change, or half the reservation TTL has passed.
+    """
+    cached = st.session_state.get("fifo_allocation")
+    if (
+        cached
+        and cached["order_id"] == order_id
+        and cached["need"] == picking_need
+        and time.monotonic() - cached["at"] < SHIPMENT_RESERVATION_TTL_SECONDS / 2
+    ):
+        return cached["picks"]
+
+    with get_session() as db:
+        picks = allocate_fifo_for_order(db, order_id, picking_need, holder=holder, user_id=user_id)
+    st.session_state["fifo_allocation"] = {"order_id": order_id, "need": picking_need, "at": time.monotonic(), "picks": picks}
+    return picks
+
+
 def render_shipment_batch_form():
     """
     Creates form that allows user to create shipment batch based on order request. 
@@ -63,6 +94,16 @@ def render_shipment_batch_form():
         st.markdown(f"**Parent Order:** {selected_order['parent_order_id']}")
     st.markdown("---")
 
+    # === FIFO allocation for every picked line in one query, reserved for this session ===
+    user_id = st.session_state.get("user_id")
+    holder = _reservation_holder()
+    picking_need = {
+        sku_id: int(meta["required_units"])
+        for sku_id, meta in unit_need.items()
+        if meta["is_serialized"] or meta["is_bundle"]
+    }
+    fifo_by_sku = _get_fifo_allocation(selected_order_id, picking_need, holder, user_id) if picking_need else {}
+
     # === Display lines as ordered ===
     picked_by_sku: dict[int, list[dict]] = {}
     non_serialized_counts: dict[int, int] = {}
@@ -88,8 +129,7 @@ def render_shipment_batch_form():
         
         st.markdown(f"#### {sku_label} (need {required} unit{'s' if required != 1 else ''})")
 
-        with get_session() as db:
-            fifo = get_fifo_inventory_by_sku(db, sku_id=sku_id, limit=required)
+        fifo = fifo_by_sku.get(sku_id, [])
 
         if fifo and len(fifo) > 0:
             st.markdown("*Auto-selected by FIFO*")
@@ -101,7 +141,7 @@ def render_shipment_batch_form():
 
         if override:
             with get_session() as db:
-                all_inv = get_fifo_inventory_by_sku(db, sku_id=sku_id, limit=500)
+                all_inv = get_fifo_inventory_by_sku(db, sku_id=sku_id, limit=500, holder=holder)
 
             options = [f"#{u['product_id']} | {u['print_date'].strftime('%Y-%d-%m')}" for u in all_inv]
             lookup = {lbl: u for lbl, u in zip(options, all_inv)}
@@ -121,7 +161,6 @@ def render_shipment_batch_form():
 
     notes = st.text_area("Notes (Required if canceling order):", max_chars=255).strip()
 
-    user_id = st.session_state.get("user_id")
     col1, col2 = st.columns([1, 1])
 
     with col1:
@@ -145,6 +184,8 @@ def render_shipment_batch_form():
                     old_updated_by=selected_order["updated_by"],
                     old_updated_at=str(selected_order["updated_at"])
                 )
+                release_reservations(db, holder)
+            st.session_state.pop("fifo_allocation", None)
             st.warning("Order canceled.")
             time.sleep(1.5)
             st.rerun()
@@ -164,10 +205,12 @@ def render_shipment_batch_form():
                     customer_id=selected_order["customer_id"],
                     creator_id=user_id,
                     updated_by=user_id,
-                    picked_by_component=picked_by_sku,
+                    picked_by_sku=picked_by_sku,
                     non_serialized_counts=non_serialized_counts,
-                    notes=notes
+                    notes=notes,
+                    holder=holder
                 )
+            st.session_state.pop("fifo_allocation", None)
             st.success("Shipment created successfully.")
             time.sleep(1.5)
             st.rerun()
@@ -4,7 +4,7 @@ import time
 from services.shipment_services import (
     get_active_shipments,
     get_products_in_shipments,
-    get_open_orders_with_items,
+    get_open_orders_with_items_many,
     get_non_serialized_in_shipment,
     mark_shipment_as_shipped,
     mark_shipment_as_delivered
@@ -30,17 +30,19 @@ def render_shipment_tracker():
         st.info("No active shipments to display.")
         return
 
+    with get_session() as db:
+        order_requests = get_open_orders_with_items_many(db, [s["order_id"] for s in shipments])
+
     for shipment in shipments:
         with st.expander(f"Shipment #{shipment['shipment_id']} to {shipment['customer_name']} ({shipment['status']})"):
             st.markdown(f"**Created:** {shipment['created_date'].strftime('%Y-%m-%d')} \n**Order ID:** {shipment['order_id']}")
 
             with get_session() as db:
-                order_request = get_open_orders_with_items(db, shipment["order_id"])
                 products = get_products_in_shipments(db, shipment["shipment_id"])
                 supplements = get_non_serialized_in_shipment(db, shipment["shipment_id"])
 
             st.markdown("#### Order Request")
-            order_df = pd.DataFrame(order_request["items"])
+            order_df = pd.DataFrame(order_requests[shipment["order_id"]]["items"])
             st.dataframe(order_df, hide_index=True, width='stretch')
 
             st.divider()
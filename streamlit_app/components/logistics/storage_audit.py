@@ -2,11 +2,10 @@ import streamlit as st
 import time
 from sqlalchemy.orm import Session
 from db.orm_session import get_session
-from models.production_models import ProductTracking, ProductStatuses
-from models.lifecycle_stages_models import LifecycleStages
 from models.storage_locations_models import StorageLocation
-from models.product_quality_control_models import ProductQualityControl
 from services.logistics_services import update_tracking_storage
+from services.job_services import get_shelf_stage_mismatch_snapshot, resolve_shelf_stage_mismatch
+from jobs.runner import run_job
 from constants.storage_constants import STAGE_SHELF_RULES
 
 
@@ -15,9 +14,8 @@ def render_shelf_stage_mismatch_report():
     Component to compare product storage locations against product status
     to ensure products are properly stored
 
-    - Fetches available storage locations
-    - Fetches products 
-    - Compares product status to storage location and identifies mismatch
+    - Reads the latest shelf_stage_audit job snapshot (no scan on page load)
+    - Allows re-running the audit on demand
     - Allows user to update location if necessary
     - Updates product_tracking table location_id
     """
@@ -25,34 +23,40 @@ def render_shelf_stage_mismatch_report():
 
     with get_session() as db:
         locations = db.query(StorageLocation).all()
-        results = (
-            db.query(
-                ProductTracking.id,
-                ProductStatuses.status_name,
-                LifecycleStages.stage_code,
-                StorageLocation.id.label("location_id"),
-                StorageLocation.location_name,
-                StorageLocation.description,                
-            )
-            .join(LifecycleStages, ProductTracking.current_stage_id == LifecycleStages.id)
-            .join(StorageLocation, ProductTracking.location_id == StorageLocation.id)
-            .outerjoin(ProductStatuses, ProductTracking.current_status_id == ProductStatuses.id)
-            .all()
-        )
+        run, snapshot = get_shelf_stage_mismatch_snapshot(db)
+
+    col_info, col_run = st.columns([4, 1])
+    with col_info:
+        if run:
+            st.caption(f"Audit run #{run['id']} finished {run['finished_at']:%Y-%m-%d %H:%M}.")
+        else:
+            st.info("The shelf/stage audit has not run yet.")
+    with col_run:
+        if st.button("Run Audit Now", key="run_shelf_stage_audit"):
+            try:
+                if run_job("shelf_stage_audit", triggered_by=f"user:{st.session_state.get('user_id')}") is None:
+                    st.info("The audit is already running; try again shortly.")
+                else:
+                    st.rerun()
+            except Exception as e:
+                st.error("Shelf/stage audit failed.")
+                st.exception(e)
+
+    if not run:
+        return
 
-    mismatches = []
-    for row in results:
-        allowed_keywords = STAGE_SHELF_RULES.get(row.stage_code, [])
-        if not any(keyword in row.description for keyword in allowed_keywords):
-            mismatches.append({
-                "product_id": row.id,
-                "status_name": row.status_name,
-                "stage_code": row.stage_code,
-                "location_id": row.location_id,
-                "location_name": row.location_name,
-                "description": row.description,
-                "allowed_keywords": allowed_keywords,
-            })
+    mismatches = [
+        {
+            "product_id": row["product_tracking_id"],
+            "status_name": row["status_name"],
+            "stage_code": row["stage_code"],
+            "location_id": row["location_id"],
+            "location_name": row["location_name"],
+            "description": row["description"],
+            "allowed_keywords": STAGE_SHELF_RULES.get(row["stage_code"], []),
+        }
+        for row in snapshot
+    ]
 
     if not mismatches:
         st.success("✅ All products are stored in appropriate locations.")
@@ -111,6 +115,7 @@ def render_shelf_stage_mismatch_report():
                             reason=reason,
                             user_id=st.session_state["user_id"]
                         )
+                        resolve_shelf_stage_mismatch(db, item["product_id"])
                     st.success(f"Shelf updated for {item['product_id']}.")
                     time.sleep(1.5)
                     st.rerun()
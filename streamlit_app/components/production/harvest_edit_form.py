@@ -1,17 +1,42 @@
 import streamlit as st
 import time
 from db.orm_session import get_session
-from services.production_services import get_harvested_products, update_harvest_fields
+from services.production_services import get_harvested_products_page, update_harvest_fields
 from services.filament_service import get_mounted_filaments
 from services.lid_services import get_available_lid_batches
 from services.seal_services import get_available_seal_batches
+from components.common.keyset_pager import render_keyset_pager
 
 
+def render_harvest_filters(key: str) -> dict:
+    """SKU, lot and print-date filters for the harvested product pickers."""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sku = st.text_input("SKU", key=f"{key}_filter_sku").strip()
+    with col2:
+        lot_number = st.text_input("Lot Number", key=f"{key}_filter_lot").strip()
+    with col3:
+        date_from = st.date_input("Printed From", value=None, key=f"{key}_filter_from")
+    with col4:
+        date_to = st.date_input("Printed To", value=None, key=f"{key}_filter_to")
+
+    return {
+        "sku": sku or None,
+        "lot_number": lot_number or None,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
 def render_harvest_edit_form():
     st.subheader("Edit Harvested Product Records")
 
-    with get_session() as db:
-        harvested = get_harvested_products(db)
+    filters = render_harvest_filters("harvest_edit")
+
+    def _fetch(after):
+        with get_session() as db:
+            return get_harvested_products_page(db, after=after, **filters)
+
+    harvested = render_keyset_pager("harvest_edit", _fetch, filters).rows
 
     if not harvested:
         st.info("No harvested products available for editing.")
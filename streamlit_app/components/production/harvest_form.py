@@ -3,13 +3,99 @@ import time
 from services.production_services import (
     get_pending_requests,
     insert_product_harvest,
+    insert_product_harvests_bulk,
     cancel_product_request
 )
+from schemas.production_schemas import ProductHarvestCreate
 from services.lid_services import get_available_lid_batches
 from services.seal_services import get_available_seal_batches
 from services.filament_service import get_mountable_filament_mounts
 from db.orm_session import get_session
 
+def render_plate_harvest_form(pending: list[dict]):
+    """
+    Harvests several pending units of one lot (a full build plate) in one transaction.
+    """
+    by_lot: dict[str, list[dict]] = {}
+    for unit in pending:
+        by_lot.setdefault(unit["lot_number"], []).append(unit)
+
+    plate_lots = {lot: units for lot, units in by_lot.items() if len(units) > 1}
+    if not plate_lots:
+        return
+
+    with st.expander("🧱 **Harvest Build Plate** (multiple units of one lot)"):
+        lot = st.selectbox(
+            "Lot",
+            options=list(plate_lots.keys()),
+            format_func=lambda l: f"{l} | {plate_lots[l][0]['sku']} - {plate_lots[l][0]['sku_name']} ({len(plate_lots[l])} pending)",
+            key="plate_lot"
+        )
+        units = plate_lots[lot]
+        unit_labels = {f"Request #{u['id']}": u["id"] for u in units}
+        selected_units = st.multiselect(
+            "Units on this plate",
+            options=list(unit_labels.keys()),
+            default=list(unit_labels.keys()),
+            key=f"plate_units_{lot}"
+        )
+
+        avg = float(units[0]["average_weight_g"] or 0)
+        buffer = float(units[0]["weight_buffer_g"] or 0)
+        required_weight = (avg + buffer) * max(len(selected_units), 1) + 10.0
+
+        with get_session() as db:
+            mounts = get_mountable_filament_mounts(db, required_weight)
+            lid_batches = get_available_lid_batches(db)
+            seal_batches = get_available_seal_batches(db)
+
+        if not mounts:
+            st.info(f"No active mounted printer has {required_weight:.0f}g of filament for this plate.")
+            return
+        if not lid_batches or not seal_batches:
+            st.warning("Passing lid and seal batches are required to harvest.")
+            return
+
+        with st.form(f"plate_form_{lot}"):
+            mount_options = {
+                f"{m['serial_number']} on {m['printer_name']} ({m['remaining_weight']}g left)": m['id']
+                for m in mounts
+            }
+            lid_options = {f"{l['serial_number']}": l["id"] for l in lid_batches}
+            seal_options = {f"{s['serial_number']}": s["id"] for s in seal_batches}
+
+            selected_mount = st.selectbox("Assign Printer with Filament", list(mount_options.keys()))
+            selected_lid = st.selectbox("Select Lid Batch", options=list(lid_options.keys()))
+            selected_seal = st.selectbox("Select Seal Batch", options=list(seal_options.keys()))
+
+            submitted = st.form_submit_button(f"✅ Harvest {len(selected_units)} Units")
+
+        if submitted:
+            if not selected_units:
+                st.warning("Select at least one unit.")
+                return
+            try:
+                user_id = st.session_state.get("user_id")
+                items = [
+                    ProductHarvestCreate(
+                        request_id=unit_labels[label],
+                        filament_mount_id=mount_options[selected_mount],
+                        printed_by=user_id,
+                        lid_id=lid_options[selected_lid],
+                        seal_id=seal_options[selected_seal]
+                    )
+                    for label in selected_units
+                ]
+                with get_session() as db:
+                    harvested = insert_product_harvests_bulk(db, items)
+                codes = ", ".join(h["product_code"] for h in harvested)
+                st.success(f"{len(harvested)} products marked as harvested: {codes}")
+                time.sleep(1.5)
+                st.rerun()
+            except Exception as e:
+                st.error("Error harvesting build plate.")
+                st.exception(e)
+
 def render_harvest_form():
     st.subheader("Fulfill Product Request")
 
@@ -20,6 +106,8 @@ def render_harvest_form():
         st.info("No pending product requests")
         return
 
+    render_plate_harvest_form(pending)
+
     for unit in pending:
         tt = bool(unit.get("is_tech_transfer", 0))
         tt_badge = "| Tech Transfer" if tt else ""
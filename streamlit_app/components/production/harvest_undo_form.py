@@ -1,14 +1,21 @@
 import streamlit as st
 import time
-from services.production_services import get_harvested_products, undo_product_harvest
+from services.production_services import get_harvested_products_page, undo_product_harvest
+from components.common.keyset_pager import render_keyset_pager
+from components.production.harvest_edit_form import render_harvest_filters
 from db.orm_session import get_session
 
 
 def render_harvest_undo_form():
     st.markdown("### Undo Harvested Product")
 
-    with get_session() as db:
-        harvested = get_harvested_products(db)
+    filters = render_harvest_filters("harvest_undo")
+
+    def _fetch(after):
+        with get_session() as db:
+            return get_harvested_products_page(db, after=after, **filters)
+
+    harvested = render_keyset_pager("harvest_undo", _fetch, filters).rows
 
     if not harvested:
         st.info("No harvested products available for undo.")
@@ -1,14 +1,40 @@
 import time
 import streamlit as st
 from db.orm_session import get_session
-from services.qc_services import get_completed_qc_products, update_qc_fields
+from services.qc_services import get_completed_qc_products_page, update_qc_fields
+from components.common.keyset_pager import render_keyset_pager
 
 
 def render_qc_edit_form():
     st.subheader("Edit Completed Product QC")
 
-    with get_session() as db:
-        qc_records = get_completed_qc_products(db)
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        sku = st.text_input("SKU", key="qc_edit_filter_sku").strip()
+    with col2:
+        lot_number = st.text_input("Lot Number", key="qc_edit_filter_lot").strip()
+    with col3:
+        inspection_result = st.selectbox(
+            "Result", ["", "Passed", "B-Ware", "Quarantine", "Waste"], key="qc_edit_filter_result"
+        )
+    with col4:
+        date_from = st.date_input("Inspected From", value=None, key="qc_edit_filter_from")
+    with col5:
+        date_to = st.date_input("Inspected To", value=None, key="qc_edit_filter_to")
+
+    filters = {
+        "sku": sku or None,
+        "lot_number": lot_number or None,
+        "inspection_result": inspection_result or None,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+    def _fetch(after):
+        with get_session() as db:
+            return get_completed_qc_products_page(db, after=after, **filters)
+
+    qc_records = render_keyset_pager("qc_edit", _fetch, filters).rows
 
     if not qc_records:
         st.info("No completed QC records found.")
@@ -1,24 +1,43 @@
 import streamlit as st
-from services.product_status_services import get_all_product_status
+from services.product_status_services import get_product_status_page
 from components.common.refresh_tools import refresh_cache
+from components.common.keyset_pager import render_keyset_pager
 from db.orm_session import get_session
 
 
-@st.cache_data
-def load_product_status_data():
-    with get_session() as db:
-        return get_all_product_status(db)
-    
 def render_status_tracker():
     st.subheader("Product Status Tracker")
     help_text = "Auf Deutsch: Daten Aktualisieren"
-    if refresh_cache("Refresh Product List", help=help_text, key="refresh_status"):
-        load_product_status_data.clear()
+    refresh_cache("Refresh Product List", help=help_text, key="refresh_status")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        sku = st.text_input("SKU", key="status_filter_sku").strip()
+    with col2:
+        lot_number = st.text_input("Lot Number", key="status_filter_lot").strip()
+    with col3:
+        current_stage = st.text_input("Stage", key="status_filter_stage").strip()
+    with col4:
+        date_from = st.date_input("Updated From", value=None, key="status_filter_from")
+    with col5:
+        date_to = st.date_input("Updated To", value=None, key="status_filter_to")
+
+    filters = {
+        "sku": sku or None,
+        "lot_number": lot_number or None,
+        "current_stage": current_stage or None,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+    def _fetch(after):
+        with get_session() as db:
+            return get_product_status_page(db, after=after, **filters)
 
     try:
-        status_data = load_product_status_data()
-        st.dataframe(status_data, width='stretch', column_config={"pressure_drop": st.column_config.NumberColumn(format="%.3f")})
+        page = render_keyset_pager("product_status", _fetch, filters)
+        st.dataframe(page.rows, width='stretch', column_config={"pressure_drop": st.column_config.NumberColumn(format="%.3f")})
         
     except Exception as e:
         st.error("Could not load product status.")
-        st.exception(e)
\ No newline at end of file
+        st.exception(e)
@@ -1,22 +1,56 @@
 import streamlit as st
-from services.quality_management_services import get_audit_log_entries
+from services.quality_management_services import get_audit_log_page
+from services.user_services import get_users
+from components.common.keyset_pager import render_keyset_pager
 from db.orm_session import get_session
 
 
 def render_audit_log_view():
     st.subheader("Audit Log")
 
-    try:
+    with get_session() as db:
+        users = get_users(db)
+    user_labels = {"": None, **{f"{u.display_name} (ID {u.id})": u.id for u in users}}
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        table_name = st.text_input("Table", key="audit_filter_table").strip()
+    with col2:
+        record_id = st.number_input("Record ID", min_value=0, step=1, value=None, key="audit_filter_record")
+    with col3:
+        changed_by = st.selectbox("Changed By", list(user_labels.keys()), key="audit_filter_user")
+    with col4:
+        date_from = st.date_input("From", value=None, key="audit_filter_from")
+    with col5:
+        date_to = st.date_input("To", value=None, key="audit_filter_to")
+    include_archive = st.checkbox(
+        "Include archived history",
+        key="audit_filter_archive",
+        help="Also search months moved to the audit archive (slower)."
+    )
+
+    filters = {
+        "table_name": table_name or None,
+        "record_id": int(record_id) if record_id is not None else None,
+        "changed_by": user_labels[changed_by],
+        "date_from": date_from,
+        "date_to": date_to,
+        "include_archive": include_archive,
+    }
+
+    def _fetch(after):
         with get_session() as db:
-            audit_entries = get_audit_log_entries(db)
+            return get_audit_log_page(db, after=after, **filters)
+
+    try:
+        page = render_keyset_pager("audit_log", _fetch, filters)
     except Exception as e:
         st.error("Failed to load audit log.")
         st.exception(e)
         return
     
-    if not audit_entries:
+    if not page.rows:
         st.info("No audit entries found.")
         return
     
-    st.dataframe(audit_entries, width='stretch')
-    
\ No newline at end of file
+    st.dataframe(page.rows, width='stretch')
@@ -35,40 +35,24 @@ def render_canceled_orders_form():
     st.markdown(f"**Original Notes:** {selected_order['notes'] or 'N/A'}")
 
     st.markdown("#### Product Quantities")
-    product_quantities = {}
+    sku_quantities = {}
     for item in details["product_items"]:
         qty = st.number_input(
-                label=f"{item['product_type']}",
+                label=f"{item['sku']} - {item['sku_name']}",
                 min_value=0,
                 value=item["quantity"],
                 step=1,
-                key=f"prod_{item['product_type_id']}"
+                key=f"prod_{item['product_sku_id']}"
         )
         if qty > 0:
-            product_quantities[item["product_type_id"]] = qty
-
-    st.markdown("#### Supplement Quantities")
-    supplement_quantities = {}
-    if details["supplements"]:
-        for supp in details["supplements"]:
-            qty = st.number_input(
-                label=f"{supp['supplement_name']}",
-                min_value=0,
-                value=supp["quantity"],
-                step=1,
-                key=f"supp_{supp['supplement_id']}"
-            )
-            if qty > 0:
-                supplement_quantities[supp["supplement_id"]] = qty
-    else:
-        st.info("No supplements in the original order.")
+            sku_quantities[item["product_sku_id"]] = qty
         
     updated_notes = st.text_area("Updated Notes (optional)", max_chars=255).strip()
     
     submitted = st.button("Submit New Order")
 
     if submitted:
-        if not product_quantities:
+        if not sku_quantities:
             st.warning("At least one product quantity must be greater than zero.")
             return
         
@@ -78,8 +62,7 @@ def render_canceled_orders_form():
                 customer_id=selected_order['customer_id'],
                 created_by=user_id,
                 updated_by=user_id,
-                product_quantities=product_quantities,
-                supplement_quantities=supplement_quantities,
+                sku_quantities=sku_quantities,
                 notes=f"Recreated from canceled order #{selected_order['order_id']}. {updated_notes}",
                 parent_order_id=selected_order["order_id"]
             )
@@ -8,6 +8,57 @@ env_path = Path(__file__).resolve().parents[1] / ".env"
 if env_path.exists():
     load_dotenv(dotenv_path=env_path)
 
+# Seconds before cached lookup tables (stages, statuses, locations, SKUs) are reloaded
+REFERENCE_DATA_TTL_SECONDS = int(os.getenv("REFERENCE_DATA_TTL_SECONDS", "900"))
+
+# How long a session reuses its resolved user id and access map before re-checking the DB
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+
+# Microsoft Graph (local/MSAL mode group lookups); point GRAPH_API_URL at
+# benchmarks/mock_graph_server.py to develop offline
+GRAPH_API_URL = os.getenv("GRAPH_API_URL", "https://graph.microsoft.com/v1.0").rstrip("/")
+# Group memberships are cached until the Graph token expires; this applies when its expiry is unknown
+GRAPH_GROUPS_DEFAULT_TTL_SECONDS = int(os.getenv("GRAPH_GROUPS_DEFAULT_TTL_SECONDS", "900"))
+
+# Shared read-query cache (utils/query_cache); entries are also dropped on committed writes
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+
+# SQLAlchemy connection pool (db/base.get_engine)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# DB_DEBUG=1 turns on the per-run SQL profiler shown in the sidebar (utils/sql_profiler)
+DB_DEBUG = os.getenv("DB_DEBUG", "0") == "1"
+# Same statement issued this many times from one service function in a run is flagged as N+1
+SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILER_REPEAT_THRESHOLD", "5"))
+
+# How long FIFO-allocated units stay reserved for the person building a shipment
+SHIPMENT_RESERVATION_TTL_SECONDS = int(os.getenv("SHIPMENT_RESERVATION_TTL_SECONDS", "900"))
+
+# Rows expired per transaction by the expiry sweeper (services/expiration_services)
+EXPIRY_SWEEP_BATCH_SIZE = int(os.getenv("EXPIRY_SWEEP_BATCH_SIZE", "1000"))
+
+# Housekeeping jobs (streamlit_app/jobs). The in-process scheduler is off unless enabled;
+# JOB_USER_ID is the users.id recorded as changed_by for automated stage moves
+JOB_SCHEDULER_ENABLED = os.getenv("JOB_SCHEDULER_ENABLED", "0") == "1"
+JOB_SCHEDULER_POLL_SECONDS = int(os.getenv("JOB_SCHEDULER_POLL_SECONDS", "60"))
+JOB_USER_ID = int(os.getenv("JOB_USER_ID")) if os.getenv("JOB_USER_ID") else None
+# Mounted filament below this many grams is reported by the low-filament job
+LOW_FILAMENT_THRESHOLD_G = float(os.getenv("LOW_FILAMENT_THRESHOLD_G", "2500"))
+# audit_log keeps this many whole months besides the current one; the audit_log_rollover
+# job moves older rows to audit_log_archive, AUDIT_ARCHIVE_BATCH_SIZE rows per transaction
+AUDIT_LOG_HOT_MONTHS = int(os.getenv("AUDIT_LOG_HOT_MONTHS", "12"))
+AUDIT_ARCHIVE_BATCH_SIZE = int(os.getenv("AUDIT_ARCHIVE_BATCH_SIZE", "5000"))
+
+# Batch label PDFs (components/label/label_batch): worker processes rendering pages, and
+# how large the PDF may grow in memory before it is spooled to a temp file
+LABEL_RENDER_WORKERS = int(os.getenv("LABEL_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+LABEL_PDF_SPOOL_MAX_BYTES = int(os.getenv("LABEL_PDF_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
     SQLALCHEMY_URL = DATABASE_URL
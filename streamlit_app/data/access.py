@@ -1,37 +1,53 @@
 from __future__ import annotations    
-from sqlalchemy import select 
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from db.orm_session import get_session
+from utils.query_cache import cached_query
 from models.users_models import GroupAreaRight, ApplicationArea
 
 _ACCESS_ORDER = {"Read": 1, "Write": 2, "Admin": 3}
 
+@cached_query(tables=("group_area_rights", "application_areas"))
+def _get_group_area_rights(db: Session) -> dict[str, list[tuple[str, str]]]:
+    """
+    The whole group_area_rights table as { group_oid (lower-case): [(area_name, access_level)] }.
+    Small and read on every page load, so it is loaded once per process and shared
+    by all sessions until a write to either table commits or the cache TTL passes.
+    """
+    rows = db.execute(
+        select(GroupAreaRight.group_oid, ApplicationArea.area_name, GroupAreaRight.access_level)
+        .join(ApplicationArea, GroupAreaRight.area_id == ApplicationArea.id)
+    ).all()
+
+    rights: dict[str, list[tuple[str, str]]] = {}
+    for group_oid, area_name, level in rows:
+        rights.setdefault(str(group_oid).lower(), []).append((area_name, level))
+    return rights
+
 def get_effective_access(group_oids: list[str]) -> dict[str, str]:
     """
     Returns { area_name: access_level } based *only* on group-derived rights
     (dbo.group_area_rights), ignoring any legacy per-user access.
     """
+    if not group_oids:
+        return {}
+
     with get_session() as db:
-        if not group_oids:
-            return {}
-        
-        rows = db.execute(
-            select(ApplicationArea.area_name, GroupAreaRight.access_level)
-            .join(GroupAreaRight, GroupAreaRight.area_id == ApplicationArea.id)
-            .where(GroupAreaRight.group_oid.in_(group_oids))
-        ).all()
-
-        merged: dict[str, str] = {}
-
-        def better(current: str | None, incoming: str) -> str:
-            if not current:
-                return incoming
-            return incoming if _ACCESS_ORDER[incoming] > _ACCESS_ORDER[current] else current
-        
-        for area_name, level in rows:
+        rights = _get_group_area_rights(db)
+
+    merged: dict[str, str] = {}
+
+    def better(current: str | None, incoming: str) -> str:
+        if not current:
+            return incoming
+        return incoming if _ACCESS_ORDER[incoming] > _ACCESS_ORDER[current] else current
+
+    for group_oid in group_oids:
+        for area_name, level in rights.get(str(group_oid).lower(), ()):
             merged[area_name] = better(merged.get(area_name), level)
 
-        return merged 
-    
+    return merged
+
 def get_user_access(user_id: int) -> dict[str, str]:
     """
     Legacy helper; kept if old code still imports it.
@@ -80,7 +80,7 @@ def get_user_by_oid(oid: str):
 def upsert_user_by_oid(*, oid: str, upn: str | None, display_name: str | None):
     """
     Ensure a user exists for this Entra OID.
-    - If found, refresh mutable fields (UPN, display name, is_active).
+    - If found, refresh mutable fields (UPN, display name, is_active) that changed.
     - If not found, insert a new user. 
     Returns (user_id, display_name).
     """
@@ -90,30 +90,23 @@ def upsert_user_by_oid(*, oid: str, upn: str | None, display_name: str | None):
 
     with get_session() as db:
         existing = db.execute(
-            select(User.id, User.display_name).where(User.azure_ad_object_id == oid)
+            select(User.id, User.display_name, User.user_principal_name, User.is_active)
+            .where(User.azure_ad_object_id == oid)
         ).first()
 
         if existing:
+            changes = {}
+            if existing.user_principal_name != (upn or None):
+                changes["user_principal_name"] = upn or None
             if existing.display_name != initials_display:
-                db.execute(
-                    update(User)
-                    .where(User.id == existing.id)
-                    .values(
-                        user_principal_name=(upn or None),
-                        display_name=initials_display,
-                        is_active=True,
-                    )
-                )
-            else:
-                db.execute(
-                    update(User)
-                    .where(User.id == existing.id)
-                    .values(
-                        user_principal_name=(upn or None),
-                        is_active=True,
-                    )
-                )
-            db.commit()
+                changes["display_name"] = initials_display
+            if not existing.is_active:
+                changes["is_active"] = True
+
+            # Nothing to refresh: no UPDATE, no commit
+            if changes:
+                db.execute(update(User).where(User.id == existing.id).values(**changes))
+                db.commit()
             return (existing.id, initials_display)
         
         dept_id = _get_default_department_id(db)
@@ -3,7 +3,17 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 import urllib.parse
 from functools import lru_cache
 import streamlit as st
-from config import SQLALCHEMY_URL
+from config import (
+    SQLALCHEMY_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+)
+from utils.query_cache import install_cache_invalidation
+from utils.db_metrics import InstrumentedQueuePool, install_db_metrics
+from utils.sql_profiler import install_sql_profiler
 
 # Quote for ODBC
 # params = urllib.parse.quote_plus(CONNECTION_STRING)
@@ -25,17 +35,23 @@ Base = declarative_base()
 
 @st.cache_resource
 def get_engine():
-    """Process-wide singleton engine (lazy)"""
-    return create_engine(
-    SQLALCHEMY_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_size=5,
-    max_overflow=10,
-    fast_executemany=True,
-)
+    """Process-wide singleton engine (lazy). Pool sizing comes from the DB_POOL_* settings in config."""
+    engine = create_engine(
+        SQLALCHEMY_URL,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        fast_executemany=True,
+    )
+    install_cache_invalidation(engine)
+    install_db_metrics(engine)
+    install_sql_profiler(engine)
+    return engine
 
 @st.cache_resource
 def get_session_factory():
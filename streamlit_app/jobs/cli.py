@@ -0,0 +1,59 @@
+"""
+Runs housekeeping jobs outside Streamlit (cron / Azure WebJob). Each run is
+recorded in job_runs and its results replace the job's snapshot table.
+
+Examples:
+    python streamlit_app/jobs/cli.py --list
+    python streamlit_app/jobs/cli.py expire_products shelf_stage_audit
+    python streamlit_app/jobs/cli.py all --only-due
+
+The expiry sweep records JOB_USER_ID as the user who moved the products.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from jobs.runner import JOBS, run_job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run housekeeping jobs.")
+    parser.add_argument("jobs", nargs="*", help=f"Job names or 'all' ({', '.join(JOBS)})")
+    parser.add_argument("--only-due", action="store_true", help="Skip jobs that ran within their interval")
+    parser.add_argument("--list", action="store_true", help="List jobs and exit")
+    args = parser.parse_args()
+
+    if args.list or not args.jobs:
+        for job in JOBS.values():
+            print(f"{job.name:<20} every {job.interval_seconds:>5}s  {job.description}")
+        return
+
+    names = list(JOBS) if "all" in args.jobs else args.jobs
+    unknown = [n for n in names if n not in JOBS]
+    if unknown:
+        parser.error(f"Unknown job(s): {', '.join(unknown)}")
+
+    failed = False
+    for name in names:
+        start = time.perf_counter()
+        try:
+            result = run_job(name, triggered_by="cli", only_if_due=args.only_due)
+        except Exception as e:
+            failed = True
+            print(f"{name:<20} FAILED  {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        if result is None:
+            print(f"{name:<20} skipped (running elsewhere or not due)")
+        else:
+            print(f"{name:<20} run {result['run_id']}: {result['rows_affected']} rows in {elapsed:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable
+from sqlalchemy.orm import Session
+from db.base import get_engine, get_session_factory
+from services.job_services import (
+    start_job_run,
+    finish_job_run,
+    get_seconds_since_last_run,
+    run_expiry_sweep,
+    run_shelf_stage_audit,
+    run_low_filament_check,
+    run_material_balance,
+    run_audit_log_rollover,
+)
+from utils.db_locks import session_applock
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    fn: Callable[[Session, int], int]
+    interval_seconds: int
+    description: str
+
+
+JOBS = {
+    job.name: job
+    for job in (
+        Job("expire_products", run_expiry_sweep, 3600, "Move products past expires_at to Expired"),
+        Job("shelf_stage_audit", run_shelf_stage_audit, 900, "Shelf/stage mismatch audit"),
+        Job("low_filaments", run_low_filament_check, 600, "Mounted filament below threshold"),
+        Job("material_balance", run_material_balance, 3600, "Material lot reconciliation"),
+        Job("audit_log_rollover", run_audit_log_rollover, 86400, "Move old audit_log months to the archive"),
+    )
+}
+
+
+def run_job(name: str, triggered_by: str, only_if_due: bool = False) -> dict | None:
+    """
+    Runs one job under a session applock named after it, recording the run in job_runs.
+    Returns {"run_id", "status", "rows_affected"}, or None when another instance holds
+    the lock (or, with only_if_due, the job ran within its interval).
+    Job failures are recorded as 'Failed' and re-raised.
+    """
+    job = JOBS[name]
+
+    with session_applock(get_engine(), f"job:{name}") as conn:
+        if conn is None:
+            return None
+
+        db = get_session_factory()(bind=conn)
+        try:
+            if only_if_due:
+                since = get_seconds_since_last_run(db, name)
+                db.commit()
+                if since is not None and since < job.interval_seconds:
+                    return None
+
+            run_id = start_job_run(db, name, triggered_by)
+            try:
+                rows = job.fn(db, run_id)
+            except Exception as e:
+                db.rollback()
+                finish_job_run(db, run_id, "Failed", error=str(e))
+                logger.error(f"Job {name} failed (run {run_id}): {e}", exc_info=True)
+                raise
+
+            finish_job_run(db, run_id, "Succeeded", rows_affected=rows)
+            return {"run_id": run_id, "status": "Succeeded", "rows_affected": rows}
+        finally:
+            db.close()
@@ -0,0 +1,33 @@
+import logging
+import threading
+import streamlit as st
+from config import JOB_SCHEDULER_ENABLED, JOB_SCHEDULER_POLL_SECONDS
+from jobs.runner import JOBS, run_job
+
+
+logger = logging.getLogger(__name__)
+
+
+def _loop(stop: threading.Event):
+    while not stop.wait(JOB_SCHEDULER_POLL_SECONDS):
+        for name in JOBS:
+            try:
+                run_job(name, triggered_by="scheduler", only_if_due=True)
+            except Exception:
+                # Already recorded in job_runs; keep the other jobs on schedule
+                logger.exception(f"Scheduled job {name} failed")
+
+@st.cache_resource
+def start_job_scheduler() -> threading.Event | None:
+    """
+    Starts one daemon thread per app process that runs each job once its interval has
+    passed. Due-ness comes from job_runs and every run holds the job's applock, so
+    several app instances (or a cron-driven CLI) never run the same job twice.
+    No-op unless JOB_SCHEDULER_ENABLED=1. Returns the thread's stop event.
+    """
+    if not JOB_SCHEDULER_ENABLED:
+        return None
+
+    stop = threading.Event()
+    threading.Thread(target=_loop, args=(stop,), name="job-scheduler", daemon=True).start()
+    return stop
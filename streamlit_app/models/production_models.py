@@ -84,6 +84,7 @@ class ProductTracking(Base):
     current_stage_id = Column(Integer, ForeignKey('lifecycle_stages.id'), nullable=False)
     location_id = Column(Integer, ForeignKey('storage_locations.id'), nullable=True)
     last_updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime, nullable=True, index=True)
     was_tech_transfer = Column(Boolean, nullable=False, default=False)
 
     sku = relationship("ProductSKU", back_populates="trackings", foreign_keys=[sku_id])
@@ -14,6 +14,10 @@ from components.filaments.filament_mount_edit_form import render_edit_mount_form
 from components.filaments.restore_acclimatization_form import render_restore_acclimatization_form
 from components.filaments.filament_update_weight_form import render_filament_weight_update
 from components.common.toggle import toggle_button
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 if "show_active_inventory" not in st.session_state:
@@ -131,3 +135,5 @@ with tab4:
                 render_restore_mount_form()
             case "Acclimatization":
                 render_restore_acclimatization_form()
+
+render_sql_profile()
@@ -4,6 +4,10 @@ from components.lids_seals.lids_seals_add_form import render_add_lid_seal_form
 from components.lids_seals.lids_seals_edit_form import render_edit_lid_form
 from utils.session import require_access, require_login
 from utils.auth_ui import render_account_box
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 # from utils.auth import show_user_sidebar
 
 
@@ -38,3 +42,5 @@ with tab3:
         mode = st.selectbox("Choose edit form:", options=OPTIONS, index=0, key="ls_edit_mode")
         if mode != OPTIONS[0]:
             render_edit_lid_form(mode)
+
+render_sql_profile()
@@ -10,6 +10,10 @@ from components.production.harvest_undo_form import render_harvest_undo_form
 from components.production.qc_form import render_qc_form
 from components.production.qc_edit_form import render_qc_edit_form
 from components.common.toggle import toggle_button
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 if "show_inventory" not in st.session_state:
@@ -82,4 +86,6 @@ with tab5:
             case "Edit Harvest Data":
                 render_harvest_edit_form()
             case "Edit QC Data":
-                render_qc_edit_form()
\ No newline at end of file
+                render_qc_edit_form()
+
+render_sql_profile()
@@ -14,6 +14,10 @@ from components.logistics.shipment_tracker_form import render_shipment_tracker
 
 from components.logistics.expiration_review_form import render_expiration_review
 from components.common.toggle import toggle_button
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 if "create_batch" not in st.session_state:
@@ -101,4 +105,6 @@ with tab6:
         case "Edit Treatment Batch":
             render_treatment_batch_edit_form()
         case "Edit QC Data":
-            render_treatment_qc_edit_form()
\ No newline at end of file
+            render_treatment_qc_edit_form()
+
+render_sql_profile()
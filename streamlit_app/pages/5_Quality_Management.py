@@ -8,6 +8,10 @@ from components.quality_management.investigation_review_form import render_inves
 from components.quality_management.audit_log_view import render_audit_log_view
 from components.quality_management.adhoc_quarantine_form import render_ad_hoc_quarantine
 from components.common.toggle import toggle_button
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 if "view_product_qm" not in st.session_state: 
     st.session_state.view_product_qm = False
@@ -51,4 +55,6 @@ with tab2:
 with tab3:
     toggle_button("view_audit_log", "Show Audit Log", "Hide Audit Log")
     if st.session_state.get("view_audit_log", False):
-        render_audit_log_view()
\ No newline at end of file
+        render_audit_log_view()
+
+render_sql_profile()
@@ -8,6 +8,10 @@ from components.sales.sales_order_form import render_sales_order_form
 from components.sales.canceled_orders_form import render_canceled_orders_form
 # from components.sales.update_order_form import render_update_order_form
 from components.common.toggle import toggle_button
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 st.title("Sales")
@@ -45,4 +49,6 @@ elif toggle == "Re-submit Canceled Orders":
     render_canceled_orders_form()
 
 elif toggle == "Add Customer":
-    render_add_customer_form()
\ No newline at end of file
+    render_add_customer_form()
+
+render_sql_profile()
@@ -2,6 +2,10 @@ import streamlit as st
 from utils.session import require_login, require_access
 # from utils.auth import show_user_sidebar
 from components.label.label_form import render_label_form
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 st.title("Label Generator")
@@ -19,3 +23,4 @@ st.title("Label Generator")
 # --- Render Label UI ---
 render_label_form()
 
+render_sql_profile()
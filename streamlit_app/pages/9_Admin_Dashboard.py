@@ -6,10 +6,16 @@ from components.admin.reason_management import render_reason_management
 from components.admin.print_specs_form import render_print_specs_admin
 from components.admin.sku_create_form import render_sku_create_form
 from components.admin.sku_update_form import render_sku_update_form
+from components.admin.db_diagnostics import render_db_diagnostics
+from components.admin.job_status import render_job_status
 from components.logistics.storage_audit import render_shelf_stage_mismatch_report
 from components.common.admin_record_lookup import render_admin_record_lookup
 from components.common.toggle import toggle_button
 from db.orm_session import get_session
+from utils.page_bootstrap import bootstrap_page
+from utils.db import render_sql_profile
+
+bootstrap_page()
 
 
 st.set_page_config(page_title="Admin Dashboard", layout="wide")
@@ -30,7 +36,9 @@ toggle = st.selectbox(
         "Manage Issue Labels",
         "Update Product Print Specs",
         "Create Product SKU",
-        "Update Product SKU"
+        "Update Product SKU",
+        "Database Diagnostics",
+        "Background Jobs"
     ],
     index=0,
 )
@@ -44,4 +52,12 @@ if toggle == "Create Product SKU":
     render_sku_create_form()
 
 if toggle == "Update Product SKU":
-    render_sku_update_form()
\ No newline at end of file
+    render_sku_update_form()
+
+if toggle == "Database Diagnostics":
+    render_db_diagnostics()
+
+if toggle == "Background Jobs":
+    render_job_status()
+
+render_sql_profile()
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+
+
+class KeysetPage(BaseModel):
+    rows: list[dict]
+    # (sort value, id) of the last row; pass back as `after` to fetch the next page
+    next_after: Optional[tuple[Any, int]] = None
+    has_more: bool = False
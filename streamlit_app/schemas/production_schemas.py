@@ -11,6 +11,14 @@ class ProductRequestCreate(BaseModel):
     is_tech_transfer: bool = False 
 
 
+class ProductHarvestCreate(BaseModel):
+    request_id: int
+    filament_mount_id: int
+    printed_by: int
+    lid_id: int
+    seal_id: int
+
+
 class ProductRequestOut(BaseModel):
     id: int
     sku: str
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from schemas.audit_schemas import FieldChangeAudit
 from models.production_models import ProductSKU
 from utils.db_transaction import transactional
-from services.audit_services import update_record_with_audit
+from services.audit_services import AuditBatch
 
 def get_print_specs_for_sku(db: Session, sku_id: int) -> dict | None:
     row = db.execute(
@@ -53,17 +53,18 @@ def upsert_print_specs(
         """), {"sku_id": sku_id, "h": height_mm, "d": diameter_mm, "awg": average_weight_g, "wbg": weight_buffer_g})
 
         # --- Audit each field as "created" (old=None) ---
-        for field, new_value in new_vals.items():
-            audit = FieldChangeAudit(
-                table="product_print_specs",
-                record_id=sku_id,          # record_id will be sku_id for this table
-                field=field,
-                old_value=None,
-                new_value=new_value,
-                reason=reason,
-                changed_by=changed_by,
-            )
-            update_record_with_audit(db, audit, update=False)
+        with AuditBatch(db) as batch:
+            for field, new_value in new_vals.items():
+                audit = FieldChangeAudit(
+                    table="product_print_specs",
+                    record_id=sku_id,          # record_id will be sku_id for this table
+                    field=field,
+                    old_value=None,
+                    new_value=new_value,
+                    reason=reason,
+                    changed_by=changed_by,
+                )
+                batch.add(audit, update=False)
 
     else:
         # --- Update row ---
@@ -77,18 +78,19 @@ def upsert_print_specs(
         """), {"sku_id": sku_id, "h": height_mm, "d": diameter_mm, "awg": average_weight_g, "wbg": weight_buffer_g})
 
         # --- Audit only changed fields ---
-        for field, new_value in new_vals.items():
-            old_value = existing.get(field)
-            audit = FieldChangeAudit(
-                table="product_print_specs",
-                record_id=sku_id,
-                field=field,
-                old_value=old_value,
-                new_value=new_value,
-                reason=reason,
-                changed_by=changed_by,
-            )
-            update_record_with_audit(db, audit, update=False)
+        with AuditBatch(db) as batch:
+            for field, new_value in new_vals.items():
+                old_value = existing.get(field)
+                audit = FieldChangeAudit(
+                    table="product_print_specs",
+                    record_id=sku_id,
+                    field=field,
+                    old_value=old_value,
+                    new_value=new_value,
+                    reason=reason,
+                    changed_by=changed_by,
+                )
+                batch.add(audit, update=False)
 
     db.commit()
 
@@ -207,16 +209,17 @@ def update_product_sku_with_audit(
     if not current:
         raise ValueError("SKU not found.")
 
-    for field, new_value in changes.items():
-        audit = FieldChangeAudit(
-            table="product_skus",
-            record_id=sku_id,
-            field=field,
-            old_value=current.get(field),
-            new_value=new_value,
-            reason=reason.strip(),
-            changed_by=changed_by,
-        )
-        update_record_with_audit(db, audit, update=True)
+    with AuditBatch(db) as batch:
+        for field, new_value in changes.items():
+            audit = FieldChangeAudit(
+                table="product_skus",
+                record_id=sku_id,
+                field=field,
+                old_value=current.get(field),
+                new_value=new_value,
+                reason=reason.strip(),
+                changed_by=changed_by,
+            )
+            batch.add(audit, update=True)
 
     db.commit()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import re
+import models  # noqa: F401 - registers every mapper before the registry below is built
 from db.base import Base
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -6,58 +7,99 @@ from sqlalchemy.types import Float, Numeric, DECIMAL
 from schemas.audit_schemas import FieldChangeAudit
 from utils.db_transaction import transactional
 from constants.audit_constants import ALLOWED_AUDIT_TABLES
+from config import AUDIT_LOG_HOT_MONTHS, AUDIT_ARCHIVE_BATCH_SIZE
 
 
-def get_model_class_by_table_name(table_name: str):
+SAFE_FIELD_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+INSERT_AUDIT_LOG = text("""
+    INSERT INTO audit_log (table_name, record_id, field_name, old_value, new_value, reason, changed_by)
+    VALUES (:t, :r, :f, :o, :n, :rsn, :u)
+""")
+
+
+def _build_model_registry() -> tuple[dict[str, type], dict[str, frozenset[str]]]:
+    """
+    Table name -> model class, and table name -> names of its float/decimal columns.
+    Built once at import from the mapper registry.
+    """
+    models_by_table = {}
+    float_columns = {}
     for mapper in Base.registry.mappers:
         model_class = mapper.class_
-        if hasattr(model_class, "__tablename__") and model_class.__tablename__ == table_name:
-            return model_class
-    return None
+        table_name = getattr(model_class, "__tablename__", None)
+        if table_name is None or table_name in models_by_table:
+            continue
+        models_by_table[table_name] = model_class
+        float_columns[table_name] = frozenset(
+            column.name
+            for column in model_class.__table__.columns
+            if isinstance(column.type, (Float, Numeric, DECIMAL))
+        )
+    return models_by_table, float_columns
 
-def update_record_with_audit(db: Session, data: FieldChangeAudit, update: bool = True):
-    model_class = get_model_class_by_table_name(data.table)
+MODELS_BY_TABLE, FLOAT_COLUMNS = _build_model_registry()
 
-    is_float_field = False
 
-    if model_class:
-        try:
-            column = model_class.__table__.columns[data.field]
-            if isinstance(column.type, (Float, Numeric, DECIMAL)):
-                is_float_field = True
-        except Exception:
-            pass
-    
-    if is_float_field:
+def get_model_class_by_table_name(table_name: str):
+    return MODELS_BY_TABLE.get(table_name)
+
+def _is_unchanged(data: FieldChangeAudit) -> bool:
+    if data.field in FLOAT_COLUMNS.get(data.table, ()):
         try:
             old_float = round(float(data.old_value), 5) if data.old_value is not None else None
             new_float = round(float(data.new_value), 5) if data.new_value is not None else None
-            if old_float == new_float:
-                return
+            return old_float == new_float
         except Exception:
-            pass
-    
-    else:
-        if str(data.old_value) == str(data.new_value):
+            return False
+    return str(data.old_value) == str(data.new_value)
+
+
+class AuditBatch:
+    """
+    Collects field changes and writes them in one go: all changes to the same record
+    become a single UPDATE and every audit_log row goes out in one executemany.
+
+        with AuditBatch(db) as batch:
+            for field, (old, new) in updates.items():
+                batch.add(FieldChangeAudit(...))
+        db.commit()
+
+    Rows are written when the block exits without an exception (or on flush()); the
+    caller still owns the transaction. Validation happens in add(), so a bad table or
+    field raises before anything is written.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._updates: dict[tuple[str, int], dict[str, object]] = {}
+        self._audit_rows: list[dict] = []
+
+    def __enter__(self) -> "AuditBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._updates.clear()
+            self._audit_rows.clear()
+        return False
+
+    def add(self, data: FieldChangeAudit, update: bool = True):
+        if _is_unchanged(data):
             return
-    
-    if data.table not in ALLOWED_AUDIT_TABLES:
-        raise ValueError("Unauthorized table")
-    
-    if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", data.field):
-        raise ValueError("Unsafe field name")
-    
-    if update:
-        db.execute(text(
-            f"UPDATE {data.table} SET {data.field} = :val WHERE id = :rid"
-        ), {"val": data.new_value, "rid": data.record_id})
-
-    db.execute(
-        text("""
-        INSERT INTO audit_log (table_name, record_id, field_name, old_value, new_value, reason, changed_by)
-        VALUES (:t, :r, :f, :o, :n, :rsn, :u)
-        """),
-        {
+
+        if data.table not in ALLOWED_AUDIT_TABLES:
+            raise ValueError("Unauthorized table")
+
+        if not SAFE_FIELD_RE.match(data.field):
+            raise ValueError("Unsafe field name")
+
+        if update:
+            self._updates.setdefault((data.table, data.record_id), {})[data.field] = data.new_value
+
+        self._audit_rows.append({
             "t": data.table,
             "r": data.record_id,
             "f": data.field,
@@ -65,5 +107,72 @@ def update_record_with_audit(db: Session, data: FieldChangeAudit, update: bool =
             "n": str(data.new_value),
             "rsn": data.reason,
             "u": data.changed_by
-        }
-    )
+        })
+
+    def flush(self):
+        for (table, record_id), fields in self._updates.items():
+            assignments = ", ".join(f"{field} = :v{i}" for i, field in enumerate(fields))
+            params = {f"v{i}": value for i, value in enumerate(fields.values())}
+            params["rid"] = record_id
+            self.db.execute(text(f"UPDATE {table} SET {assignments} WHERE id = :rid"), params)
+
+        if self._audit_rows:
+            self.db.execute(INSERT_AUDIT_LOG, self._audit_rows)
+
+        self._updates.clear()
+        self._audit_rows.clear()
+
+
+def update_record_with_audit(db: Session, data: FieldChangeAudit, update: bool = True):
+    """Single change; use AuditBatch when several fields or records change together."""
+    with AuditBatch(db) as batch:
+        batch.add(data, update)
+
+def archive_audit_log(
+    db: Session,
+    hot_months: int = AUDIT_LOG_HOT_MONTHS,
+    batch_size: int = AUDIT_ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Moves audit_log rows from before the last `hot_months` whole months into
+    audit_log_archive, keeping their ids. Each batch is deleted and archived in one
+    round trip and committed on its own, so locks stay short and a failure keeps
+    the batches already moved. Returns the number of rows archived.
+    """
+    total = 0
+    while True:
+        moved = db.execute(text(
+            """
+                SET NOCOUNT ON;
+                DECLARE @cutoff DATETIME2 = DATEADD(MONTH, DATEDIFF(MONTH, 0, GETDATE()) - :hot_months, 0);
+                DECLARE @moved TABLE (
+                    id INT PRIMARY KEY,
+                    table_name NVARCHAR(100),
+                    record_id INT,
+                    field_name NVARCHAR(100),
+                    old_value NVARCHAR(MAX),
+                    new_value NVARCHAR(MAX),
+                    reason NVARCHAR(255),
+                    changed_by INT,
+                    changed_at DATETIME2
+                );
+
+                DELETE TOP (:batch) FROM audit_log
+                OUTPUT deleted.id, deleted.table_name, deleted.record_id, deleted.field_name, deleted.old_value,
+                       deleted.new_value, deleted.reason, deleted.changed_by, deleted.changed_at
+                INTO @moved
+                WHERE changed_at < @cutoff;
+
+                INSERT INTO audit_log_archive (
+                    id, table_name, record_id, field_name, old_value, new_value, reason, changed_by, changed_at
+                )
+                SELECT id, table_name, record_id, field_name, old_value, new_value, reason, changed_by, changed_at
+                FROM @moved;
+
+                SELECT COUNT(*) FROM @moved;
+            """
+        ), {"hot_months": hot_months, "batch": batch_size}).scalar()
+        db.commit()
+        total += moved or 0
+        if not moved or moved < batch_size:
+            return total
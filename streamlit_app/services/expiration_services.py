@@ -1,92 +1,119 @@
-from sqlalchemy import text, bindparam
+from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from services.reference_services import get_stage_id
+from config import EXPIRY_SWEEP_BATCH_SIZE
 
 
+SHELF_LIFE_YEARS = 1
+EXPIRING_SOON_DAYS = 7
+EXPIRY_REASON = "Auto-expired after 1 year"
+
+
+def compute_expires_at(print_date: datetime | None) -> datetime | None:
+    """print_date + SHELF_LIFE_YEARS, matching SQL Server's DATEADD(YEAR, ...) (Feb 29 -> Feb 28)."""
+    if print_date is None:
+        return None
+    try:
+        return print_date.replace(year=print_date.year + SHELF_LIFE_YEARS)
+    except ValueError:
+        return print_date.replace(year=print_date.year + SHELF_LIFE_YEARS, day=28)
+
 def get_expiring_products(db: Session):
-    # Products within 7 days of expiry, but not over a year old
-    expiring_soon = db.execute(text(
-        """
-            SELECT pt.id, ph.print_date, s.sku, s.name AS sku_name
-            FROM product_tracking pt
-            JOIN product_harvest ph ON pt.harvest_id = ph.id
-            JOIN product_requests pr ON ph.request_id = pr.id
-            JOIN product_skus s ON s.id = pt.sku_id
-            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
-            WHERE
-                ls.stage_code != 'Expired'
-                AND ph.print_date < DATEADD(DAY, -358 , GETDATE())
-                AND ph.print_date >= DATEADD(YEAR, -1, GETDATE())
-        """
-    )).fetchall()
-
-    # Products that are over 1 year old, not already expired
-    expired = db.execute(text(
-        """
-            SELECT pt.id, ph.print_date, s.sku, s.name AS sku_name
-            FROM product_tracking pt
-            JOIN product_harvest ph ON pt.harvest_id = ph.id
-            JOIN product_requests pr ON ph.request_id = pr.id
-            JOIN product_skus s ON s.id = pt.sku_id
-            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
-            WHERE 
-                ls.stage_code != 'Expired'
-                AND ph.print_date < DATEADD(YEAR, -1, GETDATE())
-        """
-    )).fetchall()
+    expired_stage_id = get_stage_id(db, "Expired")
+    sql = """
+        SELECT pt.id, ph.print_date, pt.expires_at, s.sku, s.name AS sku_name
+        FROM product_tracking pt
+        JOIN product_harvest ph ON pt.harvest_id = ph.id
+        JOIN product_skus s ON s.id = pt.sku_id
+        WHERE
+            pt.current_stage_id <> :expired_stage_id
+            AND {window}
+        ORDER BY pt.expires_at
+    """
+
+    # Products within 7 days of expiry
+    expiring_soon = db.execute(text(sql.format(
+        window="pt.expires_at >= GETDATE() AND pt.expires_at < DATEADD(DAY, :days, GETDATE())"
+    )), {"expired_stage_id": expired_stage_id, "days": EXPIRING_SOON_DAYS}).fetchall()
+
+    # Products past expiry, not already expired
+    expired = db.execute(text(sql.format(
+        window="pt.expires_at < GETDATE()"
+    )), {"expired_stage_id": expired_stage_id}).fetchall()
 
     return (
         [dict(r._mapping) for r in expiring_soon],
         [dict(r._mapping) for r in expired]
     )
 
+def backfill_expires_at(db: Session, batch_size: int = EXPIRY_SWEEP_BATCH_SIZE) -> int:
+    """
+    Fills expires_at for tracking rows written without one (e.g. by the ETL),
+    batch_size rows per transaction. Returns the number of rows filled.
+    """
+    total = 0
+    while True:
+        filled = db.execute(text(
+            """
+                UPDATE TOP (:batch) pt
+                SET expires_at = DATEADD(YEAR, :years, ph.print_date)
+                FROM product_tracking pt
+                JOIN product_harvest ph ON pt.harvest_id = ph.id
+                WHERE pt.expires_at IS NULL
+                    AND ph.print_date IS NOT NULL
+            """
+        ), {"batch": batch_size, "years": SHELF_LIFE_YEARS}).rowcount
+        db.commit()
+        total += filled
+        if filled < batch_size:
+            return total
+
+def expire_due_products(db: Session, user_id: int, batch_size: int = EXPIRY_SWEEP_BATCH_SIZE) -> int:
+    """
+    Moves every product past its expires_at to the Expired stage, set-based and
+    batch_size rows per transaction so locks stay short. Each batch moves the rows
+    and writes their history in one round trip. Safe to run repeatedly (CLI, UI).
+    Returns the number of products expired.
+    """
+    expired_stage_id = get_stage_id(db, "Expired")
+    if not expired_stage_id:
+        raise ValueError("Stage 'Expired' not found.")
+
+    backfill_expires_at(db, batch_size)
+
+    total = 0
+    while True:
+        moved = db.execute(text(
+            """
+                SET NOCOUNT ON;
+                DECLARE @batch TABLE (id INT PRIMARY KEY, from_stage_id INT);
+
+                UPDATE TOP (:batch) pt
+                SET previous_stage_id = pt.current_stage_id,
+                    current_stage_id = :expired_stage_id,
+                    last_updated_at = GETDATE()
+                OUTPUT inserted.id, deleted.current_stage_id INTO @batch (id, from_stage_id)
+                FROM product_tracking pt
+                WHERE pt.expires_at < GETDATE()
+                    AND pt.current_stage_id <> :expired_stage_id;
+
+                INSERT INTO product_status_history (product_tracking_id, from_stage_id, to_stage_id, reason, changed_by)
+                SELECT id, from_stage_id, :expired_stage_id, :reason, :user_id
+                FROM @batch;
+
+                SELECT COUNT(*) FROM @batch;
+            """
+        ), {
+            "batch": batch_size,
+            "expired_stage_id": expired_stage_id,
+            "reason": EXPIRY_REASON,
+            "user_id": user_id,
+        }).scalar()
+        db.commit()
+        total += moved or 0
+        if not moved or moved < batch_size:
+            return total
+
 def expire_eligible_products(db: Session, user_id: int) -> int:
-    # Get stage ID for 'Expired'
-    expired_stage_id = db.scalar(text(
-        """
-            SELECT id FROM lifecycle_stages WHERE stage_code = 'Expired'
-        """
-    ))
-    # Get eligible product IDs
-    product_ids = db.execute(text(
-        """
-            SELECT pt.id
-            FROM product_tracking pt
-            JOIN product_harvest ph ON pt.harvest_id = ph.id
-            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
-            WHERE 
-                ls.stage_code != 'Expired'
-                AND ph.print_date < DATEADD(YEAR, -1, GETDATE())
-        """
-    )).scalars().all()
-
-    if not product_ids:
-        return 0
-    
-    # Update products' current_stage_id
-    sql = text(
-        """
-            UPDATE product_tracking
-            SET 
-                previous_stage_id = current_stage_id,
-                current_stage_id = :stage,
-                last_updated_at = GETDATE()
-            WHERE id IN :ids
-        """
-    ).bindparams(bindparam("ids", expanding=True))
-    db.execute(sql, {"stage": expired_stage_id, "ids": product_ids})
-
-    # Insert into product_stages_history
-    
-    sql = text(
-        """
-            INSERT INTO product_status_history (product_id, from_stage_id, to_stage_id, reason, changed_by)
-            SELECT pt.id, pt.previous_stage_id, :to_stage, 'Auto-expired after 1 year', :user
-            FROM product_tracking pt
-            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
-            WHERE pt.id IN :ids
-        """
-    ).bindparams(bindparam("ids", expanding=True))
-    db.execute(sql, {"to_stage": expired_stage_id, "user": user_id, "ids": product_ids})
-
-    db.commit()
-    return len(product_ids)
\ No newline at end of file
+    return expire_due_products(db, user_id)
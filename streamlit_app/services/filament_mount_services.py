@@ -3,7 +3,7 @@ from sqlalchemy import select, text
 from models.filament_models import FilamentMounting
 from schemas.filament_mount_schemas import FilamentMountOut
 from schemas.audit_schemas import FieldChangeAudit
-from services.audit_services import update_record_with_audit
+from services.audit_services import AuditBatch
 from utils.db_transaction import transactional
 
 
@@ -44,15 +44,16 @@ def update_mount_fields(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="filament_mounting",
-            record_id=mount_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="filament_mounting",
+                record_id=mount_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     db.commit()
\ No newline at end of file
@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, update, func, text, and_
 from typing import Optional
 from datetime import datetime, timezone
-from services.audit_services import update_record_with_audit
+from services.audit_services import AuditBatch, update_record_with_audit
 from models.filament_models import (
     Filament,
     FilamentMounting,
@@ -19,7 +19,9 @@ from schemas.filament_schemas import (
 from schemas.storage_location_schemas import StorageLocationOut
 from schemas.printer_schemas import PrinterOut
 from schemas.audit_schemas import FieldChangeAudit
+from schemas.pagination_schemas import KeysetPage
 from utils.db_transaction import transactional
+from utils.pagination import DEFAULT_PAGE_SIZE, build_filters, fetch_keyset_page
 
 @transactional
 def insert_filament(db: Session, data: FilamentCreate) -> FilamentOut:
@@ -41,6 +43,35 @@ def get_all_filament_statuses(db: Session) -> list[dict]:
     cols = result.keys()
     return [dict(zip(cols, row)) for row in result.fetchall()]
 
+@transactional
+def get_filament_statuses_page(
+    db: Session,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    current_status: Optional[str] = None,
+    lot_number: Optional[str] = None,
+    location_name: Optional[str] = None,
+    qc_result: Optional[str] = None,
+) -> KeysetPage:
+    """
+    Keyset-paginated get_all_filament_statuses, ordered by filament_id.
+    `after` is the (filament_id, id) cursor from the previous page. The view has a
+    row per mounting/acclimatization, so a page holds `limit` filaments with all their rows.
+    """
+    clauses, params = build_filters([
+        ("current_status = :current_status", "current_status", current_status),
+        ("lot_number = :lot_number", "lot_number", lot_number),
+        ("location_name = :location_name", "location_name", location_name),
+        ("qc_result = :qc_result", "qc_result", qc_result),
+    ])
+    return fetch_keyset_page(
+        db, "SELECT * FROM v_filament_status",
+        sort_col="filament_id", id_col="id",
+        sort_key="filament_id", id_key="id",
+        after=after, limit=limit, clauses=clauses, params=params,
+        descending=False, fan_out=True,
+    )
+
 @transactional
 def get_filaments_not_acclimatizing(db: Session) -> list[dict]:
     sql = """
@@ -225,17 +256,18 @@ def update_filament_fields(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="filaments",
-            record_id=filament_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="filaments",
+                record_id=filament_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     db.commit()
 
 @transactional
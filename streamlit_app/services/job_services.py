@@ -0,0 +1,223 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from constants.storage_constants import STAGE_SHELF_RULES
+from services.expiration_services import expire_due_products
+from services.audit_services import archive_audit_log
+from utils.query_cache import cached_query
+from config import JOB_USER_ID, LOW_FILAMENT_THRESHOLD_G
+
+
+# ---------- Run log ----------
+
+def start_job_run(db: Session, job_name: str, triggered_by: str) -> int:
+    run_id = db.execute(text(
+        """
+            INSERT INTO job_runs (job_name, triggered_by)
+            OUTPUT inserted.id
+            VALUES (:job_name, :triggered_by)
+        """
+    ), {"job_name": job_name, "triggered_by": triggered_by}).scalar_one()
+    db.commit()
+    return run_id
+
+def finish_job_run(db: Session, run_id: int, status: str, rows_affected: int | None = None, error: str | None = None):
+    db.execute(text(
+        """
+            UPDATE job_runs
+            SET status = :status,
+                finished_at = GETDATE(),
+                rows_affected = :rows_affected,
+                error = :error
+            WHERE id = :run_id
+        """
+    ), {"status": status, "rows_affected": rows_affected, "error": error, "run_id": run_id})
+    db.commit()
+
+def get_seconds_since_last_run(db: Session, job_name: str) -> float | None:
+    """Seconds since the job last started on any instance (None if it never ran)."""
+    return db.execute(text(
+        """
+            SELECT TOP 1 DATEDIFF(SECOND, started_at, GETDATE())
+            FROM job_runs
+            WHERE job_name = :job_name
+            ORDER BY id DESC
+        """
+    ), {"job_name": job_name}).scalar()
+
+@cached_query(tables=("job_runs",))
+def get_latest_job_runs(db: Session) -> list[dict]:
+    """Most recent run of every job, newest first."""
+    rows = db.execute(text(
+        """
+            SELECT id, job_name, triggered_by, status, started_at, finished_at, rows_affected, error
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY job_name ORDER BY id DESC) AS rn
+                FROM job_runs
+            ) r
+            WHERE r.rn = 1
+            ORDER BY r.started_at DESC
+        """
+    )).fetchall()
+    return [dict(r._mapping) for r in rows]
+
+def _latest_snapshot(db: Session, job_name: str, table: str, order_by: str) -> tuple[dict | None, list[dict]]:
+    run = db.execute(text(
+        """
+            SELECT TOP 1 id, finished_at, rows_affected
+            FROM job_runs
+            WHERE job_name = :job_name AND status = 'Succeeded'
+            ORDER BY id DESC
+        """
+    ), {"job_name": job_name}).fetchone()
+    if not run:
+        return None, []
+
+    rows = db.execute(text(
+        f"SELECT * FROM {table} WHERE run_id = :run_id ORDER BY {order_by}"
+    ), {"run_id": run.id}).fetchall()
+    return dict(run._mapping), [dict(r._mapping) for r in rows]
+
+def _replace_snapshot(db: Session, table: str, run_id: int):
+    """Drops earlier runs' rows; called in the same transaction as the new rows are written."""
+    db.execute(text(f"DELETE FROM {table} WHERE run_id <> :run_id"), {"run_id": run_id})
+
+
+# ---------- Jobs ----------
+# Each job takes (db, run_id), does its work set-based and returns the row count for the run log.
+# The runner commits, so a snapshot and its run status become visible together.
+
+def run_expiry_sweep(db: Session, run_id: int) -> int:
+    if JOB_USER_ID is None:
+        raise ValueError("JOB_USER_ID is not set; the expiry sweep needs a user to record in stage history.")
+    return expire_due_products(db, JOB_USER_ID)
+
+def run_audit_log_rollover(db: Session, run_id: int) -> int:
+    """Moves audit_log months older than AUDIT_LOG_HOT_MONTHS to audit_log_archive."""
+    return archive_audit_log(db)
+
+def run_shelf_stage_audit(db: Session, run_id: int) -> int:
+    """Snapshots every product whose shelf description matches none of its stage's STAGE_SHELF_RULES keywords."""
+    rules = [(stage, keyword) for stage, keywords in STAGE_SHELF_RULES.items() for keyword in keywords]
+    values = ", ".join(f"(:stage_{i}, :keyword_{i})" for i in range(len(rules)))
+    params = {"run_id": run_id}
+    for i, (stage, keyword) in enumerate(rules):
+        params[f"stage_{i}"] = stage
+        params[f"keyword_{i}"] = keyword
+
+    inserted = db.execute(text(
+        f"""
+            WITH rules AS (
+                SELECT stage_code, keyword FROM (VALUES {values}) AS v(stage_code, keyword)
+            )
+            INSERT INTO job_shelf_stage_mismatches (
+                run_id, product_tracking_id, status_name, stage_code, location_id, location_name, description
+            )
+            SELECT :run_id, pt.id, ps.status_name, ls.stage_code, sl.id, sl.location_name, sl.description
+            FROM product_tracking pt
+            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
+            JOIN storage_locations sl ON pt.location_id = sl.id
+            LEFT JOIN product_statuses ps ON pt.current_status_id = ps.id
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM rules r
+                WHERE r.stage_code = ls.stage_code
+                    -- Same as Python's `keyword in description`: ordinal, case-sensitive, NULL as ''
+                    AND CHARINDEX(r.keyword COLLATE Latin1_General_BIN2, ISNULL(sl.description, N'') COLLATE Latin1_General_BIN2) > 0
+            )
+        """
+    ), params).rowcount
+    _replace_snapshot(db, "job_shelf_stage_mismatches", run_id)
+    return inserted
+
+def run_low_filament_check(db: Session, run_id: int) -> int:
+    """Snapshots mounted filaments below LOW_FILAMENT_THRESHOLD_G grams."""
+    inserted = db.execute(text(
+        """
+            INSERT INTO job_low_filaments (run_id, mount_id, serial_number, remaining_weight, printer_name)
+            SELECT :run_id, fm.id, f.serial_number, fm.remaining_weight, p.name
+            FROM filament_mounting fm
+            JOIN filaments f ON fm.filament_tracking_id = f.id
+            JOIN printers p ON fm.printer_id = p.id
+            WHERE fm.status = 'In Use'
+                AND fm.remaining_weight < :threshold
+        """
+    ), {"run_id": run_id, "threshold": LOW_FILAMENT_THRESHOLD_G}).rowcount
+    _replace_snapshot(db, "job_low_filaments", run_id)
+    return inserted
+
+def run_material_balance(db: Session, run_id: int) -> int:
+    """
+    Reconciles every material lot: received - recorded usage - on hand.
+    Filament on hand is the latest mount's remaining weight (received weight if never
+    mounted); lids/seals on hand is batch quantity minus harvests that used the batch.
+    A non-zero variance means usage was not recorded (or recorded twice) for that lot.
+    """
+    inserted = db.execute(text(
+        """
+            WITH lots AS (
+                SELECT
+                    'Filament' AS material_type,
+                    f.lot_number,
+                    SUM(f.weight_grams) AS received_qty,
+                    SUM(ISNULL(m.remaining_weight, f.weight_grams)) AS on_hand_qty
+                FROM filaments f
+                OUTER APPLY (
+                    SELECT TOP 1 fm.remaining_weight
+                    FROM filament_mounting fm
+                    WHERE fm.filament_tracking_id = f.id
+                    ORDER BY fm.mounted_at DESC, fm.id DESC
+                ) m
+                GROUP BY f.lot_number
+
+                UNION ALL
+
+                SELECT 'Lid', l.serial_number, l.quantity, l.quantity - h.harvested
+                FROM lids l
+                OUTER APPLY (SELECT COUNT(*) AS harvested FROM product_harvest ph WHERE ph.lid_id = l.id) h
+
+                UNION ALL
+
+                SELECT 'Seal', s.serial_number, s.quantity, s.quantity - h.harvested
+                FROM seals s
+                OUTER APPLY (SELECT COUNT(*) AS harvested FROM product_harvest ph WHERE ph.seal_id = s.id) h
+            )
+            INSERT INTO job_material_balance (
+                run_id, material_type, lot_number, received_qty, used_qty, on_hand_qty, variance_qty
+            )
+            SELECT
+                :run_id,
+                lots.material_type,
+                lots.lot_number,
+                lots.received_qty,
+                ISNULL(u.used_quantity, 0),
+                lots.on_hand_qty,
+                lots.received_qty - ISNULL(u.used_quantity, 0) - lots.on_hand_qty
+            FROM lots
+            LEFT JOIN dbo.v_material_lot_usage u WITH (NOEXPAND)
+                ON u.material_type = lots.material_type AND u.lot_number = lots.lot_number
+        """
+    ), {"run_id": run_id}).rowcount
+    _replace_snapshot(db, "job_material_balance", run_id)
+    return inserted
+
+
+# ---------- Snapshots (UI) ----------
+
+@cached_query(tables=("job_runs", "job_shelf_stage_mismatches"))
+def get_shelf_stage_mismatch_snapshot(db: Session) -> tuple[dict | None, list[dict]]:
+    return _latest_snapshot(db, "shelf_stage_audit", "job_shelf_stage_mismatches", "product_tracking_id")
+
+@cached_query(tables=("job_runs", "job_low_filaments"))
+def get_low_filament_snapshot(db: Session) -> tuple[dict | None, list[dict]]:
+    return _latest_snapshot(db, "low_filaments", "job_low_filaments", "remaining_weight")
+
+@cached_query(tables=("job_runs", "job_material_balance"))
+def get_material_balance_snapshot(db: Session) -> tuple[dict | None, list[dict]]:
+    return _latest_snapshot(db, "material_balance", "job_material_balance", "ABS(variance_qty) DESC, material_type, lot_number")
+
+def resolve_shelf_stage_mismatch(db: Session, product_id: int):
+    """Drops a corrected product from the current snapshot so it disappears before the next audit."""
+    db.execute(text(
+        "DELETE FROM job_shelf_stage_mismatches WHERE product_tracking_id = :pid"
+    ), {"pid": product_id})
+    db.commit()
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select
+from sqlalchemy import text, select, bindparam
+from collections import defaultdict
 from models.filament_models import Filament, FilamentMounting
 from models.production_models import ProductTracking, ProductHarvest, ProductRequest, ProductType, ProductStatuses, ProductSKU
 from models.lifecycle_stages_models import LifecycleStages
@@ -16,13 +17,31 @@ from schemas.logistics_schemas import (
     AdHocQuarantineStorageCandidate
 )
 from schemas.audit_schemas import FieldChangeAudit
-from services.audit_services import update_record_with_audit
-from services.tracking_service import log_product_status_change, update_product_stage, update_product_status
+from services.audit_services import AuditBatch, update_record_with_audit
+from services.tracking_service import (
+    log_product_status_change,
+    update_product_stage,
+    bulk_update_product_stage,
+    bulk_update_product_status,
+    chunked
+)
 from services.quality_management_services import create_quarantine_record
+from services.reference_services import get_stage_id, get_stage_id_by_name, get_location_id
 from constants.product_status_constants import STATUS_MAP_QC_TO_BUSINESS
 from utils.db_transaction import transactional
-
-
+from utils.query_cache import cached_query
+
+
+@cached_query(tables=(
+    "product_tracking",
+    "lifecycle_stages",
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "product_quality_control",
+    "product_statuses",
+    "storage_locations",
+))
 @transactional
 def get_qc_passed_products(db: Session) -> list[TreatmentBatchProductCandidate]:
     stmt = (
@@ -72,38 +91,47 @@ def create_treatment_batch(db: Session, data: TreatmentBatchCreate):
     db.add(batch)
     db.flush()
 
-    offsite_id = db.execute(
-        text("SELECT id FROM storage_locations WHERE location_name = 'Offsite'")
-    ).scalar_one()
+    offsite_id = get_location_id(db, "Offsite")
     
     if not offsite_id:
          raise ValueError("Offsite storage location not found.")
     
-    stmt_stage = select(LifecycleStages.id).where(LifecycleStages.stage_code == "InTreatment")
-    new_stage_id = db.scalar(stmt_stage)
+    new_stage_id = get_stage_id(db, "InTreatment")
     if not new_stage_id:
         raise ValueError("Target stage InTreatment not found!")
     
-    for item in data.tracking_data:
-        product = TreatmentBatchProduct(
+    db.add_all([
+        TreatmentBatchProduct(
             batch_id=batch.id,
             product_tracking_id=item.product_id,
             surface_treat=bool(item.surface_treat),
             sterilize=bool(item.sterilize)
         )
-        db.add(product)
-
-        update_product_stage(
-            db=db,
-            product_id=item.product_id,
-            new_stage_id=new_stage_id,
-            reason="Sent for Treatment (batch creation)",
-            user_id=data.sent_by,
-            location_id=offsite_id
-        )
+        for item in data.tracking_data
+    ])
+
+    bulk_update_product_stage(
+        db=db,
+        product_ids=[item.product_id for item in data.tracking_data],
+        new_stage_id=new_stage_id,
+        reason="Sent for Treatment (batch creation)",
+        user_id=data.sent_by,
+        location_id=offsite_id
+    )
         
     db.commit()
 
+@cached_query(tables=(
+    "product_tracking",
+    "lifecycle_stages",
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "product_quality_control",
+    "filament_mounting",
+    "filaments",
+    "users",
+))
 @transactional
 def get_qc_products_needing_storage(db: Session) -> list[PostHarvestStorageCandidate]:
     stmt = (
@@ -187,22 +215,25 @@ def get_adhoc_products_needing_storage(db: Session) -> list[AdHocQuarantineStora
 
 @transactional
 def assign_storage_to_products(db: Session, assignments: list[tuple[str, int, str]], user_id: int, update_stage: bool):
+    # === Group assignments so each (location, stage) pair is one set-based update ===
+    groups: dict[tuple[int, str], list[int]] = defaultdict(list)
     for product_id, location_id, stage_code in assignments:
-        to_stage_id = db.scalar(
-            text("SELECT id FROM lifecycle_stages WHERE stage_code = :code"),
-            {"code": stage_code}
-        )
+        groups[(location_id, stage_code)].append(product_id)
+
+    for (location_id, stage_code), product_ids in groups.items():
+        to_stage_id = get_stage_id(db, stage_code)
 
         if stage_code == "Quarantine":
             reason = "Moved to Quarantine"
-            db.execute(
-                text("""
-                    UPDATE quarantined_products
-                    SET location_id = :loc
-                    WHERE product_tracking_id = :pid AND quarantine_status = 'Active'
-                """),
-                {"loc": location_id, "pid": product_id}
-            )
+            for chunk in chunked(product_ids):
+                db.execute(
+                    text("""
+                        UPDATE quarantined_products
+                        SET location_id = :loc
+                        WHERE product_tracking_id IN :pids AND quarantine_status = 'Active'
+                    """).bindparams(bindparam("pids", expanding=True)),
+                    {"loc": location_id, "pids": chunk}
+                )
 
         elif stage_code == "Disposed":
             reason = "Disposed"
@@ -210,9 +241,9 @@ def assign_storage_to_products(db: Session, assignments: list[tuple[str, int, st
             reason = "Storage assignment"
 
         if update_stage is True:
-            update_product_stage(
+            bulk_update_product_stage(
                 db=db,
-                product_id=product_id,
+                product_ids=product_ids,
                 new_stage_id=to_stage_id,
                 reason=reason,
                 user_id=user_id,
@@ -267,11 +298,12 @@ def get_products_by_batch_id(db: Session, batch_id: int) -> list[dict]:
 
 @transactional
 def update_post_treatment_qc(db: Session, product_qc: list[dict], inspected_by: int):
-    stmt_stage = select(LifecycleStages.id).where(LifecycleStages.stage_code == "PostTreatmentQC")
-    new_stage_id = db.scalar(stmt_stage)
+    new_stage_id = get_stage_id(db, "PostTreatmentQC")
     if not new_stage_id:
         raise ValueError("Target stage PostTreatmentQC not found!")
     
+    ids_by_status: dict[str, list[int]] = defaultdict(list)
+
     # === Insert Inspection Result ===
     for item in product_qc:
         product_id = item["product_id"]
@@ -317,20 +349,20 @@ def update_post_treatment_qc(db: Session, product_qc: list[dict], inspected_by:
                 reason=item.get("quarantine_reason")
             )
 
-        update_product_stage(
-            db=db,
-            product_id=product_id,
-            new_stage_id=new_stage_id,
-            reason="Post-Treatment QC Complete",
-            user_id=inspected_by
-        )
-
         status_name = STATUS_MAP_QC_TO_BUSINESS.get(item["qc_result"], "Pending")
-        update_product_status(
-            db=db,
-            product_id=product_id,
-            status_name=status_name
-        )
+        ids_by_status[status_name].append(product_id)
+
+    # === Move all inspected products in one pass ===
+    bulk_update_product_stage(
+        db=db,
+        product_ids=[item["product_id"] for item in product_qc],
+        new_stage_id=new_stage_id,
+        reason="Post-Treatment QC Complete",
+        user_id=inspected_by
+    )
+
+    for status_name, product_ids in ids_by_status.items():
+        bulk_update_product_status(db, product_ids, status_name)
 
     db.commit()
 
@@ -382,42 +414,42 @@ def update_tracking_storage(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="product_tracking",
-            record_id=product_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update = False if field == "current_status" else True
-        update_record_with_audit(db, audit, update)
-
-        if field == "current_status":
-            stmt_stage = select(LifecycleStages.id).where(LifecycleStages.stage_name == new_value)
-            new_stage_id = db.scalar(stmt_stage)
-            from_stage_id = db.scalar(
-                text("SELECT current_stage_id FROM product_tracking WHERE id = :product_id"),
-                {"product_id": product_id}
-            )
-            db.execute(
-                text("""
-                    UPDATE product_tracking
-                    SET current_stage_id = :new_stage_id, last_updated_at = GETDATE()
-                    WHERE id = :pid
-                """),
-                {"new_stage_id": new_stage_id, "pid": product_id}
-            )
-            log_product_status_change(
-                db=db,
-                product_id=product_id,
-                from_stage_id=from_stage_id,
-                to_stage_id=new_stage_id,
-                reason="Update from storage location edit.",
-                user_id=user_id 
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="product_tracking",
+                record_id=product_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
             )
+            update = False if field == "current_status" else True
+            batch.add(audit, update)
+
+            if field == "current_status":
+                new_stage_id = get_stage_id_by_name(db, new_value)
+                from_stage_id = db.scalar(
+                    text("SELECT current_stage_id FROM product_tracking WHERE id = :product_id"),
+                    {"product_id": product_id}
+                )
+                db.execute(
+                    text("""
+                        UPDATE product_tracking
+                        SET current_stage_id = :new_stage_id, last_updated_at = GETDATE()
+                        WHERE id = :pid
+                    """),
+                    {"new_stage_id": new_stage_id, "pid": product_id}
+                )
+                log_product_status_change(
+                    db=db,
+                    product_id=product_id,
+                    from_stage_id=from_stage_id,
+                    to_stage_id=new_stage_id,
+                    reason="Update from storage location edit.",
+                    user_id=user_id 
+                )
     db.commit()
 
 @transactional
@@ -444,8 +476,7 @@ def remove_product_from_batch(
         {"id": batch_product_id}    
     )
 
-    stmt_stage = select(LifecycleStages.id).where(LifecycleStages.stage_code == "QMTreatmentApproval")
-    new_stage_id = db.scalar(stmt_stage)
+    new_stage_id = get_stage_id(db, "QMTreatmentApproval")
     update_product_stage(
         db=db,
         product_id=product_id,
@@ -464,15 +495,16 @@ def update_treatment_batch_fields(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="treatment_batch_products",
-            record_id=batch_product_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="treatment_batch_products",
+                record_id=batch_product_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     db.commit()
\ No newline at end of file
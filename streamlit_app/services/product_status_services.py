@@ -1,6 +1,9 @@
+from datetime import date
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from schemas.pagination_schemas import KeysetPage
 from utils.db_transaction import transactional
+from utils.pagination import DEFAULT_PAGE_SIZE, build_filters, date_range_conditions, fetch_keyset_page
 
 
 @transactional
@@ -8,4 +11,35 @@ def get_all_product_status(db: Session) -> list[dict]:
     sql = "SELECT * FROM v_product_status ORDER BY last_updated_at DESC"
     result = db.execute(text(sql))
     cols = result.keys()
-    return [dict(zip(cols, row)) for row in result.fetchall()]
\ No newline at end of file
+    return [dict(zip(cols, row)) for row in result.fetchall()]
+
+@transactional
+def get_product_status_page(
+    db: Session,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    sku: str | None = None,
+    lot_number: str | None = None,
+    current_stage: str | None = None,
+) -> KeysetPage:
+    """
+    Keyset-paginated get_all_product_status, most recently updated first.
+    `after` is the (last_updated_at, id) cursor from the previous page; the
+    date range filters on last_updated_at. The view has a row per QC, treatment and
+    shipment join, so a page holds `limit` products with all their rows.
+    """
+    clauses, params = build_filters([
+        *date_range_conditions("last_updated_at", date_from, date_to),
+        ("sku = :sku", "sku", sku),
+        ("lot_number = :lot_number", "lot_number", lot_number),
+        ("current_stage = :current_stage", "current_stage", current_stage),
+    ])
+    return fetch_keyset_page(
+        db, "SELECT * FROM v_product_status",
+        sort_col="last_updated_at", id_col="id",
+        sort_key="last_updated_at", id_key="id",
+        after=after, limit=limit, clauses=clauses, params=params,
+        fan_out=True,
+    )
@@ -1,13 +1,20 @@
 import string
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select, or_
-from datetime import datetime
+from sqlalchemy import text, select, or_, bindparam
+from sqlalchemy.exc import DBAPIError
+from collections import defaultdict
+from datetime import date, datetime, timezone
 from models.production_models import ProductRequest, ProductHarvest, ProductTracking, ProductSKU
-from schemas.production_schemas import ProductRequestCreate
+from schemas.production_schemas import ProductRequestCreate, ProductHarvestCreate
 from schemas.audit_schemas import FieldChangeAudit
-from services.audit_services import update_record_with_audit
-from services.tracking_service import generate_tracking_id, record_materials_post_harvest
+from schemas.pagination_schemas import KeysetPage
+from services.audit_services import AuditBatch, update_record_with_audit
+from services.tracking_service import generate_tracking_id, record_materials_post_harvest, chunked
+from services.reference_services import get_status_id, get_stage_id, get_sku_meta
+from services.expiration_services import compute_expires_at
 from utils.db_transaction import transactional
+from utils.query_cache import cached_query
+from utils.pagination import DEFAULT_PAGE_SIZE, build_filters, date_range_conditions, fetch_keyset_page
 
 
 _ALPHABET = string.digits + string.ascii_uppercase
@@ -29,13 +36,40 @@ def generate_lot_number(db: Session) -> str:
     cc = to_base36(int(batch_number)).rjust(2, "0")
     return f"{yy}{cc}"
 
+MAX_SEQ_PER_LOT = 9999
+
+def allocate_seq_block(db: Session, lot_number: str, count: int) -> int:
+    """
+    Reserves `count` consecutive SSSS values for lot_number in one round trip
+    (dbo.AllocateLotSeqBlock over the lot_sequences counter) and returns the first one.
+    """
+    try:
+        row = db.execute(
+            text("EXEC dbo.AllocateLotSeqBlock @lot_number=:lot, @count=:n"),
+            {"lot": lot_number, "n": count},
+        ).mappings().one()
+    except DBAPIError as e:
+        # 50012: the block would run past SSSS 9999 (raised by the proc before the CHECK)
+        if "50012" in str(e.orig):
+            raise ValueError(f"Lot {lot_number} has no free product codes left (max {MAX_SEQ_PER_LOT}).") from e
+        raise
+
+    return int(row["first_seq"])
+
 def allocate_seq_for_lot(db: Session, lot_number: str) -> int:
-    row = db.execute(
-        text("EXEC dbo.AllocateNextSeqForLot @lot_number=:lot"),
-        {"lot": lot_number},
-    ).mappings().one()
+    return allocate_seq_block(db, lot_number, 1)
+
+def allocate_codes(db: Session, lot_number: str, n: int) -> list[str]:
+    """
+    Returns n contiguous product codes (YYCC + SSSS) for lot_number.
+    """
+    if n <= 0:
+        return []
+    if not lot_number or len(lot_number) < 4:
+        raise ValueError("Request lot_number (YYCC) is missing/invalid")
 
-    return int(row["item_seq"])
+    first = allocate_seq_block(db, lot_number, n)
+    return [f"{lot_number}{seq:04d}" for seq in range(first, first + n)]
 
 def build_product_code(db: Session, request_id: int) -> str:
     lot = db.execute(
@@ -43,12 +77,7 @@ def build_product_code(db: Session, request_id: int) -> str:
         {"rid": request_id},
     ).scalar_one()
 
-    if not lot or len(lot) < 4:
-        raise ValueError("Request lot_number (YYCC) is missing/invalid")
-    
-    seq = allocate_seq_for_lot(db, lot)
-
-    return f"{lot}{seq:04d}"
+    return allocate_codes(db, lot, 1)[0]
 
 @transactional
 def get_requestable_skus(db: Session) -> list[tuple[int, str, str]]:
@@ -87,6 +116,12 @@ def insert_product_request(db: Session, data: ProductRequestCreate):
         db.add(request)
     db.commit()
 
+@cached_query(tables=(
+    "product_requests",
+    "product_skus",
+    "product_print_specs",
+    "users",
+))
 @transactional
 def get_pending_requests(db: Session) -> list[dict]:
     sql = """
@@ -130,9 +165,7 @@ def insert_product_harvest(db: Session, request_id: int, filament_mount_id: int,
     # tracking_id = generate_tracking_id(db)
 
     # === Gets the Status ID ===
-    pending_status_id = db.scalar(
-        text("SELECT id FROM product_statuses WHERE status_name = 'Pending'")
-    )
+    pending_status_id = get_status_id(db, "Pending")
 
     # === Derive the SKU for this unit (direct via request) ===
     req = db.execute(
@@ -143,7 +176,7 @@ def insert_product_harvest(db: Session, request_id: int, filament_mount_id: int,
     sku_id = int(req["sku_id"])
     is_tt = bool(req.get("is_tech_transfer", 0))
 
-    product_type_id = db.scalar(text("SELECT product_type_id FROM product_skus WHERE id = :sid"), {"sid": sku_id})
+    product_type_id = get_sku_meta(db, sku_id)["product_type_id"]
 
     product_code = build_product_code(db, request_id)
 
@@ -156,6 +189,7 @@ def insert_product_harvest(db: Session, request_id: int, filament_mount_id: int,
         current_status_id=pending_status_id,
         product_code=product_code,
         was_tech_transfer=is_tt,
+        expires_at=compute_expires_at(harvest.print_date),
     )
     db.add(tracking)
     db.flush()
@@ -172,6 +206,157 @@ def insert_product_harvest(db: Session, request_id: int, filament_mount_id: int,
     db.commit()
     return {"id": tracking.product_id, "product_code": tracking.product_code}
 
+@transactional
+def insert_product_harvests_bulk(db: Session, items: list[ProductHarvestCreate]) -> list[dict]:
+    """
+    Harvests many product requests (typically one build plate) in a single transaction.
+    Harvest and tracking rows are written with executemany, product codes are
+    reserved as one block per lot, lid/seal usage is written with one INSERT ... SELECT
+    and the requests are closed with one UPDATE. Commits once at the end.
+    Returns [{"id", "product_code"}] in the order of `items`.
+    """
+    if not items:
+        return []
+
+    request_ids = [item.request_id for item in items]
+    if len(set(request_ids)) != len(request_ids):
+        raise ValueError("Each product request can only be harvested once.")
+
+    # === Load all requests up front ===
+    requests_sql = text("""
+        SELECT id, sku_id, lot_number, status, is_tech_transfer
+        FROM product_requests
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    requests = {}
+    for chunk in chunked(request_ids):
+        for r in db.execute(requests_sql, {"ids": chunk}).mappings().all():
+            requests[int(r["id"])] = r
+
+    missing = [rid for rid in request_ids if rid not in requests]
+    if missing:
+        raise ValueError(f"Product requests not found: {missing}")
+    not_pending = [rid for rid in request_ids if requests[rid]["status"] != "Pending"]
+    if not_pending:
+        raise ValueError(f"Product requests are no longer pending: {not_pending}")
+
+    pending_status_id = get_status_id(db, "Pending")
+    printed_stage_id = get_stage_id(db, "Printed")
+    if not printed_stage_id:
+        raise ValueError("Target stage Printed not found!")
+
+    now = datetime.now(timezone.utc)
+
+    # === Insert Harvest Records ===
+    db.execute(
+        text("""
+            INSERT INTO product_harvest (request_id, filament_mounting_id, printed_by, lid_id, seal_id, print_date)
+            VALUES (:rid, :mount, :printed_by, :lid, :seal, :print_date)
+        """),
+        [
+            {
+                "rid": item.request_id,
+                "mount": item.filament_mount_id,
+                "printed_by": item.printed_by,
+                "lid": item.lid_id,
+                "seal": item.seal_id,
+                "print_date": now
+            }
+            for item in items
+        ]
+    )
+
+    harvest_sql = text("""
+        SELECT id, request_id
+        FROM product_harvest
+        WHERE request_id IN :ids
+        ORDER BY id
+    """).bindparams(bindparam("ids", expanding=True))
+    harvest_by_request = {}
+    for chunk in chunked(request_ids):
+        for row in db.execute(harvest_sql, {"ids": chunk}).all():
+            harvest_by_request[int(row.request_id)] = int(row.id)
+
+    # === Reserve product codes as one block per lot ===
+    by_lot: dict[str, list[int]] = defaultdict(list)
+    for rid in request_ids:
+        by_lot[requests[rid]["lot_number"]].append(rid)
+
+    code_by_request = {}
+    for lot, lot_request_ids in by_lot.items():
+        codes = allocate_codes(db, lot, len(lot_request_ids))
+        code_by_request.update(zip(lot_request_ids, codes))
+
+    # === Insert Product Tracking Records ===
+    expires_at = compute_expires_at(now)
+    tracking_rows = []
+    for rid in request_ids:
+        req = requests[rid]
+        sku_id = int(req["sku_id"])
+        tracking_rows.append({
+            "harvest_id": harvest_by_request[rid],
+            "sku_id": sku_id,
+            "product_type_id": get_sku_meta(db, sku_id)["product_type_id"],
+            "stage_id": printed_stage_id,
+            "status_id": pending_status_id,
+            "product_code": code_by_request[rid],
+            "tt": bool(req["is_tech_transfer"]),
+            "ts": now,
+            "expires_at": expires_at
+        })
+    db.execute(
+        text("""
+            INSERT INTO product_tracking (
+                harvest_id, sku_id, product_type_id, current_stage_id, current_status_id,
+                product_code, was_tech_transfer, last_updated_at, expires_at
+            )
+            VALUES (:harvest_id, :sku_id, :product_type_id, :stage_id, :status_id, :product_code, :tt, :ts, :expires_at)
+        """),
+        tracking_rows
+    )
+
+    harvest_ids = list(harvest_by_request.values())
+    tracking_sql = text("""
+        SELECT id, harvest_id, product_id, product_code
+        FROM product_tracking
+        WHERE harvest_id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    tracking_by_harvest = {}
+    for chunk in chunked(harvest_ids):
+        for row in db.execute(tracking_sql, {"ids": chunk}).mappings().all():
+            tracking_by_harvest[int(row["harvest_id"])] = row
+
+    # === Record lid + seal usage for every unit at once ===
+    usage_sql = text("""
+        INSERT INTO material_usage (
+            product_tracking_id, harvest_id, material_type, lot_number, used_quantity, used_at, used_by
+        )
+        SELECT pt.id, ph.id, m.material_type, m.lot_number, 1, :timestamp, ph.printed_by
+        FROM product_harvest ph
+        JOIN product_tracking pt ON pt.harvest_id = ph.id
+        JOIN lids l ON ph.lid_id = l.id
+        JOIN seals s ON ph.seal_id = s.id
+        CROSS APPLY (VALUES ('Lid', l.serial_number), ('Seal', s.serial_number)) AS m(material_type, lot_number)
+        WHERE ph.id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    for chunk in chunked(harvest_ids):
+        db.execute(usage_sql, {"timestamp": now, "ids": chunk})
+
+    # === Close the product requests ===
+    fulfil_sql = text(
+        "UPDATE product_requests SET status = 'Fulfilled' WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    for chunk in chunked(request_ids):
+        db.execute(fulfil_sql, {"ids": chunk})
+
+    db.commit()
+
+    out = []
+    for rid in request_ids:
+        row = tracking_by_harvest[harvest_by_request[rid]]
+        out.append({"id": row["product_id"], "product_code": row["product_code"]})
+    return out
+
 @transactional
 def cancel_product_request(db: Session, request_id: int):
     db.execute(
@@ -180,36 +365,77 @@ def cancel_product_request(db: Session, request_id: int):
     )
     db.commit()
 
+_HARVESTED_TABLES = (
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "filament_mounting",
+    "filaments",
+    "printers",
+    "lids",
+    "users",
+)
+
+_HARVESTED_SELECT = """
+    SELECT
+        ph.id AS harvest_id,
+        ph.filament_mounting_id AS mount_id,
+        ph.lid_id AS lid_id,
+        ph.seal_id,
+        pr.id AS request_id,
+        pr.lot_number,
+        ps.sku AS sku,
+        ps.name AS sku_name,
+        f.serial_number AS filament_serial,
+        p.name AS printer_name,
+        l.serial_number AS lid_serial,
+        u.display_name AS printed_by,
+        ph.print_date
+    FROM product_harvest ph
+    JOIN product_requests pr ON ph.request_id = pr.id
+    JOIN product_skus ps ON pr.sku_id = ps.id
+    JOIN filament_mounting fm ON ph.filament_mounting_id = fm.id
+    JOIN filaments f ON fm.filament_tracking_id = f.id
+    JOIN printers p ON fm.printer_id = p.id
+    JOIN lids l ON ph.lid_id = l.id
+    JOIN users u ON ph.printed_by = u.id
+"""
+
+@cached_query(tables=_HARVESTED_TABLES)
 @transactional
 def get_harvested_products(db: Session) -> list[dict]:
-    sql = """
-        SELECT
-            ph.id AS harvest_id,
-            ph.filament_mounting_id AS mount_id,
-            ph.lid_id AS lid_id,
-            ph.seal_id,
-            pr.id AS request_id,
-            ps.sku AS sku,
-            ps.name AS sku_name,
-            f.serial_number AS filament_serial,
-            p.name AS printer_name,
-            l.serial_number AS lid_serial,
-            u.display_name AS printed_by,
-            ph.print_date
-        FROM product_harvest ph
-        JOIN product_requests pr ON ph.request_id = pr.id
-        JOIN product_skus ps ON pr.sku_id = ps.id
-        JOIN filament_mounting fm ON ph.filament_mounting_id = fm.id
-        JOIN filaments f ON fm.filament_tracking_id = f.id
-        JOIN printers p ON fm.printer_id = p.id
-        JOIN lids l ON ph.lid_id = l.id
-        JOIN users u ON ph.printed_by = u.id
-        ORDER BY ph.print_date DESC
-    """
+    sql = _HARVESTED_SELECT + "ORDER BY ph.print_date DESC"
     result = db.execute(text(sql))
     cols = result.keys()
     return [dict(zip(cols, row)) for row in result.fetchall()]
 
+@cached_query(tables=_HARVESTED_TABLES)
+@transactional
+def get_harvested_products_page(
+    db: Session,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    sku: str | None = None,
+    lot_number: str | None = None,
+) -> KeysetPage:
+    """
+    Keyset-paginated get_harvested_products, newest print first.
+    `after` is the (print_date, harvest_id) cursor from the previous page.
+    """
+    clauses, params = build_filters([
+        *date_range_conditions("ph.print_date", date_from, date_to),
+        ("ps.sku = :sku", "sku", sku),
+        ("pr.lot_number = :lot_number", "lot_number", lot_number),
+    ])
+    return fetch_keyset_page(
+        db, _HARVESTED_SELECT,
+        sort_col="ph.print_date", id_col="ph.id",
+        sort_key="print_date", id_key="harvest_id",
+        after=after, limit=limit, clauses=clauses, params=params,
+    )
+
 @transactional
 def update_harvest_fields(
     db: Session,
@@ -218,17 +444,18 @@ def update_harvest_fields(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="product_harvest",
-            record_id=harvest_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="product_harvest",
+                record_id=harvest_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     db.commit()
 
 @transactional
@@ -1,12 +1,15 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select
+from sqlalchemy import text
+from datetime import date
 from schemas.qc_schemas import ProductQCInput
 from schemas.audit_schemas import FieldChangeAudit
-from models.lifecycle_stages_models import LifecycleStages
-from services.audit_services import update_record_with_audit
+from schemas.pagination_schemas import KeysetPage
+from services.audit_services import AuditBatch
 from services.tracking_service import update_product_stage, update_product_status, record_filament_usage_post_qc
 from services.quality_management_services import create_quarantine_record
+from services.reference_services import get_stage_id
 from utils.db_transaction import transactional
+from utils.pagination import DEFAULT_PAGE_SIZE, build_filters, date_range_conditions, fetch_keyset_page
 from constants.product_status_constants import STATUS_MAP_QC_TO_BUSINESS
 
 
@@ -100,10 +103,7 @@ def insert_product_qc(db: Session, data: ProductQCInput):
 
     # === Update Lifecycle Stage ===
     stage_code = "HarvestQCComplete"
-    new_stage_id = db.scalar(
-        text("SELECT id FROM lifecycle_stages WHERE stage_code = :code"),
-        {"code": stage_code}
-    )
+    new_stage_id = get_stage_id(db, stage_code)
     update_product_stage(
         db=db,
         product_id=data.product_tracking_id,
@@ -140,34 +140,64 @@ def insert_product_qc(db: Session, data: ProductQCInput):
     )
     db.commit()
 
+_COMPLETED_QC_SELECT = """
+    SELECT
+        qc.id AS qc_id,
+        pt.id,
+        pt.product_id,
+        ph.id AS harvest_id,
+        ps.sku,
+        ps.name AS sku_name,
+        pr.lot_number,
+        qc.weight_grams,
+        qc.pressure_drop,
+        qc.visual_pass,
+        qc.inspection_result,
+        qc.notes,
+        ph.print_date
+    FROM product_quality_control qc
+    JOIN product_tracking pt ON qc.product_tracking_id = pt.id
+    JOIN product_harvest ph ON pt.harvest_id = ph.id
+    JOIN product_requests pr ON ph.request_id = pr.id
+    JOIN product_skus ps ON pr.sku_id = ps.id
+"""
+
 @transactional
 def get_completed_qc_products(db: Session) -> list[dict]:
-    sql = """
-        SELECT 
-            qc.id AS qc_id,
-            pt.id,
-            pt.product_id,
-            ph.id AS harvest_id,
-            ps.sku,
-            ps.name AS sku_name,
-            pr.lot_number,
-            qc.weight_grams,
-            qc.pressure_drop,
-            qc.visual_pass,
-            qc.inspection_result,
-            qc.notes,
-            ph.print_date
-        FROM product_quality_control qc
-        JOIN product_tracking pt ON qc.product_tracking_id = pt.id
-        JOIN product_harvest ph ON pt.harvest_id = ph.id
-        JOIN product_requests pr ON ph.request_id = pr.id
-        JOIN product_skus ps ON pr.sku_id = ps.id
-        ORDER BY qc.id DESC
-    """
+    sql = _COMPLETED_QC_SELECT + "ORDER BY qc.id DESC"
     result = db.execute(text(sql))
     cols = result.keys()
     return [dict(zip(cols, row)) for row in result.fetchall()]
 
+@transactional
+def get_completed_qc_products_page(
+    db: Session,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    sku: str | None = None,
+    lot_number: str | None = None,
+    inspection_result: str | None = None,
+) -> KeysetPage:
+    """
+    Keyset-paginated get_completed_qc_products, newest QC record first.
+    `after` is the (qc_id, qc_id) cursor from the previous page; the date range
+    filters on inspected_at.
+    """
+    clauses, params = build_filters([
+        *date_range_conditions("qc.inspected_at", date_from, date_to),
+        ("ps.sku = :sku", "sku", sku),
+        ("pr.lot_number = :lot_number", "lot_number", lot_number),
+        ("qc.inspection_result = :inspection_result", "inspection_result", inspection_result),
+    ])
+    return fetch_keyset_page(
+        db, _COMPLETED_QC_SELECT,
+        sort_col="qc.id", id_col="qc.id",
+        sort_key="qc_id", id_key="qc_id",
+        after=after, limit=limit, clauses=clauses, params=params,
+    )
+
 @transactional
 def update_qc_fields(
     db: Session,
@@ -180,21 +210,22 @@ def update_qc_fields(
     inspection_result_updated = False
     new_result = None
 
-    for field, (old_value, new_value) in updates.items():
-        if field == "inspection_result":
-            inspection_result_updated = True
-            new_result = new_value
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            if field == "inspection_result":
+                inspection_result_updated = True
+                new_result = new_value
 
-        audit = FieldChangeAudit(
-            table="product_quality_control",
-            record_id=qc_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+            audit = FieldChangeAudit(
+                table="product_quality_control",
+                record_id=qc_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     
     if inspection_result_updated:
         new_status = STATUS_MAP_QC_TO_BUSINESS.get(new_result, "A-Ware")
@@ -209,10 +240,7 @@ def update_qc_fields(
                 reason=reason
             )
 
-            new_stage_id = db.scalar(
-                text("SELECT id FROM lifecycle_stages WHERE stage_code = :code"),
-                {"code": "Quarantine"}
-            )
+            new_stage_id = get_stage_id(db, "Quarantine")
             if new_stage_id:
                 update_product_stage(
                     db=db,
@@ -269,8 +297,7 @@ def update_post_treatment_qc_fields(
             reason=q_reason
         )
 
-        stmt_stage = select(LifecycleStages.id).where(LifecycleStages.stage_code == "Quarantine")
-        new_stage_id = db.scalar(stmt_stage)
+        new_stage_id = get_stage_id(db, "Quarantine")
         update_product_stage(
             db=db,
             product_id=product_id,
@@ -287,16 +314,17 @@ def update_post_treatment_qc_fields(
         status_name=status_name
     )
 
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="post_treatment_inspections",
-            record_id=inspection_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="post_treatment_inspections",
+                record_id=inspection_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
+            )
+            batch.add(audit)
     db.commit()
 
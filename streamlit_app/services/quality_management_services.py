@@ -17,15 +17,36 @@ from schemas.quality_management_schemas import (
     InvestigatedProductRow,
     ProductQuarantineSearchResult
 )
-from services.tracking_service import log_product_status_change, update_product_stage, update_product_status
+from schemas.pagination_schemas import KeysetPage
+from services.tracking_service import (
+    log_product_status_change,
+    update_product_stage,
+    update_product_status,
+    bulk_update_product_stage,
+    bulk_update_product_status
+)
 from utils.db_transaction import transactional
+from utils.query_cache import cached_query
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_filters, date_range_conditions, fetch_keyset_page
+from services.reference_services import get_stage_id, get_stage_id_by_name
 from constants.product_status_constants import STATUS_MAP_QC_TO_BUSINESS
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from collections import defaultdict
 
 
 StagePrev = aliased(LifecycleStages)
 
 
+@cached_query(tables=(
+    "product_tracking",
+    "lifecycle_stages",
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "product_quality_control",
+    "users",
+    "storage_locations",
+))
 @transactional
 def get_qm_review_products(db: Session) -> list[ProductQMReview]:
     stmt = (
@@ -80,6 +101,16 @@ def get_qm_review_products(db: Session) -> list[ProductQMReview]:
 
     return products
 
+@cached_query(tables=(
+    "product_tracking",
+    "lifecycle_stages",
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "post_treatment_inspections",
+    "users",
+    "storage_locations",
+))
 @transactional
 def get_post_treatment_qm_candidates(db: Session) -> list[PostTreatmentApprovalCandidate]:
     stmt = (
@@ -115,21 +146,24 @@ def approve_products_for_treatment(db: Session, products: list[dict], user_id: i
     if not products:
         return
     
-    stmt = select(LifecycleStages.id).where(LifecycleStages.stage_code == "QMTreatmentApproval")
-    new_stage_id = db.scalar(stmt)
+    new_stage_id = get_stage_id(db, "QMTreatmentApproval")
     if not new_stage_id:
         raise ValueError("Target stage QMTreatmentApproval not found!")
     
+    # === Group by reason so each distinct note is one set-based transition ===
+    by_reason: dict[str, list[int]] = defaultdict(list)
     for product in products:
-        product_id = product["pid"]
         reason = product.get("reason", "").strip()
 
         approval_reason = (
             f"QM Approved for Treatment{': ' + reason if reason else ''}"
         )
-        update_product_stage(
+        by_reason[approval_reason].append(product["pid"])
+
+    for approval_reason, product_ids in by_reason.items():
+        bulk_update_product_stage(
             db=db,
-            product_id=product_id,
+            product_ids=product_ids,
             new_stage_id=new_stage_id,
             reason=approval_reason,
             user_id=user_id
@@ -142,21 +176,18 @@ def approve_products_for_sales(db: Session, products: list[dict], user_id: int):
     if not products:
         return
     
-    target_stage_id_passed = db.scalar(
-        select(LifecycleStages.id).where(LifecycleStages.stage_code == "QMSalesApproval")
-    )
+    target_stage_id_passed = get_stage_id(db, "QMSalesApproval")
 
-    target_stage_id_bware = db.scalar(
-        select(LifecycleStages.id).where(LifecycleStages.stage_code == "Internal Use")
-    )
+    target_stage_id_bware = get_stage_id(db, "Internal Use")
 
     if not target_stage_id_passed:
         raise ValueError("Target stage QMSalesApproval not found!")
     if not target_stage_id_bware:
         raise ValueError("Target stage Internal Use not found!")
     
+    # === Group by (target stage, reason) so each group is one set-based transition ===
+    groups: dict[tuple[int, str], list[int]] = defaultdict(list)
     for product in products:
-        product_id = product["pid"]
         result = product["result"]
         reason = product.get("reason", "").strip()
 
@@ -169,9 +200,12 @@ def approve_products_for_sales(db: Session, products: list[dict], user_id: int):
             final_target_stage = target_stage_id_bware
             approval_reason = f"QM Approved for Internal Use{': ' + reason if reason else ''}"
 
-        update_product_stage(
+        groups[(final_target_stage, approval_reason)].append(product["pid"])
+
+    for (final_target_stage, approval_reason), product_ids in groups.items():
+        bulk_update_product_stage(
             db=db,
-            product_id=product_id,
+            product_ids=product_ids,
             new_stage_id=final_target_stage,
             reason=approval_reason,
             user_id=user_id
@@ -184,46 +218,107 @@ def decline_products_for_disposal(db: Session, products: list[dict], comment: st
     """
     Moves products to the Disposed stage and updates status to Waste.
     """
-    target_stage_id = db.scalar(
-        select(LifecycleStages.id).where(LifecycleStages.stage_code == "Disposed")
-    )
+    target_stage_id = get_stage_id(db, "Disposed")
     if not target_stage_id:
         raise ValueError("Target stage 'Disposed' not found!")
     
-    for product in products:
-        product_id = product["pid"]
+    product_ids = [product["pid"] for product in products]
 
-        update_product_stage(
-            db=db,
-            product_id=product_id,
-            new_stage_id=target_stage_id,
-            reason=f"Declined by QM: {comment}",
-            user_id=user_id
-        )
+    bulk_update_product_stage(
+        db=db,
+        product_ids=product_ids,
+        new_stage_id=target_stage_id,
+        reason=f"Declined by QM: {comment}",
+        user_id=user_id
+    )
 
-        update_product_status(db, product_id, "Waste")
+    bulk_update_product_status(db, product_ids, "Waste")
     
     db.commit()
 
+AUDIT_LOG_SELECT = """
+    SELECT
+        id,
+        table_name,
+        record_id,
+        field_name,
+        old_value,
+        new_value,
+        reason,
+        changed_by,
+        changed_at
+    FROM {table}
+"""
+
+@cached_query(tables=("audit_log", "audit_log_archive"))
 @transactional
-def get_audit_log_entries(db: Session) -> list[dict]:
-    sql = """
-        SELECT
-            table_name,
-            record_id,
-            field_name,
-            old_value,
-            new_value,
-            reason,
-            changed_by,
-            changed_at
-        FROM audit_log
-        ORDER BY changed_at DESC
+def get_record_audit_history(
+    db: Session,
+    table_name: str,
+    record_id: int,
+    include_archive: bool = False,
+) -> list[dict]:
     """
-    result = db.execute(text(sql))
+    Every change to one record, newest first. A seek on the (table_name, record_id,
+    changed_at) index; archived months are added only with include_archive.
+    """
+    tables = ["audit_log", "audit_log_archive"] if include_archive else ["audit_log"]
+    sql = "\nUNION ALL\n".join(
+        AUDIT_LOG_SELECT.format(table=table) + "WHERE table_name = :table_name AND record_id = :record_id"
+        for table in tables
+    ) + "\nORDER BY changed_at DESC, id DESC"
+    result = db.execute(text(sql), {"table_name": table_name, "record_id": record_id})
     cols = result.keys()
     return [dict(zip(cols, row)) for row in result.fetchall()]
 
+@cached_query(tables=("audit_log", "audit_log_archive"))
+@transactional
+def get_audit_log_page(
+    db: Session,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    table_name: Optional[str] = None,
+    record_id: Optional[int] = None,
+    changed_by: Optional[int] = None,
+    include_archive: bool = False,
+) -> KeysetPage:
+    """
+    Keyset-paginated audit log search, newest change first.
+    `after` is the (changed_at, id) cursor from the previous page.
+
+    audit_log is read first. Archived rows are all older than the hot ones, so with
+    include_archive a page that runs out of hot rows continues into audit_log_archive
+    from the same cursor; without it the archive is never touched.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses, params = build_filters([
+        *date_range_conditions("changed_at", date_from, date_to),
+        ("table_name = :table_name", "table_name", table_name),
+        ("record_id = :record_id", "record_id", record_id),
+        ("changed_by = :changed_by", "changed_by", changed_by),
+    ])
+    keyset = dict(
+        sort_col="changed_at", id_col="id",
+        sort_key="changed_at", id_key="id",
+        clauses=clauses, params=params,
+    )
+
+    page = fetch_keyset_page(db, AUDIT_LOG_SELECT.format(table="audit_log"), after=after, limit=limit, **keyset)
+    if page.has_more or not include_archive:
+        return page
+
+    rows = page.rows
+    cursor = (rows[-1]["changed_at"], rows[-1]["id"]) if rows else after
+    remaining = limit - len(rows)
+    archived = fetch_keyset_page(
+        db, AUDIT_LOG_SELECT.format(table="audit_log_archive"), after=cursor, limit=max(remaining, 1), **keyset
+    )
+    if remaining == 0:
+        return KeysetPage(rows=rows, next_after=cursor if archived.rows else None, has_more=bool(archived.rows))
+    return KeysetPage(rows=rows + archived.rows, next_after=archived.next_after, has_more=archived.has_more)
+
 @transactional
 def get_quarantined_products(db: Session) -> list[QuarantinedProductRow]:
     stmt = (
@@ -311,8 +406,7 @@ def sort_qm_reviewed_products(db: Session, product_id: int, stage_name: str, res
     else:
         new_stage_name = stage_name
     
-    stmt = select(LifecycleStages.id).where(LifecycleStages.stage_name == new_stage_name)
-    stage_id = db.scalar(stmt)
+    stage_id = get_stage_id_by_name(db, new_stage_name)
 
     update_product_stage(
         db=db,
@@ -574,9 +668,7 @@ def mark_products_ad_hoc_quarantine(db: Session, product_ids: list[int], user_id
     
     reason_ids = list(dict.fromkeys(reason_ids))
 
-    quarantine_stage_id = db.scalar(
-        select(LifecycleStages.id).where(LifecycleStages.stage_code == "Quarantine")
-    )
+    quarantine_stage_id = get_stage_id(db, "Quarantine")
     if not quarantine_stage_id:
         raise ValueError("Stage 'Quarantine' not found.")
     
@@ -604,13 +696,14 @@ def mark_products_ad_hoc_quarantine(db: Session, product_ids: list[int], user_id
             ),
             [{"qp_id": qp.id, "rid": rid} for rid in reason_ids]
         )
-        update_product_stage(
-            db=db,
-            product_id=product_id,
-            new_stage_id=quarantine_stage_id,
-            reason=f"Ad-Hoc Quarantine: {comment}",
-            user_id=user_id
-        )
-        update_product_status(db, product_id, "In Quarantine")
+
+    bulk_update_product_stage(
+        db=db,
+        product_ids=product_ids,
+        new_stage_id=quarantine_stage_id,
+        reason=f"Ad-Hoc Quarantine: {comment}",
+        user_id=user_id
+    )
+    bulk_update_product_status(db, product_ids, "In Quarantine")
 
     db.commit()
\ No newline at end of file
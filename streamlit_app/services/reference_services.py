@@ -0,0 +1,143 @@
+import threading
+import time
+import weakref
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from config import REFERENCE_DATA_TTL_SECONDS
+
+
+class ReferenceData:
+    """
+    Snapshot of the small, rarely-changing lookup tables that services resolve by name:
+    lifecycle_stages, product_statuses, storage_locations, issue_contexts, product_skus
+    and the sku_bom bundle graph.
+    """
+
+    def __init__(self, db: Session):
+        stages = db.execute(text("SELECT id, stage_code, stage_name FROM lifecycle_stages")).mappings().all()
+        self.stage_ids = {r["stage_code"]: int(r["id"]) for r in stages}
+        self.stage_ids_by_name = {r["stage_name"]: int(r["id"]) for r in stages}
+
+        statuses = db.execute(text("SELECT id, status_name FROM product_statuses")).mappings().all()
+        self.status_ids = {r["status_name"]: int(r["id"]) for r in statuses}
+
+        locations = db.execute(text("SELECT id, location_name FROM storage_locations")).mappings().all()
+        self.location_ids = {r["location_name"]: int(r["id"]) for r in locations}
+
+        contexts = db.execute(text("SELECT id, context_code FROM issue_contexts")).mappings().all()
+        self.context_ids = {r["context_code"]: int(r["id"]) for r in contexts}
+
+        skus = db.execute(text(
+            """
+                SELECT id, sku, name AS sku_name, product_type_id, is_serialized,
+                       is_bundle, pack_qty, is_active, tech_transfer
+                FROM product_skus
+            """
+        )).mappings().all()
+        self.skus = {int(r["id"]): dict(r) for r in skus}
+
+        bom = db.execute(text("SELECT parent_sku_id, component_sku_id, component_qty FROM sku_bom")).mappings().all()
+        self.bom: dict[int, list[tuple[int, int]]] = {}
+        for r in bom:
+            self.bom.setdefault(int(r["parent_sku_id"]), []).append((int(r["component_sku_id"]), int(r["component_qty"])))
+        # Memoized leaf-component vectors per SKU, filled lazily by component_vector()
+        self._component_vectors: dict[int, dict[int, int]] = {}
+
+        self.loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.loaded_at > REFERENCE_DATA_TTL_SECONDS
+
+    def component_vector(self, sku_id: int) -> dict[int, int]:
+        """
+        {leaf_component_sku_id: qty} for one unit of sku_id, following nested bundles.
+        A SKU without BOM rows is its own single leaf. Raises ValueError on a BOM cycle.
+        """
+        return self._expand(int(sku_id), ())
+
+    def _expand(self, sku_id: int, path: tuple[int, ...]) -> dict[int, int]:
+        vector = self._component_vectors.get(sku_id)
+        if vector is not None:
+            return vector
+        if sku_id in path:
+            cycle = " -> ".join(str(s) for s in path[path.index(sku_id):] + (sku_id,))
+            raise ValueError(f"sku_bom contains a cycle: {cycle}")
+
+        children = self.bom.get(sku_id)
+        if not children:
+            vector = {sku_id: 1}
+        else:
+            vector = {}
+            for component_id, qty in children:
+                for leaf_id, leaf_qty in self._expand(component_id, path + (sku_id,)).items():
+                    vector[leaf_id] = vector.get(leaf_id, 0) + leaf_qty * qty
+
+        self._component_vectors[sku_id] = vector
+        return vector
+
+
+# One snapshot per engine, shared by every session/thread in the process
+_registry: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _engine_for(db: Session):
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+def get_reference_data(db: Session, force_reload: bool = False) -> ReferenceData:
+    """
+    Returns the cached ReferenceData for the session's engine, loading it on first use,
+    after invalidate_reference_data() or once REFERENCE_DATA_TTL_SECONDS has passed.
+    """
+    engine = _engine_for(db)
+    ref = _registry.get(engine)
+    if ref is not None and not force_reload and not ref.is_stale():
+        return ref
+
+    with _lock:
+        ref = _registry.get(engine)
+        if ref is None or force_reload or ref.is_stale():
+            ref = ReferenceData(db)
+            _registry[engine] = ref
+        return ref
+
+def invalidate_reference_data():
+    """
+    Drops every cached snapshot. Call after editing SKUs, stages, statuses,
+    locations or issue contexts so the next lookup reloads from the database.
+    """
+    with _lock:
+        _registry.clear()
+
+def _lookup(db: Session, attr: str, key):
+    value = getattr(get_reference_data(db), attr).get(key)
+    if value is None:
+        # Unknown key may be a row added since the last load; retry once against fresh data
+        value = getattr(get_reference_data(db, force_reload=True), attr).get(key)
+    return value
+
+def get_stage_id(db: Session, stage_code: str) -> int | None:
+    return _lookup(db, "stage_ids", stage_code)
+
+def get_stage_id_by_name(db: Session, stage_name: str) -> int | None:
+    return _lookup(db, "stage_ids_by_name", stage_name)
+
+def get_status_id(db: Session, status_name: str) -> int | None:
+    return _lookup(db, "status_ids", status_name)
+
+def get_location_id(db: Session, location_name: str) -> int | None:
+    return _lookup(db, "location_ids", location_name)
+
+def get_context_id(db: Session, context_code: str) -> int | None:
+    return _lookup(db, "context_ids", context_code)
+
+def get_sku_meta(db: Session, sku_id: int) -> dict | None:
+    return _lookup(db, "skus", int(sku_id))
+
+def get_all_sku_meta(db: Session) -> dict[int, dict]:
+    return get_reference_data(db).skus
+
+def get_component_vector(db: Session, sku_id: int) -> dict[int, int]:
+    """Leaf components per unit of sku_id from the cached sku_bom graph (see ReferenceData.component_vector)."""
+    return dict(get_reference_data(db).component_vector(sku_id))
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime, timezone
-from sqlalchemy import text, select
+from sqlalchemy import text, select, bindparam
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
 from schemas.sales_schemas import SalesOrderInput
@@ -8,8 +8,10 @@ from schemas.audit_schemas import FieldChangeAudit
 from models.sales_models import Order, OrderItem
 from models.production_models import ProductType, ProductSKU
 # from models.sales_catalogue_models import SalesCatalogue
-from services.audit_services import update_record_with_audit
+from services.audit_services import AuditBatch, update_record_with_audit
+from services.tracking_service import chunked
 from utils.db_transaction import transactional
+from utils.query_cache import cached_query
 
 
 def get_active_skus(db: Session) -> list[dict]:
@@ -42,6 +44,15 @@ def get_sales_ready_qty_by_sku(db: Session) -> dict[int, int]:
     """
     return {row.sku_id: row.qty for row in db.execute(text(sql)).fetchall()}
 
+@cached_query(tables=(
+    "product_tracking",
+    "product_harvest",
+    "product_requests",
+    "product_skus",
+    "users",
+    "product_statuses",
+    "lifecycle_stages",
+))
 def get_sales_ready_inventory(db: Session):
     query = text(
         """
@@ -190,20 +201,8 @@ def get_canceled_order_headers(db: Session) -> list[dict]:
     return [dict(r._mapping) for r in rows]
 
 def get_canceled_orders_with_items(db: Session, order_id: int) -> dict:
-    product_rows = db.execute(text(
-        """
-            SELECT
-                oi.product_type_id,
-                pt.name AS product_type,
-                oi.quantity
-            FROM order_items oi
-            JOIN product_types pt ON oi.product_type_id = pt.id
-            WHERE oi.order_id = :order_id
-        """
-    ), {"order_id": order_id}).fetchall()
-
     return {
-        "product_items": [dict(r._mapping) for r in product_rows],
+        "product_items": get_order_items_by_order(db, [order_id])[order_id],
     }
 
 
@@ -225,17 +224,18 @@ def update_sales_order(db: Session, order_id: int, data: SalesOrderInput):
         updates["updated_at"] = (str(order.updated_at), now)
         order.updated_at = datetime.now(timezone.utc)
     
-    for field, (old, new) in updates.items():
-        audit = FieldChangeAudit(
-            table="orders",
-            record_id=order_id,
-            field=field,
-            old_value=old,
-            new_value=new,
-            reason="Sales order updated",
-            changed_by=data.updated_by
-        )
-        update_record_with_audit(db, audit)
+    with AuditBatch(db) as batch:
+        for field, (old, new) in updates.items():
+            audit = FieldChangeAudit(
+                table="orders",
+                record_id=order_id,
+                field=field,
+                old_value=old,
+                new_value=new,
+                reason="Sales order updated",
+                changed_by=data.updated_by
+            )
+            batch.add(audit)
 
     existing_items = {
         row.product_sku_id: row
@@ -318,33 +318,48 @@ def _get_order_header_query() -> str:
 def _get_items_query() -> str:
     return """
         SELECT
+            oi.order_id,
             oi.id,
             oi.product_sku_id,
             s.sku,
             s.name AS sku_name,
+            s.is_bundle,
+            s.is_serialized,
+            s.pack_qty,
             oi.quantity
         FROM order_items oi
         JOIN product_skus s ON oi.product_sku_id = s.id
-        WHERE oi.order_id = :oid
+        WHERE oi.order_id IN :oids
+        ORDER BY oi.order_id, oi.id
     """
 
+def get_order_items_by_order(db: Session, order_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Returns {order_id: [item, ...]} for every requested order (empty list if it has no items),
+    reading all of them in one query per IN_CLAUSE_CHUNK_SIZE orders.
+    """
+    items_by_order: dict[int, list[dict]] = {int(oid): [] for oid in order_ids}
+    if not items_by_order:
+        return items_by_order
+
+    stmt = text(_get_items_query()).bindparams(bindparam("oids", expanding=True))
+    for chunk in chunked(list(items_by_order)):
+        for row in db.execute(stmt, {"oids": chunk}).mappings():
+            items_by_order[int(row["order_id"])].append(dict(row))
+    return items_by_order
+
 def get_processing_order_with_items(db: Session, order_id: int = None, all_orders: bool = False):
     base_query = _get_order_header_query()
 
     if all_orders:
         query = base_query + " WHERE o.status = 'Processing' ORDER BY o.order_date ASC"
         orders = db.execute(text(query)).mappings().all()
-        results = []
+        items_by_order = get_order_items_by_order(db, [order["order_id"] for order in orders])
 
-        for order in orders:
-            oid = order["order_id"]
-            product_items = db.execute(text(_get_items_query()), {"oid": oid}).mappings().all()
-
-            results.append({
-                **order,
-                "order_items": list(product_items),
-            })
-        return results
+        return [
+            {**order, "order_items": items_by_order[order["order_id"]]}
+            for order in orders
+        ]
     
     elif order_id is not None:
         query = base_query + " WHERE o.id = :oid AND o.status = 'Processing'"
@@ -352,11 +367,9 @@ def get_processing_order_with_items(db: Session, order_id: int = None, all_order
         if not order_row:
             return None
         
-        product_items = db.execute(text(_get_items_query()), {"oid": order_id}).mappings().all()
-
         return {
             **order_row,
-            "order_items": list(product_items),
+            "order_items": get_order_items_by_order(db, [order_id])[order_id],
         }
     
     return None
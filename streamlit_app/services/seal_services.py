@@ -3,7 +3,7 @@ from sqlalchemy import text
 from models.seal_models import Seal
 from schemas.seals_schemas import SealCreate, SealOut
 from schemas.audit_schemas import FieldChangeAudit
-from services.audit_services import update_record_with_audit
+from services.audit_services import AuditBatch
 from utils.db_transaction import transactional
 
 
@@ -43,18 +43,19 @@ def update_seal_fields(
     reason: str,
     user_id: int
 ):
-    for field, (old_value, new_value) in updates.items():
-        audit = FieldChangeAudit(
-            table="seals",
-            record_id=seal_id,
-            field=field,
-            old_value=old_value,
-            new_value=new_value,
-            reason=reason,
-            changed_by=user_id
+    with AuditBatch(db) as batch:
+        for field, (old_value, new_value) in updates.items():
+            audit = FieldChangeAudit(
+                table="seals",
+                record_id=seal_id,
+                field=field,
+                old_value=old_value,
+                new_value=new_value,
+                reason=reason,
+                changed_by=user_id
 
-        )
-        update_record_with_audit(db, audit)
+            )
+            batch.add(audit)
     db.commit()
 
 @transactional
@@ -3,12 +3,22 @@ from collections import defaultdict
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from schemas.audit_schemas import FieldChangeAudit
-from services.audit_services import update_record_with_audit
-from services.tracking_service import update_product_stage
-from services.sales_services import _get_order_header_query
-from models.shipment_models import Shipment, ShipmentSKUItems, ShipmentUnitItems
+from services.audit_services import AuditBatch
+from services.tracking_service import chunked
+from services.reference_services import (
+    get_stage_id,
+    get_status_id,
+    get_location_id,
+    get_all_sku_meta,
+    get_sku_meta,
+    get_component_vector,
+)
+from services.sales_services import _get_order_header_query, get_order_items_by_order
+from models.shipment_models import Shipment
 from models.sales_models import Order
 from utils.db_transaction import transactional
+from utils.db_locks import acquire_transaction_applock
+from config import SHIPMENT_RESERVATION_TTL_SECONDS
 
 
 def get_open_order_headers(db: Session) -> list[dict]:
@@ -17,25 +27,17 @@ def get_open_order_headers(db: Session) -> list[dict]:
     return [dict(r._mapping) for r in result]
 
 def get_open_orders_with_items(db: Session, order_id: int) -> dict:
-    items = db.execute(text(
-        """
-            SELECT
-                oi.id,
-                oi.product_sku_id, 
-                s.sku, 
-                s.name AS sku_name,
-                s.is_bundle,
-                s.is_serialized, 
-                s.pack_qty,
-                oi.quantity
-            FROM order_items oi
-            JOIN product_skus s ON oi.product_sku_id = s.id
-            WHERE oi.order_id = :oid
-        """
-    ), {"oid": order_id}).mappings().all()
+    return get_open_orders_with_items_many(db, [order_id])[order_id]
 
+def get_open_orders_with_items_many(db: Session, order_ids: list[int]) -> dict[int, dict]:
+    """
+    Batched get_open_orders_with_items: {order_id: {"items": [...]}} from a single
+    items query, for views that show several orders at once.
+    """
+    items_by_order = get_order_items_by_order(db, order_ids)
     return {
-        "items": [dict(r) for r in items]
+        oid: {"items": [{k: v for k, v in item.items() if k != "order_id"} for item in items]}
+        for oid, items in items_by_order.items()
     }
 
 def build_unit_requirements(db: Session, order_items: list[dict]) -> dict[int, dict]:
@@ -60,26 +62,12 @@ def expand_sku_to_components(db: Session, parent_sku_id: int, count: int = 1) ->
     """
     Returns {component_sku_id: total_required_qty} for 'count' of parent_sku_id.
     If not BOM rows, returns {parent_sku_id: count}
+    Expansion runs in memory against the cached sku_bom graph (reference_services).
     """
-    bom = db.execute(text(
-        """
-            SELECT component_sku_id, component_qty
-            FROM sku_bom
-            WHERE parent_sku_id = :pid
-        """
-    ), {"pid": parent_sku_id}).mappings().all()
-
-    if not bom:
-        return {parent_sku_id: count}
-    
-    need = defaultdict(int)
-    for row in bom:
-        comp_id = row["component_sku_id"]
-        comp_qty = row["component_qty"] * count
-        sub = expand_sku_to_components(db, comp_id, comp_qty)
-        for k, v in sub.items():
-            need[k] += v
-    return dict(need)
+    return {
+        component_id: qty * count
+        for component_id, qty in get_component_vector(db, parent_sku_id).items()
+    }
 
     # expanded_components: list[dict] = []
     # for it in items:
@@ -124,43 +112,172 @@ def expand_sku_to_components(db: Session, parent_sku_id: int, count: int = 1) ->
     #     "components_required": expanded
     # }
 
-def get_fifo_inventory_by_sku(db: Session, sku_id: int, limit: int):
+SALES_READY_STAGE = "QMSalesApproval"
+SALES_READY_STATUSES = ("A-Ware", "B-Ware")
+ALLOCATION_LOCK = "shipment_fifo_allocation"
+
+
+def _fifo_candidates(db: Session, need: dict[int, int], holder: str = "") -> dict[int, list[dict]]:
+    """
+    One windowed query over every SKU in `need` ({sku_id: max_units}): ranks each SKU's
+    sales-ready units oldest print first and keeps the first max_units of each.
+    Units under an unexpired reservation by another holder are skipped.
+    """
+    need = {int(k): int(v) for k, v in need.items() if int(v) > 0}
+    if not need:
+        return {}
+
+    values = ", ".join(f"(:sku_{i}, :qty_{i})" for i in range(len(need)))
+    params = {"holder": holder or "", "stage_id": get_stage_id(db, SALES_READY_STAGE)}
+    for i, (sku_id, qty) in enumerate(need.items()):
+        params[f"sku_{i}"] = sku_id
+        params[f"qty_{i}"] = qty
+    params["status_ids"] = [get_status_id(db, name) for name in SALES_READY_STATUSES]
+
+    stmt = text(
+        f"""
+            WITH need AS (
+                SELECT sku_id, qty FROM (VALUES {values}) AS v(sku_id, qty)
+            ),
+            ranked AS (
+                SELECT
+                    pt.id AS product_id,
+                    pt.product_code,
+                    pr.sku_id,
+                    ph.print_date,
+                    pt.last_updated_at,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY pr.sku_id
+                        ORDER BY ph.print_date ASC, pt.id ASC
+                    ) AS fifo_rank
+                FROM product_tracking pt
+                JOIN product_harvest ph ON pt.harvest_id = ph.id
+                JOIN product_requests pr ON ph.request_id = pr.id
+                JOIN need n ON n.sku_id = pr.sku_id
+                JOIN product_skus s ON pr.sku_id = s.id
+                WHERE
+                    s.is_serialized = 1
+                    AND s.is_bundle = 0
+                    AND pt.current_stage_id = :stage_id
+                    AND pt.current_status_id IN :status_ids
+                    AND ph.print_date >= DATEADD(year, -1, GETDATE())
+                    AND NOT EXISTS (
+                        SELECT 1
+                        FROM shipment_reservations r
+                        WHERE r.product_tracking_id = pt.id
+                            AND r.holder <> :holder
+                            AND r.expires_at >= SYSUTCDATETIME()
+                    )
+            )
+            SELECT r.product_id, r.product_code, r.sku_id, r.print_date, r.last_updated_at
+            FROM ranked r
+            JOIN need n ON n.sku_id = r.sku_id
+            WHERE r.fifo_rank <= n.qty
+            ORDER BY r.sku_id, r.fifo_rank
+        """
+    ).bindparams(bindparam("status_ids", expanding=True))
+
+    out: dict[int, list[dict]] = {sku_id: [] for sku_id in need}
+    for row in db.execute(stmt, params).mappings():
+        out[int(row["sku_id"])].append(dict(row))
+    return out
+
+def get_fifo_inventory_by_sku(db: Session, sku_id: int, limit: int, holder: str = "") -> list[dict]:
     """
     Returns FIFO unites (serialized) available for a given SKU.
+    Read-only: used to list candidates for a manual pick; nothing is reserved.
     """
-    rows = db.execute(text(
+    return _fifo_candidates(db, {sku_id: limit}, holder).get(int(sku_id), [])
+
+@transactional
+def allocate_fifo_for_orders(
+    db: Session,
+    unit_need_by_order: dict[int, dict[int, int]],
+    *,
+    holder: str,
+    user_id: int,
+    ttl_seconds: int = SHIPMENT_RESERVATION_TTL_SECONDS,
+) -> dict[int, dict[int, list[dict]]]:
+    """
+    FIFO picks for one or more orders: {order_id: {sku_id: [unit, ...]}}.
+
+    `unit_need_by_order` is {order_id: {sku_id: required_units}}, in priority order;
+    earlier orders get the older units of a SKU they share. All SKUs are ranked in a
+    single windowed query, and the picked units are soft-reserved for `holder`
+    (replacing anything it held before) until ttl_seconds from now.
+    Allocation is serialized with an application lock so concurrent holders
+    never receive the same unit.
+    """
+    acquire_transaction_applock(db, ALLOCATION_LOCK)
+
+    db.execute(text(
         """
-            SELECT
-                pt.id AS product_id,
-                pt.tracking_id,
-                ph.print_date,
-                pt.last_updated_at
-            FROM product_tracking pt
-            JOIN product_harvest ph ON pt.harvest_id = ph.id
-            JOIN product_requests pr ON ph.request_id = pr.id
-            JOIN product_skus s ON pr.sku_id = s.id
-            JOIN product_statuses ps ON pt.current_status_id = ps.id
-            JOIN lifecycle_stages ls ON pt.current_stage_id = ls.id
-            WHERE 
-                pr.sku_id = :sku_id
-                AND s.is_serialized = 1
-                AND s.is_bundle = 0
-                AND ls.stage_code = 'QMSalesApproval'
-                AND ps.status_name IN ('A-Ware', 'B-Ware')
-                AND ph.print_date >= DATEADD(year, -1, GETDATE())
-            ORDER BY ph.print_date ASC
-            OFFSET 0 ROWS FETCH NEXT :limit ROWS ONLY
+            DELETE FROM shipment_reservations
+            WHERE holder = :holder OR expires_at < SYSUTCDATETIME()
+        """
+    ), {"holder": holder})
+
+    total_need: dict[int, int] = defaultdict(int)
+    for lines in unit_need_by_order.values():
+        for sku_id, qty in lines.items():
+            total_need[int(sku_id)] += int(qty)
+
+    candidates = _fifo_candidates(db, total_need, holder)
+
+    picks: dict[int, dict[int, list[dict]]] = {}
+    taken: dict[int, int] = defaultdict(int)
+    reservations: list[dict] = []
+    for order_id, lines in unit_need_by_order.items():
+        picks[order_id] = {}
+        for sku_id, qty in lines.items():
+            sku_id = int(sku_id)
+            start = taken[sku_id]
+            units = candidates.get(sku_id, [])[start:start + int(qty)]
+            taken[sku_id] += len(units)
+            picks[order_id][sku_id] = units
+            reservations.extend(
+                {"pid": u["product_id"], "holder": holder, "oid": order_id, "uid": user_id, "ttl": ttl_seconds}
+                for u in units
+            )
+
+    if reservations:
+        db.execute(text(
+            """
+                INSERT INTO shipment_reservations (product_tracking_id, holder, order_id, reserved_by, expires_at)
+                VALUES (:pid, :holder, :oid, :uid, DATEADD(second, :ttl, SYSUTCDATETIME()))
+            """
+        ), reservations)
+
+    db.commit()
+    return picks
+
+def allocate_fifo_for_order(db: Session, order_id: int, unit_need: dict[int, int], *, holder: str, user_id: int) -> dict[int, list[dict]]:
+    """Single-order allocate_fifo_for_orders: {sku_id: [unit, ...]}."""
+    return allocate_fifo_for_orders(db, {order_id: unit_need}, holder=holder, user_id=user_id)[order_id]
+
+def get_conflicting_reservations(db: Session, product_ids: list[int], holder: str) -> list[int]:
+    """Units among product_ids currently reserved by someone other than holder."""
+    conflicts: list[int] = []
+    stmt = text(
+        """
+            SELECT product_tracking_id
+            FROM shipment_reservations
+            WHERE product_tracking_id IN :ids
+                AND holder <> :holder
+                AND expires_at >= SYSUTCDATETIME()
         """
-    ), {"sku_id": sku_id, "limit": limit}).mappings().all()
+    ).bindparams(bindparam("ids", expanding=True))
+    for chunk in chunked(list(product_ids)):
+        conflicts.extend(r.product_tracking_id for r in db.execute(stmt, {"ids": chunk, "holder": holder}))
+    return conflicts
 
-    return [dict(r) for r in rows]
+@transactional
+def release_reservations(db: Session, holder: str):
+    db.execute(text("DELETE FROM shipment_reservations WHERE holder = :holder"), {"holder": holder})
+    db.commit()
 
 def expand_order_skus_to_components(db: Session, order_items: list[dict]) -> dict[int, dict]:
-    sku_meta = {
-        r["id"]: r for r in db.execute(text(
-            "SELECT id, sku, name AS sku_name, is_serialized FROM product_skus"
-        )).mappings().all()
-    }
+    sku_meta = get_all_sku_meta(db)
 
     need = defaultdict(int)
     for row in order_items:
@@ -170,10 +287,54 @@ def expand_order_skus_to_components(db: Session, order_items: list[dict]) -> dic
     
     out = {}
     for cid, qty in need.items():
-        meta = sku_meta[cid]
+        meta = sku_meta.get(cid) or get_sku_meta(db, cid)
         out[cid] = {"required_qty": qty, "sku": meta["sku"], "sku_name": meta["sku_name"], "is_serialized": bool(meta["is_serialized"])}
     return out 
 
+def move_shipment_units_to_stage(
+    db: Session,
+    *,
+    shipment_id: int,
+    new_stage_id: int,
+    reason: str,
+    user_id: int,
+    location_id: int | None = None
+) -> int:
+    """
+    Moves every unit on a shipment to new_stage_id (and location_id, if given):
+    one INSERT ... SELECT for the history rows and one joined UPDATE, regardless
+    of shipment size. Returns the number of product_tracking rows updated.
+    """
+    params = {"sid": shipment_id, "new_stage_id": new_stage_id, "reason": reason, "user_id": user_id}
+
+    db.execute(text(
+        """
+            INSERT INTO product_status_history
+                (product_tracking_id, from_stage_id, to_stage_id, reason, changed_by, changed_at)
+            SELECT pt.id, pt.current_stage_id, :new_stage_id, :reason, :user_id, GETDATE()
+            FROM product_tracking pt WITH (UPDLOCK)
+            JOIN shipment_unit_items si ON si.product_tracking_id = pt.id
+            WHERE si.shipment_id = :sid
+        """
+    ), params)
+
+    location_set = ""
+    if location_id is not None:
+        location_set = ", location_id = :location_id"
+        params["location_id"] = location_id
+
+    return db.execute(text(
+        f"""
+            UPDATE pt
+            SET previous_stage_id = pt.current_stage_id,
+                current_stage_id = :new_stage_id,
+                last_updated_at = GETDATE(){location_set}
+            FROM product_tracking pt
+            JOIN shipment_unit_items si ON si.product_tracking_id = pt.id
+            WHERE si.shipment_id = :sid
+        """
+    ), params).rowcount
+
 @transactional
 def create_shipment_from_order(
     db: Session,
@@ -184,8 +345,21 @@ def create_shipment_from_order(
     picked_by_sku: dict[int, list[dict]],
     non_serialized_counts: dict[int, int],
     updated_by: int,
-    notes: str = ""
+    notes: str = "",
+    holder: str | None = None
 ):
+    """
+    Creates the shipment for an order from the picked units. With `holder`, refuses
+    units another holder has reserved and releases holder's reservations on success.
+    """
+    if holder is not None:
+        # Same lock as allocate_fifo_for_orders, so no reservation lands between check and insert
+        acquire_transaction_applock(db, ALLOCATION_LOCK)
+        picked_ids = [u["product_id"] for units in picked_by_sku.values() for u in (units or [])]
+        conflicts = get_conflicting_reservations(db, picked_ids, holder)
+        if conflicts:
+            raise ValueError(f"Units reserved by another shipment in progress: {sorted(conflicts)}")
+
     # === Create Shipment ===
     shipment = Shipment(
         order_id=order_id,
@@ -198,85 +372,90 @@ def create_shipment_from_order(
     db.add(shipment)
     db.flush()
 
-    # === Product Lifecycle Update ===
-    pending_shipment_stage_id = db.scalar(
-        text("SELECT id FROM lifecycle_stages WHERE stage_code = 'PendingShipment'")
-    )
-
     sku_meta = {
-        r["id"]: (int(r["pack_qty"] or 1), bool(r["is_bundle"]))
-        for r in db.execute(text("SELECT id, pack_qty, is_bundle FROM product_skus")).mappings().all()
+        sku_id: (int(r["pack_qty"] or 1), bool(r["is_bundle"]))
+        for sku_id, r in get_all_sku_meta(db).items()
     }
 
-    per_sku_units_inserted: dict[int, int] = defaultdict(int)
+    # === Unit Items (one executemany) ===
+    unit_rows = [
+        {"sid": shipment.id, "pid": int(unit["product_id"])}
+        for units in picked_by_sku.values()
+        for unit in (units or [])
+    ]
+    if unit_rows:
+        db.execute(text(
+            """
+                INSERT INTO shipment_unit_items (shipment_id, product_tracking_id)
+                VALUES (:sid, :pid)
+            """
+        ), unit_rows)
+
+    # === Product Lifecycle Update (set-based over the shipment's units) ===
+    pending_shipment_stage_id = get_stage_id(db, "PendingShipment")
+    if pending_shipment_stage_id and unit_rows:
+        move_shipment_units_to_stage(
+            db,
+            shipment_id=shipment.id,
+            new_stage_id=pending_shipment_stage_id,
+            reason="Marked for Shipment",
+            user_id=creator_id
+        )
 
+    # === SKU Items (one executemany) ===
+    sku_rows = []
     for sku_id, units in picked_by_sku.items():
-        for unit in (units or []):
-            item = ShipmentUnitItems(
-                shipment_id=shipment.id,
-                product_id=unit["product_id"],
-            )
-            db.add(item)
-
-            per_sku_units_inserted[sku_id] += 1
-
-            if pending_shipment_stage_id:
-                update_product_stage(
-                    db=db,
-                    product_id=unit["product_id"],
-                    new_stage_id=pending_shipment_stage_id,
-                    reason="Marked for Shipment",
-                    user_id=creator_id
-                )
-
-    for sku_id, units in per_sku_units_inserted.items():
         pack_qty, is_bundle = sku_meta.get(int(sku_id), (1, False))
-        qty = (units // pack_qty) if is_bundle and pack_qty > 0 else units
+        count = len(units or [])
+        qty = (count // pack_qty) if is_bundle and pack_qty > 0 else count
         if qty > 0:
-            item = ShipmentSKUItems(
-                shipment_id=shipment.id,
-                product_sku_id=int(sku_id),
-                quantity=int(qty)
-            )
-            db.add(item)
+            sku_rows.append({"sid": shipment.id, "sku_id": int(sku_id), "qty": int(qty)})
 
     for sku_id, qty in (non_serialized_counts or {}).items():
         if qty and qty > 0:
-            db.add(ShipmentSKUItems(
-                shipment_id=shipment.id,
-                product_sku_id=int(sku_id),
-                quantity=int(qty)
-            ))
+            sku_rows.append({"sid": shipment.id, "sku_id": int(sku_id), "qty": int(qty)})
+
+    if sku_rows:
+        db.execute(text(
+            """
+                INSERT INTO shipment_sku_items (shipment_id, product_sku_id, quantity)
+                VALUES (:sid, :sku_id, :qty)
+            """
+        ), sku_rows)
+
     # === Fetch Order ===
     order = db.query(Order).filter(Order.id == order_id).first()
 
     # === Update Audit Logs ===
     now_str = str(datetime.now(timezone.utc))
 
-    for field, old, new in [
-        ("status", order.status, "Completed"),
-        ("updated_by", order.updated_by, updated_by),
-        ("updated_at", str(order.updated_at), now_str)
-    ]:
-        update_record_with_audit(
-            db=db,
-            data=FieldChangeAudit(
-                table="orders",
-                record_id=order_id,
-                field=field,
-                old_value=old,
-                new_value=new,
-                reason="Shipment created",
-                changed_by=updated_by
-            ),
-            update=False
-        )
+    with AuditBatch(db) as batch:
+        for field, old, new in [
+            ("status", order.status, "Completed"),
+            ("updated_by", order.updated_by, updated_by),
+            ("updated_at", str(order.updated_at), now_str)
+        ]:
+            batch.add(
+                FieldChangeAudit(
+                    table="orders",
+                    record_id=order_id,
+                    field=field,
+                    old_value=old,
+                    new_value=new,
+                    reason="Shipment created",
+                    changed_by=updated_by
+                ),
+                update=False
+            )
     
     # === Perform Final Update on Order ===
     order.status = "Completed"
     order.updated_by = updated_by
     order.updated_at = datetime.now(timezone.utc)
 
+    if holder is not None:
+        db.execute(text("DELETE FROM shipment_reservations WHERE holder = :holder"), {"holder": holder})
+
     db.commit()
 
 def get_active_shipments(db: Session):
@@ -306,12 +485,12 @@ def get_products_in_shipments(db: Session, shipment_id: int):
         """
             SELECT
                 pt.id AS product_id,
-                pt.tracking_id,
+                pt.product_code,
                 s.sku,
                 s.name AS sku_name,
                 ph.print_date
             FROM shipment_unit_items si
-            JOIN product_tracking pt ON si.product_id = pt.id
+            JOIN product_tracking pt ON si.product_tracking_id = pt.id
             JOIN product_harvest ph ON pt.harvest_id = ph.id
             JOIN product_requests pr ON ph.request_id = pr.id
             JOIN product_skus s ON pr.sku_id = s.id
@@ -353,28 +532,20 @@ def mark_shipment_as_shipped(db: Session, shipment_id: int, user_id: int, carrie
         """
     ), {"sid": shipment_id, "carrier": carrier, "tracking": tracking_number})
 
-    products = db.execute(text("SELECT product_id FROM shipment_unit_items WHERE shipment_id = :sid"),
-                    {"sid": shipment_id}
-                ).fetchall()
-    
-    shipped_stage_id = db.scalar(text("SELECT id FROM lifecycle_stages WHERE stage_code = 'Shipped'"))
-
-    offsite_id = db.execute(
-        text("SELECT id FROM storage_locations WHERE location_name = 'Offsite'")
-    ).scalar_one()
+    shipped_stage_id = get_stage_id(db, "Shipped")
+    offsite_id = get_location_id(db, "Offsite")
     
     if not offsite_id:
          raise ValueError("Offsite storage location not found.")
 
-    for row in products:
-        update_product_stage(
-            db=db,
-            product_id=row.product_id,
-            new_stage_id=shipped_stage_id,
-            reason="Shipment sent",
-            user_id=user_id,
-            location_id=offsite_id
-        )
+    move_shipment_units_to_stage(
+        db,
+        shipment_id=shipment_id,
+        new_stage_id=shipped_stage_id,
+        reason="Shipment sent",
+        user_id=user_id,
+        location_id=offsite_id
+    )
     
     db.commit()
 
@@ -395,21 +566,22 @@ def mark_shipment_as_delivered(db: Session, shipment_id: int):
 @transactional
 def cancel_order_request(db: Session, order_id: int, user_id: int, old_status: str, old_updated_by: int, old_updated_at: str, notes: str = ""):
     # === Prepare Audit Logs ===
-    for field, old, new in [
-        ("status", old_status, "Canceled"),
-        ("updated_by", old_updated_by, user_id),
-        ("updated_at", old_updated_at, datetime.now(timezone.utc))
-    ]:
-        audit = FieldChangeAudit(
-            table="orders",
-            record_id=order_id,
-            field=field,
-            old_value=old,
-            new_value=new,
-            reason="Order request canceled",
-            changed_by=user_id
-        )
-        update_record_with_audit(db, audit, update=False)
+    with AuditBatch(db) as batch:
+        for field, old, new in [
+            ("status", old_status, "Canceled"),
+            ("updated_by", old_updated_by, user_id),
+            ("updated_at", old_updated_at, datetime.now(timezone.utc))
+        ]:
+            audit = FieldChangeAudit(
+                table="orders",
+                record_id=order_id,
+                field=field,
+                old_value=old,
+                new_value=new,
+                reason="Order request canceled",
+                changed_by=user_id
+            )
+            batch.add(audit, update=False)
 
     # === Perform actual update ===
     db.execute(text(
@@ -430,4 +602,7 @@ def cancel_order_request(db: Session, order_id: int, user_id: int, old_status: s
             }
     )
 
+    # Holds on a canceled order (any session's) would keep its units out of FIFO until they expire
+    db.execute(text("DELETE FROM shipment_reservations WHERE order_id = :oid"), {"oid": order_id})
+
     db.commit()
\ No newline at end of file
@@ -1,29 +1,26 @@
 from datetime import datetime, timezone
-from typing import Optional, List, Tuple
-from sqlalchemy import text
+from typing import Optional, List, Tuple, Iterable
+from sqlalchemy import text, bindparam
 from sqlalchemy.orm import Session
 from models.production_models import ProductTracking
 from utils.db_transaction import transactional
+from services.reference_services import get_status_id
 
 
+# SQL Server caps a statement at 2100 parameters; keep expanding IN lists well below it.
+IN_CLAUSE_CHUNK_SIZE = 2000
+
+
+def chunked(values: list, size: int = IN_CLAUSE_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
 def generate_tracking_id(db: Session, date=None) -> str:
     """
-    Generate the next tracking_id based on the highest existing one in the product_tracking table.
-    Returns an integer (or string if you prefer).
+    Generate the next tracking id from dbo.product_id_seq (the same sequence that
+    fills product_tracking.product_id), instead of scanning the table for its MAX.
     """
-    result = db.execute(text(
-        """
-            SELECT MAX(CAST(tracking_id AS BIGINT)) 
-            FROM product_tracking
-        """
-    )).scalar()
-    
-    if result is None:
-        # If the table is empty, start with an initial value
-        next_id = 1000000
-    else:
-        next_id = result + 1
-
+    next_id = db.execute(text("SELECT NEXT VALUE FOR dbo.product_id_seq")).scalar_one()
     return str(next_id)
     # if not date:
     #     date = datetime.today()
@@ -98,14 +95,67 @@ def update_product_stage(
         user_id=user_id
     )
 
+def bulk_update_product_stage(
+        db: Session,
+        product_ids: Iterable[int],
+        new_stage_id: int,
+        reason: str,
+        user_id: int,
+        location_id: Optional[int] = None
+) -> int:
+    """
+    Set-based version of update_product_stage for many products sharing one
+    target stage and reason. Writes the history rows with a single INSERT ... SELECT
+    and moves the products with a single UPDATE (per chunk of ids).
+    Returns the number of product_tracking rows updated.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+    if not ids:
+        return 0
+
+    # UPDLOCK keeps the stage read for the history row stable until the UPDATE below runs
+    history_sql = text("""
+        INSERT INTO product_status_history
+            (product_tracking_id, from_stage_id, to_stage_id, reason, changed_by, changed_at)
+        SELECT id, current_stage_id, :new_stage_id, :reason, :user_id, GETDATE()
+        FROM product_tracking WITH (UPDLOCK)
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+
+    update_fields = [
+        "previous_stage_id = current_stage_id",
+        "current_stage_id = :new_stage_id",
+        "last_updated_at = GETDATE()"
+    ]
+    if location_id is not None:
+        update_fields.append("location_id = :location_id")
+
+    update_sql = text(f"""
+        UPDATE product_tracking
+        SET {", ".join(update_fields)}
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+
+    updated = 0
+    for chunk in chunked(ids):
+        db.execute(history_sql, {
+            "new_stage_id": new_stage_id,
+            "reason": reason,
+            "user_id": user_id,
+            "ids": chunk
+        })
+        params = {"new_stage_id": new_stage_id, "ids": chunk}
+        if location_id is not None:
+            params["location_id"] = location_id
+        updated += db.execute(update_sql, params).rowcount
+
+    return updated
+
 def update_product_status(db: Session, product_id: int, status_name: str):
     """
     Updates the product's business status (A-Ware, B-Ware, In Quarantine, Waste)
     """
-    status_id = db.scalar(
-        text("SELECT id FROM product_statuses WHERE status_name = :name"),
-        {"name": status_name}
-    )
+    status_id = get_status_id(db, status_name)
     if not status_id:
         raise ValueError(f"Status '{status_name}' not found in product_statuses table.")
 
@@ -118,6 +168,29 @@ def update_product_status(db: Session, product_id: int, status_name: str):
         {"status_id": status_id, "pid": product_id}
     )
 
+def bulk_update_product_status(db: Session, product_ids: Iterable[int], status_name: str) -> int:
+    """
+    Set-based version of update_product_status for many products moving to the same status.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+    if not ids:
+        return 0
+
+    status_id = get_status_id(db, status_name)
+    if not status_id:
+        raise ValueError(f"Status '{status_name}' not found in product_statuses table.")
+
+    sql = text("""
+        UPDATE product_tracking
+        SET current_status_id = :status_id, last_updated_at = GETDATE()
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+
+    updated = 0
+    for chunk in chunked(ids):
+        updated += db.execute(sql, {"status_id": status_id, "ids": chunk}).rowcount
+    return updated
+
 def get_material_usage_summary(db: Session) -> list[dict]:
     """
     Queries the v_material_usage_summary view and returns summary rows as dictionaries.
@@ -208,120 +281,74 @@ def validate_materials_available(db: Session, sku_id: int, quantity: int):
     Validates whether there is sufficient material from a single lot/batch of
     filament, lids, and seals to fulfill the product request.
     Returns a list of error messages. Empty list means validation passed. 
+
+    Reads the SKU's print specs and the best lot per material type from
+    v_material_lot_balance in one query; lid/seal usage comes from the indexed
+    v_material_lot_usage view instead of aggregating material_usage.
     """
     errors = []
     info_message = None
 
-    # === Get weight requirement ===
-    spec = db.execute(text(
+    rows = db.execute(text(
         """
-            SELECT sps.average_weight_g, sps.weight_buffer_g
+            SELECT
+                sps.average_weight_g,
+                sps.weight_buffer_g,
+                best.material_type,
+                best.lot_number,
+                best.remaining_qty
             FROM product_skus ps
             LEFT JOIN product_print_specs sps ON sps.sku_id = ps.id
+            OUTER APPLY (
+                SELECT ranked.material_type, ranked.lot_number, ranked.remaining_qty
+                FROM (
+                    SELECT
+                        material_type,
+                        lot_number,
+                        remaining_qty,
+                        ROW_NUMBER() OVER (PARTITION BY material_type ORDER BY remaining_qty DESC) AS rn
+                    FROM v_material_lot_balance
+                    WHERE remaining_qty > 0
+                ) ranked
+                WHERE ranked.rn = 1
+            ) best
             WHERE ps.id = :sid
         """
-    ), {"sid": sku_id}).fetchone()
+    ), {"sid": sku_id}).fetchall()
 
+    # === Get weight requirement ===
+    spec = rows[0] if rows else None
     if not spec or spec.average_weight_g is None or spec.weight_buffer_g is None:
         return (["Selected SKU has no print specs (average_weight_g/weight_buffer_g)."], None)
     
     weight_per_unit = float(spec.average_weight_g) + float(spec.weight_buffer_g)
     total_required_weight = weight_per_unit * quantity
 
+    best_lots = {row.material_type: row for row in rows if row.material_type}
+
     # === Filament availability ===
-    filament_lots = db.execute(text(
-        """
-            SELECT f.lot_number, SUM(fm.remaining_weight) AS available_grams
-            FROM filament_mounting fm
-            JOIN filaments f ON fm.filament_tracking_id = f.id
-            WHERE fm.status = 'In Use' AND f.qc_result = 'PASS'
-            GROUP BY f.lot_number
-        """
-    )).fetchall()
-
-    # used_filament = db.execute(text(
-    #     """
-    #         SELECT lot_number, SUM(used_quantity) AS used_grams
-    #         FROM material_usage
-    #         WHERE material_type = 'Filament' AND lot_number IS NOT NULL
-    #         GROUP BY lot_number
-    #     """
-    # )).fetchall()
-    # used_filament_map = {row.lot_number: float(row.used_grams or 0) for row in used_filament}
-    
-    
-    best_filament = None
-    max_units_filament = 0
-    for row in filament_lots:
-        # remaining = float(row.available_grams or 0) - used_filament_map.get(row.lot_number, 0.0)
-        remaining = float(row.available_grams or 0)
-        units = int(remaining // weight_per_unit)
-        if units > max_units_filament:
-            max_units_filament = units
-            best_filament = row.lot_number
-            best_remaining = remaining
+    filament = best_lots.get("Filament")
+    best_filament = filament.lot_number if filament else None
+    best_remaining = float(filament.remaining_qty) if filament else 0.0
+    max_units_filament = int(best_remaining // weight_per_unit)
+    if max_units_filament == 0:
+        best_filament = None
     
     if max_units_filament < quantity:
         errors.append(f"Not enough filament from any single lot fulfill {total_required_weight:.2f}g. Only {best_remaining:.2f}g from LOT {best_filament}.")
 
     # === Lid availability ===
-    lid_batches = db.execute(text(
-        """
-            SELECT serial_number, SUM(quantity) AS available_units
-            FROM lids
-            WHERE qc_result = 'PASS'
-            GROUP BY serial_number
-        """
-    )).fetchall()
-
-    used_lids = db.execute(text(
-        """
-            SELECT lot_number, COUNT(*) AS used_units
-            FROM material_usage
-            WHERE material_type = 'Lid' AND lot_number IS NOT NULL
-            GROUP BY lot_number
-        """
-    )).fetchall()
-    used_lids_map = {row.lot_number: int(row.used_units or 0) for row in used_lids}
-
-    best_lid = None
-    max_units_lid = 0
-    for row in lid_batches:
-        remaining = int(row.available_units or 0) - used_lids_map.get(row.serial_number, 0)
-        if remaining > max_units_lid:
-            max_units_lid = remaining
-            best_lid = row.serial_number
+    lid = best_lots.get("Lid")
+    best_lid = lid.lot_number if lid else None
+    max_units_lid = int(lid.remaining_qty) if lid else 0
     
     if max_units_lid < quantity:
         errors.append(f"Not enough lids from any single batch to fulfill {quantity} units.")
 
     # === Seal availability ===
-    seal_batches = db.execute(text(
-        """
-            SELECT serial_number, SUM(quantity) AS available_units
-            FROM seals
-            WHERE qc_result = 'PASS'
-            GROUP BY serial_number
-        """
-    )).fetchall()
-
-    used_seals = db.execute(text(
-        """
-            SELECT lot_number, COUNT(*) AS used_units
-            FROM material_usage
-            WHERE material_type = 'Seal' AND lot_number IS NOT NULL
-            GROUP BY lot_number
-        """
-    )).fetchall()
-    used_seals_map = {row.lot_number: int(row.used_units or 0) for row in used_seals}
-
-    best_seal = None
-    max_units_seal = 0
-    for row in seal_batches:
-        remaining = int(row.available_units or 0) - used_seals_map.get(row.serial_number, 0)
-        if remaining > max_units_seal:
-            max_units_seal = remaining
-            best_seal = row.serial_number
+    seal = best_lots.get("Seal")
+    best_seal = seal.lot_number if seal else None
+    max_units_seal = int(seal.remaining_qty) if seal else 0
 
     if max_units_seal < quantity:
         errors.append(f"Not enough seals from any single batch to fulfill {quantity} units.")
@@ -334,4 +361,4 @@ def validate_materials_available(db: Session, sku_id: int, quantity: int):
             f"is {max_possible_unit} units."
         )
     
-    return errors, info_message
\ No newline at end of file
+    return errors, info_message
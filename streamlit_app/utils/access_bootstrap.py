@@ -1,6 +1,8 @@
 from __future__ import annotations
+import time
 import streamlit as st
-from utils.auth import get_current_user
+from config import IDENTITY_CACHE_TTL_SECONDS
+from utils.auth import get_current_user, get_principal_fingerprint
 from utils.groups import get_group_oids
 from data.users import upsert_user_by_oid
 from data.access import get_effective_access
@@ -12,7 +14,22 @@ def ensure_user_and_access():
     - Upserts the user record by Entra OID
     - Resolves effective access by combining user + group rights
     - Caches into st.session_state["user_id"], ["display_name"], ["group_oids"], ["access"]
+
+    The result is reused for the rest of the session while the principal headers hash
+    the same and IDENTITY_CACHE_TTL_SECONDS hasn't passed, so ordinary page loads skip
+    the claims parsing and all of the DB work.
     """
+    fingerprint = get_principal_fingerprint()
+    cached = st.session_state.get("_identity_cache")
+    if (
+        fingerprint
+        and cached
+        and cached["fingerprint"] == fingerprint
+        and time.monotonic() - cached["resolved_at"] < IDENTITY_CACHE_TTL_SECONDS
+        and "user_id" in st.session_state
+    ):
+        return st.session_state["user_id"], st.session_state["access"]
+
     user = get_current_user()
     if not user:
         st.warning("Please sign in.")
@@ -40,6 +57,7 @@ def ensure_user_and_access():
     st.session_state["display_name"] = disp
     st.session_state["group_oids"] = groups
     st.session_state["access"] = access_map
+    st.session_state["_identity_cache"] = {"fingerprint": fingerprint, "resolved_at": time.monotonic()}
 
     return user_id, access_map 
 
@@ -1,4 +1,4 @@
-import base64, json, os, secrets
+import base64, hashlib, json, os, secrets, time
 import streamlit as st
 from dotenv import load_dotenv
 from pathlib import Path
@@ -82,6 +82,29 @@ def _get_user_from_easy_auth():
 
     return None
 
+# EasyAuth headers that together identify the signed-in principal and its groups
+_PRINCIPAL_HEADERS = (
+    "x-ms-client-principal",
+    "x-ms-client-principal-groups",
+    "x-ms-client-principal-id",
+    "x-ms-client-principal-name",
+)
+
+def get_principal_fingerprint() -> str | None:
+    """
+    SHA-256 of the request's EasyAuth principal headers (locally: the MSAL user's oid
+    and Graph token), or None if nobody is signed in. Changes whenever the identity
+    or its group claims do, so it can key per-session identity caches.
+    """
+    headers = {k.lower(): v for k, v in _get_request_headers().items()}
+    parts = [headers.get(h) or "" for h in _PRINCIPAL_HEADERS]
+    if not any(parts):
+        local_user = st.session_state.get("user") if _is_local() else None
+        if not local_user:
+            return None
+        parts = [str(local_user.get("oid")), st.session_state.get("graph_access_token") or ""]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
 def _env(key: str, default: str | None = None) -> str | None:
     v = os.getenv(key, default)
     return v
@@ -168,6 +191,10 @@ def _handle_local_redirect():
 
     if result.get("access_token"):
         st.session_state["graph_access_token"] = result.get("access_token")
+        # Group lookups made with this token are cached until it expires (utils/groups);
+        # None (expiry unknown) makes them fall back to GRAPH_GROUPS_DEFAULT_TTL_SECONDS
+        expires_in = result.get("expires_in")
+        st.session_state["graph_access_token_expires_at"] = time.time() + int(expires_in) if expires_in else None
 
 def _local_login_ui():
     """
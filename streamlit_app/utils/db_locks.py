@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def acquire_transaction_applock(db: Session, resource: str, timeout_ms: int = 10000):
+    """
+    Takes an exclusive SQL Server application lock on `resource` for the rest of the
+    current transaction (released on commit/rollback). Serializes short critical
+    sections across app instances without locking any table.
+    Raises RuntimeError if the lock isn't granted within timeout_ms.
+    """
+    result = db.execute(text(
+        """
+            SET NOCOUNT ON;
+            DECLARE @result INT;
+            EXEC @result = sp_getapplock
+                @Resource = :resource,
+                @LockMode = 'Exclusive',
+                @LockOwner = 'Transaction',
+                @LockTimeout = :timeout_ms;
+            SELECT @result AS result;
+        """
+    ), {"resource": resource, "timeout_ms": timeout_ms}).scalar()
+
+    if result is None or result < 0:
+        raise RuntimeError(f"Could not acquire application lock '{resource}' (result {result}).")
+
+@contextmanager
+def session_applock(engine, resource: str, timeout_ms: int = 0):
+    """
+    Holds an exclusive session-owned application lock on `resource` on a dedicated
+    connection, for work that spans several commits (scheduled jobs). Yields that
+    connection when the lock is granted and None otherwise, so another app instance
+    already running the same work is skipped rather than waited on.
+    """
+    conn = engine.connect()
+    try:
+        result = conn.execute(text(
+            """
+                SET NOCOUNT ON;
+                DECLARE @result INT;
+                EXEC @result = sp_getapplock
+                    @Resource = :resource,
+                    @LockMode = 'Exclusive',
+                    @LockOwner = 'Session',
+                    @LockTimeout = :timeout_ms;
+                SELECT @result AS result;
+            """
+        ), {"resource": resource, "timeout_ms": timeout_ms}).scalar()
+        conn.commit()
+
+        if result is None or result < 0:
+            yield None
+            return
+
+        try:
+            yield conn
+        finally:
+            try:
+                conn.rollback()
+                conn.execute(text(
+                    "EXEC sp_releaseapplock @Resource = :resource, @LockOwner = 'Session';"
+                ), {"resource": resource})
+                conn.commit()
+            except Exception:
+                # A session lock must not outlive us on a pooled connection
+                conn.invalidate()
+                raise
+    finally:
+        conn.close()
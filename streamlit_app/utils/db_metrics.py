@@ -0,0 +1,210 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Upper bounds (ms) of the latency histogram buckets; anything slower lands in "+Inf"
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count/sum/max, in milliseconds."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float | None:
+        """Upper bound of the bucket holding the p-th percentile (None if empty or +Inf)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class DbMetrics:
+    """
+    Process-wide counters for the engine's connection pool and statement latency.
+    Fed by the listeners registered in install_db_metrics(); read by the admin
+    diagnostics panel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.checkout_wait = LatencyHistogram()
+            self.checkout_timeouts = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.disconnect_errors = 0
+            self.peak_in_use = 0
+            self.peak_overflow = 0
+            self.statements: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    def record_checkout_wait(self, ms: float, timed_out: bool = False):
+        with self._lock:
+            self.checkout_wait.observe(ms)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def record_checkout(self, in_use: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_statement(self, kind: str, ms: float):
+        with self._lock:
+            self.statements[kind].observe(ms)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "new_connections": self.connects,
+                "checkout_timeouts": self.checkout_timeouts,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "disconnect_errors": self.disconnect_errors,
+                "peak_in_use": self.peak_in_use,
+                "peak_overflow": self.peak_overflow,
+                "checkout_wait": self.checkout_wait.snapshot(),
+                "statements": {kind: h.snapshot() for kind, h in sorted(self.statements.items())},
+            }
+
+
+db_metrics = DbMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            db_metrics.record_checkout_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        db_metrics.record_checkout_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def statement_kind(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    verb = words[0].upper() if words else ""
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE", "MERGE", "WITH", "EXEC") else "OTHER"
+
+def install_db_metrics(engine):
+    """
+    Registers pool and cursor listeners on the engine that feed db_metrics.
+    Checkout waits are only timed when the engine uses InstrumentedQueuePool.
+    """
+    pool = engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_conn, record):
+        db_metrics.increment("connects")
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        # engine.pool, not `pool`: dispose() swaps in a recreated pool carrying these listeners
+        current = engine.pool
+        db_metrics.record_checkout(current.checkedout(), max(current.overflow(), 0))
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        db_metrics.increment("checkins")
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        db_metrics.increment("invalidations")
+
+    @event.listens_for(pool, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_conn, record, exception):
+        db_metrics.increment("soft_invalidations")
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.is_disconnect:
+            db_metrics.increment("disconnect_errors")
+        # The failed statement never reaches after_cursor_execute; drop its start time
+        if context.connection is not None and context.cursor is not None:
+            starts = context.connection.info.get("statement_start")
+            if starts:
+                starts.pop()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("statement_start")
+        if starts:
+            db_metrics.record_statement(statement_kind(statement), (time.perf_counter() - starts.pop()) * 1000)
+
+def get_pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "recycle_seconds": pool._recycle,
+            "pre_ping": pool._pre_ping,
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    return status
+
+def get_db_diagnostics(engine) -> dict:
+    """Current pool gauges plus the counters and histograms collected since the last reset."""
+    return {"pool": get_pool_status(engine), "metrics": db_metrics.snapshot()}
+
+def reset_db_metrics():
+    db_metrics.reset()
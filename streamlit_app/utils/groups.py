@@ -1,10 +1,22 @@
-import base64, json, os
+import base64, json, os, threading, time
 from typing import Set, Dict, Any
 from utils.auth import _get_request_headers
+from config import GRAPH_API_URL, GRAPH_GROUPS_DEFAULT_TTL_SECONDS
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 
 
+# One keep-alive connection pool to Graph (or its local stand-in) for the whole process
+_graph_session = requests.Session()
+for _prefix in ("https://", "http://"):
+    _graph_session.mount(_prefix, HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+# { user oid: (group oids, expires_at epoch seconds) }, valid while the token that fetched them is
+_graph_groups_cache: Dict[str, tuple[frozenset, float]] = {}
+_graph_groups_lock = threading.Lock()
+
+
 def _decode_b64_json(value: str) -> Any:
     return json.loads(base64.b64decode(value))
 
@@ -78,15 +90,16 @@ def _get_groups_from_easyauth_headers() -> Set[str]:
 
     return set()
 
-def _get_groups_from_graph(token: str) -> Set[str]:
+def _get_groups_from_graph(token: str) -> Set[str] | None:
     """
     Uses Microsoft Graph to get group IDs. Requires delegated permissions:
     GroupMember.Read.All (and admin consent in most tenants).
+    Returns None when the lookup was refused (401/403).
     """
-    url = "https://graph.microsoft.com/v1.0/me/getMemberGroups"
+    url = f"{GRAPH_API_URL}/me/getMemberGroups"
     body = {"securityEnabledOnly": False}
 
-    r = requests.post(
+    r = _graph_session.post(
         url,
         headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
         json=body,
@@ -95,16 +108,45 @@ def _get_groups_from_graph(token: str) -> Set[str]:
 
     if r.status_code == 403:
         st.warning("Graph group lookup forbidden. Grant/admin-consent GroupMember.Read.All to your app registration.")
-        return set()
+        return None
     
     if r.status_code == 401:
         st.warning("Graph access token expired/invalid. Please sign in again.")
-        return set()
+        return None
     
     r.raise_for_status()
     data = r.json()
     return set([x.strip() for x in data.get("value", []) if isinstance(x, str) and x.strip()])
 
+def _get_groups_from_graph_cached(oid: str | None, token: str) -> Set[str]:
+    """
+    Graph group lookup cached per user OID until the access token expires
+    (session_state["graph_access_token_expires_at"], else GRAPH_GROUPS_DEFAULT_TTL_SECONDS).
+    Users with no groups are cached like any other; failed/forbidden lookups are not.
+    """
+    now = time.time()
+    if oid:
+        with _graph_groups_lock:
+            hit = _graph_groups_cache.get(oid)
+        if hit and hit[1] > now:
+            return set(hit[0])
+
+    groups = _get_groups_from_graph(token)
+    if groups is None:
+        return set()
+    if oid:
+        expires_at = st.session_state.get("graph_access_token_expires_at") or now + GRAPH_GROUPS_DEFAULT_TTL_SECONDS
+        with _graph_groups_lock:
+            _graph_groups_cache[oid] = (frozenset(groups), expires_at)
+    return groups
+
+def clear_graph_groups_cache(oid: str | None = None):
+    with _graph_groups_lock:
+        if oid:
+            _graph_groups_cache.pop(oid, None)
+        else:
+            _graph_groups_cache.clear()
+
 def get_group_oids() -> Set[str]:
     """
     Prod (EasyAuth): read groups from headers
@@ -117,7 +159,8 @@ def get_group_oids() -> Set[str]:
     if _is_local():
         token = st.session_state.get("graph_access_token")
         if token:
-            return _get_groups_from_graph(token)
+            oid = (st.session_state.get("user") or {}).get("oid")
+            return _get_groups_from_graph_cached(oid, token)
         
     return set()
 
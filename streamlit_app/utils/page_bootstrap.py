@@ -0,0 +1,12 @@
+from utils.sql_profiler import start_sql_profile
+from jobs.scheduler import start_job_scheduler
+
+
+def bootstrap_page():
+    """
+    Per-run setup shared by Main.py and every page: starts this run's SQL profile
+    (DB_DEBUG) and makes sure the process's job scheduler is running (cached, so
+    only the first run in the process starts it).
+    """
+    start_sql_profile()
+    start_job_scheduler()
@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from schemas.pagination_schemas import KeysetPage
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def build_filters(conditions: Iterable[tuple[str, str, Any]]) -> tuple[list[str], dict]:
+    """
+    Turns (sql fragment, param name, value) triples into WHERE clauses and bind params,
+    skipping any whose value is None or "" so unset UI filters don't narrow the query.
+
+    Example:
+        build_filters([("ps.sku = :sku", "sku", sku), ("pr.lot_number = :lot", "lot", lot)])
+    """
+    clauses, params = [], {}
+    for fragment, name, value in conditions:
+        if value is None or value == "":
+            continue
+        clauses.append(fragment)
+        params[name] = value
+    return clauses, params
+
+def date_range_conditions(column: str, date_from: date | None, date_to: date | None) -> list[tuple[str, str, Any]]:
+    """
+    Inclusive calendar-day range on a DATETIME2 column, written as a half-open
+    range so the column stays sargable.
+    """
+    if isinstance(date_from, date) and not isinstance(date_from, datetime):
+        date_from = datetime.combine(date_from, time.min)
+    if isinstance(date_to, date) and not isinstance(date_to, datetime):
+        date_to = datetime.combine(date_to + timedelta(days=1), time.min)
+    return [
+        (f"{column} >= :date_from", "date_from", date_from),
+        (f"{column} < :date_to", "date_to", date_to),
+    ]
+
+def _keyset_clause(sort_col: str, id_col: str, after: tuple, descending: bool) -> tuple[str, dict]:
+    after_value, after_id = after
+    params = {"after_value": after_value, "after_id": int(after_id)}
+    op = "<" if descending else ">"
+
+    # SQL Server sorts NULLs lowest: last when descending, first when ascending
+    if after_value is None:
+        params.pop("after_value")
+        if descending:
+            return f"({sort_col} IS NULL AND {id_col} < :after_id)", params
+        return f"({sort_col} IS NOT NULL OR {id_col} > :after_id)", params
+
+    clause = (
+        f"({sort_col} {op} :after_value"
+        f" OR ({sort_col} = :after_value AND {id_col} {op} :after_id)"
+    )
+    if descending:
+        clause += f" OR {sort_col} IS NULL"
+    return clause + ")", params
+
+def fetch_keyset_page(
+    db: Session,
+    select_sql: str,
+    *,
+    sort_col: str,
+    id_col: str,
+    sort_key: str,
+    id_key: str,
+    after: tuple | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    clauses: list[str] | None = None,
+    params: dict | None = None,
+    descending: bool = True,
+    fan_out: bool = False,
+) -> KeysetPage:
+    """
+    Runs `select_sql` (a SELECT ... FROM ... JOIN ... with no WHERE/ORDER BY) as one
+    keyset page ordered by (sort_col, id_col). `after` is the previous page's
+    next_after cursor; sort_key/id_key name those two columns in the result rows.
+    Fetches one extra row to know whether another page follows.
+
+    fan_out is for sources that repeat an id (views joining one-to-many children):
+    the page then holds `limit` distinct ids with all of their rows, so no row is
+    skipped or repeated at a page boundary. sort_col must be the same on every row
+    of an id, and both columns must be unqualified names of the source's output.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses = list(clauses or [])
+    params = dict(params or {})
+
+    if after is not None:
+        clause, keyset_params = _keyset_clause(sort_col, id_col, after, descending)
+        clauses.append(clause)
+        params.update(keyset_params)
+
+    direction = "DESC" if descending else "ASC"
+    order_by = f"{sort_col} {direction}, {id_col} {direction}"
+    sql = select_sql
+    if clauses:
+        sql += "\nWHERE " + "\n  AND ".join(clauses)
+    params["page_size"] = limit + 1
+
+    if not fan_out:
+        sql += f"\nORDER BY {order_by}\nOFFSET 0 ROWS FETCH NEXT :page_size ROWS ONLY"
+        result = db.execute(text(sql), params)
+        cols = result.keys()
+        rows = [dict(zip(cols, row)) for row in result.fetchall()]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        sql = f"""
+            WITH src AS (
+                {sql}
+            ),
+            page_keys AS (
+                SELECT {id_col} AS key_id, ROW_NUMBER() OVER (ORDER BY {order_by}) AS key_rank
+                FROM (SELECT DISTINCT {sort_col}, {id_col} FROM src) d
+                ORDER BY key_rank
+                OFFSET 0 ROWS FETCH NEXT :page_size ROWS ONLY
+            )
+            SELECT src.*, k.key_rank AS _key_rank
+            FROM src
+            JOIN page_keys k ON k.key_id = src.{id_col}
+            ORDER BY k.key_rank
+        """
+        result = db.execute(text(sql), params)
+        cols = result.keys()
+        rows = [dict(zip(cols, row)) for row in result.fetchall()]
+        has_more = any(row["_key_rank"] > limit for row in rows)
+        rows = [row for row in rows if row["_key_rank"] <= limit]
+        for row in rows:
+            del row["_key_rank"]
+
+    next_after = (rows[-1][sort_key], rows[-1][id_key]) if has_more else None
+    return KeysetPage(rows=rows, next_after=next_after, has_more=has_more)
@@ -0,0 +1,210 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from typing import Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config import QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_ENTRIES
+
+
+# Matches the target table of INSERT/UPDATE/DELETE/MERGE statements (optionally dbo./[bracketed])
+_WRITE_TARGET = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|MERGE(?:\s+INTO)?)\s+(?:\[?dbo\]?\.)?\[?(\w+)\]?",
+    re.IGNORECASE,
+)
+_NOT_TABLES = {"set", "top", "into"}
+# UPDATE alias SET ... FROM table alias / UPDATE TOP (n) alias ...: the real target is in FROM/JOIN
+_UPDATE_OR_DELETE = re.compile(r"\b(?:UPDATE|DELETE)\b", re.IGNORECASE)
+_FROM_OR_JOIN = re.compile(r"\b(?:FROM|JOIN)\s+(?:\[?dbo\]?\.)?\[?(\w+)\]?", re.IGNORECASE)
+
+
+class QueryCache:
+    """
+    Thread-safe in-process LRU for service read results, shared by every Streamlit session.
+    Each entry is tagged with the tables it reads; committing a write to one of those
+    tables drops the entry. Entries also expire after a TTL as a fallback for writes
+    made outside this process (ETL, other app instances).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()   # key -> (stored_at, tables, value)
+        self._keys_by_table: dict[str, set] = defaultdict(set)
+        self._generation: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+        self.invalidations: dict[str, int] = defaultdict(int)
+
+    def get(self, key, fn_name: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits[fn_name] += 1
+                return True, entry[2]
+            if entry is not None:
+                self._drop(key)
+            self.misses[fn_name] += 1
+            return False, None
+
+    def generations(self, tables: Iterable[str]) -> tuple:
+        with self._lock:
+            return tuple(self._generation[t] for t in tables)
+
+    def put(self, key, tables: tuple[str, ...], value, generations: tuple):
+        with self._lock:
+            # A write committed while the query ran; don't cache what may already be stale
+            if tuple(self._generation[t] for t in tables) != generations:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), tables, value)
+            for table in tables:
+                self._keys_by_table[table].add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tables(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                table = table.lower()
+                self._generation[table] += 1
+                keys = self._keys_by_table.pop(table, set())
+                for key in keys:
+                    self._drop(key)
+                if keys:
+                    self.invalidations[table] += len(keys)
+
+    def clear(self):
+        with self._lock:
+            for table in list(self._keys_by_table):
+                self._generation[table] += 1
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            functions = sorted(set(self.hits) | set(self.misses))
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "functions": {
+                    name: {"hits": self.hits[name], "misses": self.misses[name]}
+                    for name in functions
+                },
+                "invalidated_entries_by_table": dict(self.invalidations),
+            }
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[1]:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+query_cache = QueryCache(max_entries=QUERY_CACHE_MAX_ENTRIES, ttl_seconds=QUERY_CACHE_TTL_SECONDS)
+
+
+def cached_query(tables: Iterable[str]):
+    """
+    Caches a service read function's result by (function, arguments after db).
+    `tables` lists every table the query reads; a committed write to any of them
+    invalidates the entry. Results are deep-copied so callers can mutate them freely.
+
+    Example:
+        @cached_query(tables=("product_requests", "product_skus"))
+        @transactional
+        def get_pending_requests(db: Session) -> list[dict]:
+            ...
+    """
+    if isinstance(tables, str):
+        tables = (tables,)
+    tags = tuple(sorted({t.lower() for t in tables}))
+
+    def decorator(fn):
+        fn_name = f"{fn.__module__}.{fn.__name__}"
+
+        @wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            try:
+                key = (fn_name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                # Unhashable arguments (lists/dicts): run uncached
+                return fn(db, *args, **kwargs)
+
+            found, value = query_cache.get(key, fn_name)
+            if found:
+                return copy.deepcopy(value)
+
+            generations = query_cache.generations(tags)
+            value = fn(db, *args, **kwargs)
+            # Read inside a transaction that already wrote to these tables: the result
+            # holds uncommitted rows, so it is only returned to this caller
+            if not _uncommitted_writes(db) & set(tags):
+                query_cache.put(key, tags, copy.deepcopy(value), generations)
+            return value
+
+        wrapper.cache_tables = tags
+        return wrapper
+    return decorator
+
+def _uncommitted_writes(db) -> set[str]:
+    """Tables written by db's open transaction that have not been committed yet."""
+    if isinstance(db, Session):
+        if not db.in_transaction():
+            return set()
+        db = db.connection()
+    return db.info.get("query_cache_written", set())
+
+def written_tables(statement: str) -> set[str]:
+    tables = {
+        name.lower() for name in _WRITE_TARGET.findall(statement)
+        if name.lower() not in _NOT_TABLES
+    }
+    if _UPDATE_OR_DELETE.search(statement):
+        # Joined UPDATE/DELETE name an alias as target; over-invalidating the joined tables is safe
+        tables.update(name.lower() for name in _FROM_OR_JOIN.findall(statement))
+    return tables
+
+def install_cache_invalidation(engine):
+    """
+    Registers engine listeners that note which tables each connection writes to and
+    invalidate the matching cache entries when that transaction commits or rolls back.
+    Covers @transactional services, ORM flushes and raw text() writes alike.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _track_writes(conn, cursor, statement, parameters, context, executemany):
+        tables = written_tables(statement)
+        if tables:
+            conn.info.setdefault("query_cache_written", set()).update(tables)
+
+    @event.listens_for(engine, "commit")
+    def _invalidate_on_commit(conn):
+        tables = conn.info.pop("query_cache_written", None)
+        if tables:
+            query_cache.invalidate_tables(tables)
+
+    @event.listens_for(engine, "rollback")
+    def _invalidate_on_rollback(conn):
+        # Entries cached from inside the transaction may hold the rolled-back rows
+        tables = conn.info.pop("query_cache_written", None)
+        if tables:
+            query_cache.invalidate_tables(tables)
+
+def clear_query_cache():
+    query_cache.clear()
+
+def get_query_cache_stats() -> dict:
+    return query_cache.stats()
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from sqlalchemy import event
+from config import DB_DEBUG, SQL_PROFILER_REPEAT_THRESHOLD
+
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+_SERVICE_DIRS = tuple(str(APP_ROOT / d) + os.sep for d in ("services", "data"))
+_UI_DIRS = tuple(str(APP_ROOT / d) + os.sep for d in ("components", "pages"))
+
+_STRING_LITERAL = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|:\w+)(?:\s*,\s*(?:\?|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# The profile collecting statements for the script run executing on this thread
+_local = threading.local()
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and IN-lists collapsed, so repeats of one query compare equal."""
+    fp = _STRING_LITERAL.sub("?", statement)
+    fp = _NUMBER_LITERAL.sub("?", fp)
+    fp = _PARAM_LIST.sub("(?+)", fp)
+    return _WHITESPACE.sub(" ", fp).strip()
+
+def _frame_label(frame) -> str:
+    module = Path(frame.f_code.co_filename).relative_to(APP_ROOT).with_suffix("")
+    return f"{'.'.join(module.parts)}.{frame.f_code.co_name}"
+
+def _callers() -> tuple[str, str]:
+    """(nearest service/data function, nearest component/page frame) on the current stack."""
+    service = origin = None
+    frame = sys._getframe(2)
+    while frame is not None and origin is None:
+        filename = frame.f_code.co_filename
+        if service is None and filename.startswith(_SERVICE_DIRS):
+            service = _frame_label(frame)
+        elif filename.startswith(_UI_DIRS) or filename == str(APP_ROOT / "Main.py"):
+            origin = _frame_label(frame)
+        frame = frame.f_back
+    return service or "(outside services)", origin or "-"
+
+
+class QueryProfile:
+    """Statements executed during one Streamlit script run."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.statements: list[dict] = []
+
+    def record(self, statement: str, ms: float, executemany: bool):
+        service, origin = _callers()
+        self.statements.append({
+            "fingerprint": fingerprint(statement),
+            "service": service,
+            "origin": origin,
+            "ms": ms,
+            "executemany": executemany,
+        })
+
+    def summary(self) -> dict:
+        by_fingerprint = defaultdict(lambda: {"count": 0, "ms": 0.0})
+        by_service = defaultdict(lambda: {"count": 0, "ms": 0.0})
+        by_service_fingerprint = defaultdict(lambda: {"count": 0, "ms": 0.0, "origins": set()})
+
+        for s in self.statements:
+            for bucket in (
+                by_fingerprint[s["fingerprint"]],
+                by_service[s["service"]],
+                by_service_fingerprint[(s["service"], s["fingerprint"])],
+            ):
+                bucket["count"] += 1
+                bucket["ms"] += s["ms"]
+            by_service_fingerprint[(s["service"], s["fingerprint"])]["origins"].add(s["origin"])
+
+        suspects = [
+            {
+                "service": service,
+                "called_from": ", ".join(sorted(agg["origins"])),
+                "count": agg["count"],
+                "total_ms": round(agg["ms"], 1),
+                "statement": fp,
+            }
+            for (service, fp), agg in by_service_fingerprint.items()
+            if agg["count"] >= SQL_PROFILER_REPEAT_THRESHOLD
+        ]
+        repeated = [
+            {"count": agg["count"], "total_ms": round(agg["ms"], 1), "statement": fp}
+            for fp, agg in by_fingerprint.items()
+            if agg["count"] > 1
+        ]
+        services = [
+            {"service": name, "statements": agg["count"], "total_ms": round(agg["ms"], 1)}
+            for name, agg in by_service.items()
+        ]
+
+        return {
+            "statements": len(self.statements),
+            "distinct_statements": len(by_fingerprint),
+            "db_ms": round(sum(s["ms"] for s in self.statements), 1),
+            "run_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "n_plus_one": sorted(suspects, key=lambda r: -r["count"]),
+            "repeated": sorted(repeated, key=lambda r: -r["count"]),
+            "by_service": sorted(services, key=lambda r: -r["total_ms"]),
+        }
+
+
+def start_sql_profile() -> QueryProfile | None:
+    """Starts a fresh profile for this script run. No-op unless DB_DEBUG=1."""
+    if not DB_DEBUG:
+        return None
+    _local.profile = QueryProfile()
+    return _local.profile
+
+def current_sql_profile() -> QueryProfile | None:
+    return getattr(_local, "profile", None)
+
+def install_sql_profiler(engine):
+    """
+    Registers cursor listeners that time each statement into the current thread's
+    QueryProfile. Only installed when DB_DEBUG=1 so normal runs pay nothing.
+    """
+    if not DB_DEBUG:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if current_sql_profile() is not None:
+            conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        profile = current_sql_profile()
+        starts = conn.info.get("profiler_start")
+        if profile is not None and starts:
+            profile.record(statement, (time.perf_counter() - starts.pop()) * 1000, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def _discard(context):
+        if context.connection is not None and context.cursor is not None:
+            starts = context.connection.info.get("profiler_start")
+            if starts:
+                starts.pop()